@@ -41,6 +41,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primeiro da lista: mede o tempo total (ver POSTS_METRICS_* abaixo)
+    'posts.middleware.PerformanceMiddleware',
+    # Antes dos demais: recusa POSTs acima do limite sem tocar sessão nem
+    # banco (ver POSTS_THROTTLE_* abaixo)
+    'posts.middleware.WriteThrottleMiddleware',
+    # Antes da sessão: a leitura da sessão também pode ir para uma réplica
+    # (ver POSTS_READ_REPLICAS abaixo)
+    'posts.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -73,13 +81,173 @@ WSGI_APPLICATION = 'blogproject.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+#
+# Perfil escolhido por variáveis de ambiente:
+#   DB_ENGINE=sqlite (padrão) ou postgres
+#   DB_CONN_MAX_AGE: segundos que uma conexão é reaproveitada entre requisições
+#   DB_POOL=1 (postgres): pool nativo do Django 5.1+ (requer psycopg[pool])
+#   SQLITE_PATH, SQLITE_WAL=1 (sqlite): arquivo do banco e modo WAL
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'blog'),
+            'USER': os.environ.get('POSTGRES_USER', 'blog'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            # Conexões persistentes, testadas antes de serem reaproveitadas
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    if os.environ.get('DB_POOL', '0') == '1':
+        # Com o pool, quem guarda as conexões é ele: CONN_MAX_AGE precisa ser 0
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
     }
+    # WAL: leitores não bloqueiam o escritor (e vice-versa); synchronous=NORMAL
+    # é seguro com WAL e evita um fsync por commit. O modo fica gravado no
+    # cabeçalho do arquivo, então só é ligado pedindo (SQLITE_WAL=1) ou com um
+    # banco fora do repositório (SQLITE_PATH): o db.sqlite3 de desenvolvimento
+    # é versionado e qualquer manage.py o deixaria modificado
+    SQLITE_WAL = os.environ.get('SQLITE_WAL', '1' if os.environ.get('SQLITE_PATH') else '0') == '1'
+    if os.environ.get('SQLITE_TUNING', '1') == '1':
+        DATABASES['default']['OPTIONS'] = {
+            'init_command': (
+                ('PRAGMA journal_mode=WAL;PRAGMA synchronous=NORMAL;' if SQLITE_WAL else '') +
+                'PRAGMA mmap_size=134217728;'
+                'PRAGMA temp_store=MEMORY;'
+                'PRAGMA cache_size=-20000;'
+            ),
+            # busy timeout (segundos): espera o lock em vez de falhar na hora
+            'timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 20)),
+            # BEGIN IMMEDIATE: o lock de escrita é pego no início da transação,
+            # sem o "database is locked" de quando uma leitura vira escrita
+            'transaction_mode': 'IMMEDIATE',
+        }
+
+# Réplicas de leitura (posts/routers.py). POSTS_DATABASE_REPLICAS lista os
+# hosts das réplicas no PostgreSQL ou, no SQLite, arquivos que fazem o papel
+# de réplica (copiados do primário por `manage.py sync_replicas`). GETs e
+# HEADs leem de uma réplica sorteada; escritas, comandos e quem escreveu há
+# menos de POSTS_PRIMARY_PIN_SECONDS segundos ficam no primário.
+POSTS_DATABASE_REPLICAS = [value for value in os.environ.get('POSTS_DATABASE_REPLICAS', '').split(',') if value]
+POSTS_READ_REPLICAS = []
+for number, value in enumerate(POSTS_DATABASE_REPLICAS, start=1):
+    replica = {**DATABASES['default'], 'OPTIONS': dict(DATABASES['default']['OPTIONS'])}
+    replica['HOST' if DB_ENGINE == 'postgres' else 'NAME'] = value
+    # Nos testes a réplica é a mesma conexão do primário
+    replica['TEST'] = {'MIRROR': 'default'}
+    DATABASES[f'replica_{number}'] = replica
+    POSTS_READ_REPLICAS.append(f'replica_{number}')
+DATABASE_ROUTERS = ['posts.routers.ReplicaRouter']
+POSTS_PRIMARY_PIN_SECONDS = int(os.environ.get('POSTS_PRIMARY_PIN_SECONDS', 5))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# 'fragments' guarda os cards renderizados dos posts (o corpo já vem pronto
+# em Post.content_html). LocMemCache descarta as entradas menos usadas (LRU)
+# ao passar de MAX_ENTRIES; POSTS_FRAGMENT_CACHE_BACKEND=file usa arquivos em disco.
+
+POSTS_FRAGMENT_CACHE_BACKEND = os.environ.get('POSTS_FRAGMENT_CACHE_BACKEND', 'locmem')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {'MAX_ENTRIES': 2000},
+    },
+    'fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'post-fragments',
+        'TIMEOUT': 60 * 60 * 24,
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
 }
 
+if POSTS_FRAGMENT_CACHE_BACKEND == 'file':
+    CACHES['fragments'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('POSTS_FRAGMENT_CACHE_DIR', str(BASE_DIR / '.cache' / 'fragments')),
+        'TIMEOUT': 60 * 60 * 24,
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+
+POSTS_FRAGMENT_CACHE = 'fragments'
+
+# Cache de página inteira para leitores anônimos (opt-in). As páginas são
+# invalidadas pelos sinais de posts/signals.py quando posts ou comentários
+# visíveis mudam.
+POSTS_PAGE_CACHE_ENABLED = os.environ.get('POSTS_PAGE_CACHE_ENABLED', '0') == '1'
+POSTS_PAGE_CACHE = 'default'
+POSTS_PAGE_CACHE_TIMEOUT = 60 * 10
+
+
+# Sessões e autenticação. POSTS_SESSION_STRATEGY escolhe onde a sessão mora:
+# - 'db' (padrão): tabela django_session (um SELECT por requisição com cookie);
+# - 'cached_db': a tabela continua sendo a fonte da verdade, mas a leitura
+#   vem do cache 'sessions' (só o primeiro acesso de cada processo vai ao banco);
+# - 'signed_cookies': a sessão inteira num cookie assinado com SECRET_KEY,
+#   sem banco nem cache; não dá para revogar uma sessão pelo servidor.
+# Visitantes sem cookie de sessão não fazem nenhuma query de sessão ou de
+# usuário em nenhuma delas (request.user é preguiçoso).
+POSTS_SESSION_STRATEGY = os.environ.get('POSTS_SESSION_STRATEGY', 'db')
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}[POSTS_SESSION_STRATEGY]
+SESSION_CACHE_ALIAS = 'sessions'
+
+# O cache 'sessions' precisa ser compartilhado entre os workers: num
+# LocMemCache (por processo) um logout, uma troca de senha ou uma
+# desativação só chegaria aos outros quando a entrada expirasse (até
+# SESSION_COOKIE_AGE, duas semanas). Por isso 'cached_db' e o cache de
+# usuário só valem com POSTS_SESSION_CACHE_LOCATION (Redis, ex.:
+# redis://localhost:6379/1); sem ele o check posts.E001/E002 recusa a
+# configuração (posts/checks.py).
+POSTS_SESSION_CACHE_LOCATION = os.environ.get('POSTS_SESSION_CACHE_LOCATION', '')
+if POSTS_SESSION_CACHE_LOCATION:
+    CACHES['sessions'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': POSTS_SESSION_CACHE_LOCATION,
+    }
+else:
+    CACHES['sessions'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+
+# CachedModelBackend (posts/auth.py) guarda o usuário da sessão no cache
+# POSTS_USER_CACHE; sem cache compartilhado (None) ele é um ModelBackend
+# comum. O ModelBackend continua na lista para as sessões abertas antes
+# da troca, que guardam o caminho do backend usado no login.
+AUTHENTICATION_BACKENDS = [
+    'posts.auth.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+POSTS_USER_CACHE = 'sessions' if POSTS_SESSION_CACHE_LOCATION else None
+POSTS_USER_CACHE_TIMEOUT = 60 * 5
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -127,4 +295,57 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOGIN_REDIRECT_URL = 'post_list' # <-- Usando o NOME da URL (melhor que o path '/blog/')
 
 # O usuário será redirecionado para esta URL após o logout
-LOGOUT_REDIRECT_URL = 'login' #
\ No newline at end of file
+LOGOUT_REDIRECT_URL = 'login' #
+
+# Paginação da lista de posts: 'offset' (?page=N, com total de páginas)
+# ou 'cursor' (?cursor=<token>, custo constante em qualquer profundidade)
+POSTS_PAGINATION_MODE = os.environ.get('POSTS_PAGINATION_MODE', 'offset')
+
+# Formato do Post.content: 'html' (padrão) ou 'markdown' (pacote markdown).
+# O HTML e o resumo são gravados no save(); ao trocar, rode render_posts
+POSTS_CONTENT_MARKUP = os.environ.get('POSTS_CONTENT_MARKUP', 'html')
+
+# Rotas de leitura servidas pelas views async (ORM async, sem thread por
+# requisição sob ASGI). Ex.: POSTS_ASYNC_VIEWS=post_list,post_detail
+POSTS_ASYNC_VIEWS = {name for name in os.environ.get('POSTS_ASYNC_VIEWS', '').split(',') if name}
+
+# Moderação automática de comentários (posts/moderation.py), processada
+# pelo worker `manage.py moderate_comments`. As regras são consultadas em
+# ordem; sem decisão, o comentário fica para a moderação manual no admin.
+POSTS_MODERATION_RULES = [
+    'posts.moderation.SpamRule',
+    'posts.moderation.RateLimitRule',
+    'posts.moderation.TrustedAuthorRule',
+]
+POSTS_MODERATION_MAX_LINKS = 2
+POSTS_MODERATION_BLOCKED_WORDS = [w for w in os.environ.get('POSTS_MODERATION_BLOCKED_WORDS', '').split(',') if w]
+POSTS_MODERATION_RATE_LIMIT = (5, 60 * 10)  # (comentários, segundos)
+POSTS_MODERATION_DUPLICATE_WINDOW = 60 * 60 * 24  # texto repetido do mesmo autor
+POSTS_MODERATION_TRUSTED_MIN_APPROVED = 3
+
+# Limite de escrita (posts/throttling.py, WriteThrottleMiddleware): token
+# bucket por usuário e por IP nos POSTs das views com `throttle_scope`
+# (comentário e criação de post); estourado, a resposta é 429 com Retry-After. 'memory' guarda os baldes no processo; 'cache' usa
+# o cache POSTS_THROTTLE_CACHE, compartilhado entre workers se ele for.
+POSTS_THROTTLE_ENABLED = os.environ.get('POSTS_THROTTLE_ENABLED', '1') == '1'
+POSTS_THROTTLE_BACKEND = os.environ.get('POSTS_THROTTLE_BACKEND', 'memory')
+POSTS_THROTTLE_CACHE = 'default'
+POSTS_THROTTLE_RATES = {
+    'comment': {'user': '10/min', 'ip': '30/min'},
+    'post_create': {'user': '5/min', 'ip': '20/min'},
+}
+# Ex.: 'HTTP_X_FORWARDED_FOR' atrás de um proxy reverso confiável
+POSTS_THROTTLE_IP_HEADER = os.environ.get('POSTS_THROTTLE_IP_HEADER') or None
+
+# Métricas por rota (posts/middleware.py): cabeçalho Server-Timing e
+# histogramas em /metrics/ (JSON) e /metrics/prometheus/. Desligado, o
+# middleware sai da pilha; a amostragem mede só uma fração das requisições.
+POSTS_METRICS_ENABLED = os.environ.get('POSTS_METRICS_ENABLED', '1') == '1'
+POSTS_METRICS_SAMPLE_RATE = float(os.environ.get('POSTS_METRICS_SAMPLE_RATE', '1.0'))
+POSTS_METRICS_WINDOW = 60 * 5
+POSTS_METRICS_TOKEN = os.environ.get('POSTS_METRICS_TOKEN', '')
+
+# Saída do `manage.py publish_static` (posts/publish.py): HTML estático do
+# detalhe de cada post publicado e das primeiras páginas da lista, para o
+# servidor web entregar sem passar pelo Django.
+POSTS_PUBLISH_ROOT = os.environ.get('POSTS_PUBLISH_ROOT', str(BASE_DIR / 'public'))
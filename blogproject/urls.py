@@ -17,8 +17,16 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from posts.views import SitemapIndexView, SitemapView, metrics_json, metrics_prometheus
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    # Métricas por rota (somente equipe ou token do Prometheus)
+    path('metrics/', metrics_json, name='metrics_json'),
+    path('metrics/prometheus/', metrics_prometheus, name='metrics_prometheus'),
+    # Sitemap na raiz do site: índice + shards transmitidos aos pedaços
+    path('sitemap.xml', SitemapIndexView.as_view(), name='sitemap_index'),
+    path('sitemap-<str:section>-<int:number>.xml', SitemapView.as_view(), name='sitemap_shard'),
     # Inclui todas as URLs definidas no app 'posts' sob o caminho 'blog/'
     path('blog/', include('posts.urls')),
     path('', include('posts.urls')),
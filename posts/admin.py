@@ -1,17 +1,98 @@
-from django.contrib import admin
-from .models import Post, Comment
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.utils import timezone
+from .models import Post, Comment, ModerationTask, Tag
+from .counters import set_comments_approval_in_batches
+from .pagination import EstimatedCountPaginator
+from .search import query_terms, search_posts
+from .slugs import save_with_unique_slug
+
+
+# ----------------------------------------------------
+# CHANGELISTS DE TABELAS GRANDES
+# ----------------------------------------------------
+class AutocompleteFilter(admin.FieldListFilter):
+    """
+    Filtro por chave estrangeira com o autocomplete do admin (select2) em vez
+    da lista de todos os objetos na barra lateral: só o selecionado é lido.
+    O admin do model apontado precisa de search_fields.
+    """
+    template = 'admin/posts/autocomplete_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.lookup_kwarg = f'{field_path}__{field.target_field.name}__exact'
+        super().__init__(field, request, params, model, model_admin, field_path)
+        remote = field.remote_field.model
+        self.form_field = forms.ModelChoiceField(
+            remote._default_manager.all(), required=False,
+            widget=AutocompleteSelect(field, model_admin.admin_site),
+        )
+        self.value = self.used_parameters.get(self.lookup_kwarg, [None])[-1]
+
+    def expected_parameters(self):
+        return [self.lookup_kwarg]
+
+    def choices(self, changelist):
+        # Os outros filtros seguem no formulário como campos escondidos
+        self.hidden_params = [(k, v) for k, v in changelist.params.items() if k != self.lookup_kwarg]
+        self.widget_html = self.form_field.widget.render(self.lookup_kwarg, self.value)
+        yield {
+            'selected': self.value is None,
+            'query_string': changelist.get_query_string(remove=[self.lookup_kwarg]),
+            'display': 'Todos',
+        }
+
+
+class LargeTableChangeList(ChangeList):
+    # Colunas que a listagem não mostra ficam fora do SELECT (list_defer)
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        return queryset.defer(*self.model_admin.list_defer) if self.model_admin.list_defer else queryset
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    # Total aproximado em vez de COUNT(*) a cada página, e sem o segundo
+    # COUNT do total sem filtros ("99 resultados (1.000.000 no total)")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_defer = ()
+
+    def get_changelist(self, request, **kwargs):
+        return LargeTableChangeList
+
+    @property
+    def media(self):
+        # select2 dos AutocompleteFilter na changelist
+        return super().media + AutocompleteSelect(None, self.admin_site).media
+
 
 # Register your models here.
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(LargeTableAdmin):
     # Campos que serão exibidos na lista de post
     list_display = ('title', 'author', 'status', 'created_at')
+    # O autor vem no mesmo JOIN; o corpo do post não sai do banco
+    list_select_related = ('author',)
+    list_defer = ('content', 'content_html', 'excerpt')
 
     # Adiciona uma barra lateral para filtrar posts por Status e Author
-    list_filter = ('status', 'created_at', 'author')
+    # (o autor por autocomplete: a barra não lista todos os usuários)
+    list_filter = ('status', 'created_at', ('author', AutocompleteFilter))
+
+    # Navegação por ano/mês/dia sobre o índice de created_at
+    date_hierarchy = 'created_at'
+
+    # Autor no formulário também por autocomplete, em vez de um <select> com todos
+    autocomplete_fields = ('author',)
     
     # Adiciona um campo de busca por título e conteúdo
+    # (a busca em si usa o índice invertido, ver get_search_results)
     search_fields = ('title', 'content')
+
+    # Quantos resultados (os mais relevantes) a busca do admin considera
+    search_result_limit = 1000
     
     # Preenche o campo 'slug' automaticamente com base no 'title'
     prepopulated_fields = {'slug': ('title',)}
@@ -22,6 +103,31 @@ class PostAdmin(admin.ModelAdmin):
     # Faz com que a data de criação seja somente leitura
     readonly_fields = ('created_at', 'updated_at')
 
+    # Slug deixado em branco é gerado do título, com sufixo se já existir
+    def save_model(self, request, obj, form, change):
+        if obj.slug:
+            super().save_model(request, obj, form, change)
+        else:
+            save_with_unique_slug(obj)
+
+    # Troca o LIKE '%termo%' em title/content pelo índice de busca (inclui
+    # rascunhos, ao contrário da busca pública). Cada palavra casa pelo
+    # começo ("Djan" acha "Django"); sem palavra indexável ("C", "de") o
+    # título é comparado pelo começo
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        if not query_terms(search_term):
+            return queryset.filter(title__istartswith=search_term.strip()), False
+        ids = search_posts(search_term, published_only=False, prefix=True).ids(limit=self.search_result_limit)
+        if len(ids) >= self.search_result_limit and request.resolver_match.url_name.endswith('_changelist'):
+            self.message_user(
+                request,
+                f'A busca mostra só os {self.search_result_limit} resultados mais relevantes; refine os termos.',
+                messages.WARNING,
+            )
+        return queryset.filter(pk__in=ids), False
+
 '''
 Explicações:
 
@@ -37,20 +143,58 @@ prepopulated_fields = {'slug': ('title',)}: Muito importante! Ao digitar o títu
 '''
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(LargeTableAdmin):
     # Exibir o post, o autor e o status de aprovação
     list_display = ('post', 'author', 'created_at', 'approved')
-    # Permitir filtrar por status de aprovação e data
-    list_filter = ('approved', 'created_at')
+    # Post e autor no mesmo JOIN (as colunas e o __str__ do comentário usam
+    # os dois), sem os textos que a listagem não mostra
+    list_select_related = ('post', 'author')
+    list_defer = ('content', 'post__content', 'post__content_html', 'post__excerpt')
+    # Permitir filtrar por status de aprovação e data; post e autor por autocomplete
+    list_filter = ('approved', 'created_at', ('post', AutocompleteFilter), ('author', AutocompleteFilter))
+    date_hierarchy = 'created_at'
+    # O autocomplete de post usa PostAdmin.get_search_results: cada palavra
+    # digitada casa pelo começo, então o texto parcial já acha o post
+    autocomplete_fields = ('post', 'author')
     # Permitir aprovar/desaprovar comentários diretamente na lista
     actions = ['approve_comments', 'disapprove_comments']
+
+    # Tamanho de cada lote (uma transação) das ações de aprovação
+    approval_batch_size = 1000
     
+    # set_comments_approval_in_batches faz o update em lotes e recalcula o
+    # contador de comentários aprovados dos posts afetados em cada um
     def approve_comments(self, request, queryset):
-        queryset.update(approved=True)
-        self.message_user(request, "Comentários selecionados foram aprovados com sucesso.")
+        updated = set_comments_approval_in_batches(queryset, True, self.approval_batch_size)
+        self.message_user(request, f"{updated} comentários aprovados com sucesso.")
     approve_comments.short_description = "Aprovar comentários selecionados"
 
     def disapprove_comments(self, request, queryset):
-        queryset.update(approved=False)
-        self.message_user(request, "Comentários selecionados foram reprovados com sucesso.")
-    disapprove_comments.short_description = "Reprovar comentários selecionados"
\ No newline at end of file
+        updated = set_comments_approval_in_batches(queryset, False, self.approval_batch_size)
+        self.message_user(request, f"{updated} comentários reprovados com sucesso.")
+    disapprove_comments.short_description = "Reprovar comentários selecionados"
+
+@admin.register(ModerationTask)
+class ModerationTaskAdmin(LargeTableAdmin):
+    # Fila de moderação automática (ver posts/moderation.py)
+    list_display = ('comment', 'status', 'decision', 'reason', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status', 'decision')
+    # O comentário vem no mesmo JOIN (o __str__ dele usa autor e post)
+    list_select_related = ('comment__author', 'comment__post')
+    raw_id_fields = ('comment',)
+    actions = ['retry_tasks']
+
+    # Tarefas que falharam voltam para a fila do worker
+    def retry_tasks(self, request, queryset):
+        updated = queryset.exclude(status=ModerationTask.DONE).update(
+            status=ModerationTask.PENDING, attempts=0, run_after=timezone.now(), locked_at=None)
+        self.message_user(request, f"{updated} tarefas devolvidas à fila.")
+    retry_tasks.short_description = "Reprocessar tarefas selecionadas"
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug', 'post_count')
+    search_fields = ('name',)
+    prepopulated_fields = {'slug': ('name',)}
+    # Mantido pelos sinais de Post (ver posts/tags.py); recount_tag_counts corrige
+    readonly_fields = ('post_count',)
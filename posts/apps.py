@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class PostsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'posts'
+
+    def ready(self):
+        # Registra os receivers de sinais (contadores desnormalizados)
+        from . import signals  # noqa: F401
+        # Checks de configuração (manage.py check)
+        from . import checks  # noqa: F401
@@ -0,0 +1,59 @@
+# posts/auth.py
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+
+def get_user_cache():
+    # None: sem cache de usuário (POSTS_USER_CACHE só com cache compartilhado)
+    alias = getattr(settings, 'POSTS_USER_CACHE', None)
+    return caches[alias] if alias else None
+
+
+def user_cache_timeout():
+    return getattr(settings, 'POSTS_USER_CACHE_TIMEOUT', 300)
+
+
+def user_cache_key(user_id):
+    return f'posts:user:{user_id}'
+
+
+def forget_cached_user(user_id):
+    cache = get_user_cache()
+    if cache is not None:
+        cache.delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend que guarda no cache o usuário carregado pela sessão: a
+    partir da segunda requisição, request.user não custa query. A entrada
+    é apagada pelos sinais de posts/signals.py quando o usuário é salvo ou
+    apagado (senha nova, desativação, last_login), e expira sozinha depois
+    de POSTS_USER_CACHE_TIMEOUT segundos para cobrir updates em massa.
+    Sem POSTS_USER_CACHE, é o ModelBackend de sempre.
+    """
+
+    def get_user(self, user_id):
+        cache = get_user_cache()
+        if cache is None:
+            return super().get_user(user_id)
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, user_cache_timeout())
+        return user
+
+    async def aget_user(self, user_id):
+        cache = get_user_cache()
+        if cache is None:
+            return await super().aget_user(user_id)
+        key = user_cache_key(user_id)
+        user = await cache.aget(key)
+        if user is None:
+            user = await super().aget_user(user_id)
+            if user is not None:
+                await cache.aset(key, user, user_cache_timeout())
+        return user
@@ -0,0 +1,63 @@
+# posts/bulk.py
+from contextlib import contextmanager
+from itertools import islice
+
+
+def chunked(iterable, size):
+    # Divide qualquer iterável em listas de até `size` itens, sem materializar tudo
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+@contextmanager
+def preserve_auto_timestamps(model):
+    """
+    Desliga auto_now/auto_now_add dos campos de data do model enquanto o
+    bloco roda, para que bulk_create grave as datas vindas da importação
+    (ou do gerador de dados) em vez de "agora". Afeta o processo inteiro:
+    use só em comandos de manutenção.
+    """
+    fields = [
+        (field, field.auto_now, field.auto_now_add)
+        for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    for field, _, _ in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in fields:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class CachedLookup:
+    """
+    Resolve valores de um campo único (ex.: username, slug) para ids, com
+    cache em memória: cada bloco faz no máximo uma query IN com os valores
+    ainda desconhecidos.
+    """
+
+    def __init__(self, queryset, field):
+        self.queryset = queryset
+        self.field = field
+        self.cache = {}
+
+    def prefetch(self, values):
+        missing = {value for value in values if value not in self.cache}
+        if missing:
+            found = dict(self.queryset.filter(**{f'{self.field}__in': missing}).values_list(self.field, 'pk'))
+            for value in missing:
+                self.cache[value] = found.get(value)
+
+    def get(self, value):
+        if value not in self.cache:
+            self.prefetch([value])
+        return self.cache[value]
+
+    def add(self, value, pk):
+        self.cache[value] = pk
@@ -0,0 +1,322 @@
+# posts/cache.py
+import hashlib
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from .routers import PIN_COOKIE, replica_reads
+
+
+class CacheStats:
+    # Contadores de acerto/falha por processo (thread-safe)
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def as_dict(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / total if total else 0.0,
+            }
+
+
+fragment_stats = CacheStats()
+
+
+def get_fragment_cache():
+    return caches[getattr(settings, 'POSTS_FRAGMENT_CACHE', 'fragments')]
+
+
+def fragment_key(name, post, *vary_on):
+    """
+    A chave inclui post.id e post.updated_at: quando o post muda, a chave
+    muda junto, então uma entrada velha nunca é servida e não há purge.
+    Não inclui a URL, então o mesmo card serve /blog/ e /.
+    """
+    version = post.updated_at.timestamp() if post.updated_at else 0
+    extra = hashlib.md5(':'.join(str(v) for v in vary_on).encode()).hexdigest()
+    return f'posts:fragment:{name}:{post.pk}:{version}:{extra}'
+
+
+def get_or_render_fragment(name, post, render, vary_on=(), timeout=None):
+    cache = get_fragment_cache()
+    key = fragment_key(name, post, *vary_on)
+    content = cache.get(key)
+    fragment_stats.record(content is not None)
+    if content is None:
+        content = render()
+        cache.set(key, content, timeout if timeout is not None else getattr(
+            settings, 'POSTS_FRAGMENT_CACHE_TIMEOUT', 60 * 60 * 24))
+    return content
+
+
+# ----------------------------------------------------
+# CACHE DE PÁGINA INTEIRA (LEITORES ANÔNIMOS)
+# ----------------------------------------------------
+page_stats = CacheStats()
+
+
+def get_page_cache():
+    return caches[getattr(settings, 'POSTS_PAGE_CACHE', 'default')]
+
+
+def page_cache_enabled():
+    return getattr(settings, 'POSTS_PAGE_CACHE_ENABLED', False)
+
+
+def _scope_version_key(scope):
+    return f'posts:page:version:{scope}'
+
+
+def _scope_version(cache, scope):
+    # Cada escopo ('list' ou 'detail:<slug>') tem uma versão aleatória;
+    # invalidar é só apagar a versão, e as páginas antigas ficam órfãs
+    key = _scope_version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex[:12]
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+async def _ascope_version(cache, scope):
+    key = _scope_version_key(scope)
+    version = await cache.aget(key)
+    if version is None:
+        version = uuid.uuid4().hex[:12]
+        if not await cache.aadd(key, version, None):
+            version = await cache.aget(key, version)
+    return version
+
+
+def _page_key(request, scope, version, variant):
+    query = hashlib.md5(f'{variant}?{request.GET.urlencode()}'.encode()).hexdigest()
+    return f'posts:page:{scope}:{version}:{request.method}:{query}'
+
+
+def page_cache_key(request, scope, variant=''):
+    """
+    A chave depende do escopo e da query string, não do caminho: a mesma
+    página servida em /blog/ e em / ocupa uma única entrada, e um único
+    purge invalida as duas montagens. `variant` separa páginas diferentes
+    que dividem o escopo (ex.: o arquivo de cada autor no escopo 'list').
+    """
+    return _page_key(request, scope, _scope_version(get_page_cache(), scope), variant)
+
+
+async def apage_cache_key(request, scope, variant=''):
+    return _page_key(request, scope, await _ascope_version(get_page_cache(), scope), variant)
+
+
+def invalidate_pages(scopes):
+    get_page_cache().delete_many([_scope_version_key(scope) for scope in scopes])
+
+
+def invalidate_post_pages(*slugs, lists=True):
+    # Página de detalhe de cada slug e, se pedido, todas as páginas da lista
+    scopes = [f'detail:{slug}' for slug in slugs if slug]
+    if lists:
+        scopes.append('list')
+    invalidate_pages(scopes)
+
+
+class AnonymousPageCacheMixin:
+    """
+    Cacheia a resposta inteira de GET/HEAD para visitantes sem cookie de
+    sessão (logo, anônimos). Requisições com sessão sempre passam pela view,
+    e respostas que gravam cookies nunca entram no cache.
+    """
+
+    # Cookies que indicam que a página pode ser personalizada para o visitante
+    # (ou, no caso de PIN_COOKIE, que ele precisa ver a própria escrita)
+    page_cache_bypass_cookies = ('messages', PIN_COOKIE)
+
+    def get_page_cache_scope(self):
+        raise NotImplementedError
+
+    def get_page_cache_variant(self):
+        return ''
+
+    def page_cache_applies(self, request):
+        if not page_cache_enabled() or request.method not in ('GET', 'HEAD'):
+            return False
+        cookies = {settings.SESSION_COOKIE_NAME, *self.page_cache_bypass_cookies}
+        return not any(name in request.COOKIES for name in cookies)
+
+    def cached_page_response(self, request, response):
+        # A resposta guardada já traz ETag/Last-Modified: o 304 sai sem query
+        return get_conditional_response(
+            request,
+            etag=response.get('ETag'),
+            last_modified=parse_http_date_safe(response.get('Last-Modified', '')),
+            response=response,
+        )
+
+    def page_is_cacheable(self, response):
+        return response.status_code == 200 and not response.cookies and not response.streaming
+
+    def page_cache_timeout(self):
+        return getattr(settings, 'POSTS_PAGE_CACHE_TIMEOUT', 600)
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.page_cache_applies(request):
+            response = super().dispatch(request, *args, **kwargs)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+
+        cache = get_page_cache()
+        key = page_cache_key(request, self.get_page_cache_scope(), self.get_page_cache_variant())
+        response = cache.get(key)
+        page_stats.record(response is not None)
+        if response is not None:
+            return self.cached_page_response(request, response)
+
+        # A página vai para o cache compartilhado: validadores e conteúdo vêm
+        # do primário, senão uma réplica atrasada gravaria a versão anterior
+        # a uma escrita sob a versão de escopo que o purge acabou de trocar
+        with replica_reads(None):
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                response.render()
+        patch_vary_headers(response, ('Cookie',))
+        if self.page_is_cacheable(response):
+            store = lambda r: cache.set(key, r, self.page_cache_timeout())
+            if hasattr(response, 'render') and callable(response.render):
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+        return response
+
+
+class AsyncAnonymousPageCacheMixin(AnonymousPageCacheMixin):
+    """
+    O mesmo cache de página para views async: usa a API async do cache e
+    espera que a view devolva a resposta já renderizada.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        if not self.page_cache_applies(request):
+            response = await self.dispatch_uncached(request, *args, **kwargs)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+
+        cache = get_page_cache()
+        key = await apage_cache_key(request, self.get_page_cache_scope(), self.get_page_cache_variant())
+        response = await cache.aget(key)
+        page_stats.record(response is not None)
+        if response is not None:
+            return self.cached_page_response(request, response)
+
+        # Como na versão síncrona: o que vai para o cache é lido no primário
+        with replica_reads(None):
+            response = await self.dispatch_uncached(request, *args, **kwargs)
+        patch_vary_headers(response, ('Cookie',))
+        if self.page_is_cacheable(response):
+            await cache.aset(key, response, self.page_cache_timeout())
+        return response
+
+    async def dispatch_uncached(self, request, *args, **kwargs):
+        # Pula o dispatch síncrono de AnonymousPageCacheMixin na MRO
+        return await super(AnonymousPageCacheMixin, self).dispatch(request, *args, **kwargs)
+
+
+def cache_stats():
+    # Exposto em /metrics/ e /metrics/prometheus/ (por processo)
+    return {'fragments': fragment_stats.as_dict(), 'pages': page_stats.as_dict()}
+
+
+# ----------------------------------------------------
+# GET CONDICIONAL (ETag / Last-Modified / 304)
+# ----------------------------------------------------
+class ConditionalGetMixin:
+    """
+    Calcula ETag e Last-Modified antes de renderizar qualquer coisa (uma
+    query leve, definida em get_validators) e responde 304 quando o cliente
+    já tem a versão atual. Vem depois de AnonymousPageCacheMixin, que
+    responde sozinho às requisições condicionais de páginas já cacheadas.
+    """
+
+    def get_validators(self):
+        # Retorna (etag_base, last_modified) ou (None, None) se não se aplica
+        raise NotImplementedError
+
+    def _session_fingerprint(self):
+        # Páginas de quem tem sessão são personalizadas (nome no cabeçalho,
+        # botões do autor); o cookie de sessão entra no ETag sem tocar o banco
+        session = self.request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        return hashlib.md5(session.encode()).hexdigest()[:12] if session else None
+
+    def conditional_headers(self, etag_base, last_modified):
+        # (etag, timestamp) a partir dos validadores da view
+        fingerprint = self._session_fingerprint()
+        if fingerprint:
+            etag_base = f'{etag_base}:{fingerprint}'
+            # Last-Modified não diferencia usuários: só o ETag vale aqui
+            last_modified = None
+        etag = quote_etag(hashlib.md5(etag_base.encode()).hexdigest())
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        return etag, timestamp
+
+    def finish_conditional(self, response, etag, timestamp):
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+
+        etag_base, last_modified = self.get_validators()
+        if etag_base is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        etag, timestamp = self.conditional_headers(etag_base, last_modified)
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        return self.finish_conditional(response, etag, timestamp)
+
+
+class AsyncConditionalGetMixin(ConditionalGetMixin):
+    # Versão async: os validadores vêm de aget_validators (ORM async)
+
+    async def aget_validators(self):
+        raise NotImplementedError
+
+    async def dispatch(self, request, *args, **kwargs):
+        dispatch = super(ConditionalGetMixin, self).dispatch
+        if request.method not in ('GET', 'HEAD'):
+            return await dispatch(request, *args, **kwargs)
+
+        etag_base, last_modified = await self.aget_validators()
+        if etag_base is None:
+            return await dispatch(request, *args, **kwargs)
+
+        etag, timestamp = self.conditional_headers(etag_base, last_modified)
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = await dispatch(request, *args, **kwargs)
+        return self.finish_conditional(response, etag, timestamp)
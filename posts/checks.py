@@ -0,0 +1,43 @@
+# posts/checks.py
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Backends de cache que vivem dentro de cada processo
+PER_PROCESS_CACHES = ('django.core.cache.backends.locmem.LocMemCache',)
+
+# Engines de sessão que leem a sessão do cache SESSION_CACHE_ALIAS
+CACHED_SESSION_ENGINES = (
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+
+def is_per_process(alias):
+    return settings.CACHES.get(alias, {}).get('BACKEND') in PER_PROCESS_CACHES
+
+
+@register(Tags.caches)
+def check_shared_session_caches(app_configs, **kwargs):
+    """
+    Sessão e usuário em cache precisam de um cache compartilhado: num cache
+    por processo, um logout, uma senha nova ou uma desativação só valem no
+    worker que os atendeu, e os outros seguem aceitando a sessão antiga até
+    a entrada expirar.
+    """
+    errors = []
+    if settings.SESSION_ENGINE in CACHED_SESSION_ENGINES and is_per_process(settings.SESSION_CACHE_ALIAS):
+        errors.append(Error(
+            f"SESSION_ENGINE '{settings.SESSION_ENGINE}' com o cache '{settings.SESSION_CACHE_ALIAS}' "
+            'por processo: com vários workers um logout não chega aos outros.',
+            hint="Configure POSTS_SESSION_CACHE_LOCATION (Redis) ou use POSTS_SESSION_STRATEGY='db'.",
+            id='posts.E001',
+        ))
+    user_cache = getattr(settings, 'POSTS_USER_CACHE', None)
+    if user_cache and is_per_process(user_cache):
+        errors.append(Error(
+            f"POSTS_USER_CACHE '{user_cache}' é um cache por processo: uma senha nova ou uma "
+            'desativação não chega aos outros workers.',
+            hint='Aponte POSTS_USER_CACHE para um cache compartilhado ou deixe None.',
+            id='posts.E002',
+        ))
+    return errors
@@ -0,0 +1,140 @@
+# posts/counters.py
+from django.db import transaction
+from django.dispatch import Signal
+from django.db.models import Count, F, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import AuthorStats, Comment, ContentVersion, Post
+
+# Enviado por set_comments_approval com os ids dos posts cujos comentários
+# visíveis mudaram (update em massa não dispara post_save)
+comments_approval_changed = Signal()
+
+
+def approved_count_subquery():
+    # COUNT dos comentários aprovados de cada post, para usar em UPDATE/annotate
+    return Coalesce(
+        Subquery(
+            Comment.objects.filter(post=OuterRef('pk'), approved=True)
+            .order_by()
+            .values('post')
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        Value(0),
+    )
+
+
+def adjust_approved_comment_count(post_id, delta):
+    # Incremento atômico no banco (F), sem ler o valor atual
+    if delta:
+        Post.objects.filter(pk=post_id).update(
+            approved_comment_count=F('approved_comment_count') + delta
+        )
+
+
+def recount_approved_comments(post_ids):
+    # Recalcula o contador de vários posts em um único UPDATE
+    return Post.objects.filter(pk__in=post_ids).update(
+        approved_comment_count=approved_count_subquery()
+    )
+
+
+def set_comments_approval(queryset, approved):
+    """
+    Aprova/reprova em massa (queryset.update() não dispara sinais) e
+    recalcula o contador só dos posts afetados, tudo na mesma transação.
+    Retorna quantos comentários mudaram de estado.
+    """
+    with transaction.atomic():
+        changed = queryset.exclude(approved=approved)
+        post_ids = list(changed.order_by().values_list('post_id', flat=True).distinct())
+        updated = changed.update(approved=approved)
+        if updated:
+            recount_approved_comments(post_ids)
+            comments_approval_changed.send(sender=Comment, post_ids=post_ids)
+    return updated
+
+
+def set_comments_approval_in_batches(queryset, approved, batch_size=1000):
+    """
+    set_comments_approval em lotes de `batch_size` comentários, cada um na
+    sua transação: aprovar "todos os selecionados" no admin com milhões de
+    linhas não segura o lock de escrita até o fim. Os lotes seguem a chave
+    primária; um lote que falha não desfaz os anteriores.
+    """
+    pending = queryset.exclude(approved=approved).order_by('pk')
+    updated = last = 0
+    while True:
+        ids = list(pending.filter(pk__gt=last).values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return updated
+        updated += set_comments_approval(Comment.objects.filter(pk__in=ids), approved)
+        last = ids[-1]
+
+
+# ----------------------------------------------------
+# VERSÃO DA LISTA DE POSTS (ETag/Last-Modified)
+# ----------------------------------------------------
+LIST_VERSION = 'list'
+
+
+def bump_content_version(name=LIST_VERSION):
+    # Um UPDATE pela chave primária, na transação da mudança; a primeira
+    # vez cria a linha
+    now = timezone.now()
+    if not ContentVersion.objects.filter(name=name).update(version=F('version') + 1, changed_at=now):
+        ContentVersion.objects.bulk_create([ContentVersion(name=name, version=1, changed_at=now)],
+                                           ignore_conflicts=True)
+
+
+def content_version(name=LIST_VERSION):
+    # (version, changed_at) para .first()/.afirst(); None antes da primeira mudança
+    return ContentVersion.objects.filter(name=name).values_list('version', 'changed_at')
+
+
+# ----------------------------------------------------
+# ESTATÍSTICAS POR AUTOR
+# ----------------------------------------------------
+def latest_post_subquery():
+    # created_at do post publicado mais recente do autor: uma busca no índice
+    # (author, status, created_at, id), sem ler os outros posts
+    return Subquery(
+        Post.objects.filter(author=OuterRef('author'), status='published')
+        .order_by('-created_at').values('created_at')[:1]
+    )
+
+
+def adjust_author_stats(author_id, delta):
+    """
+    Soma `delta` ao total de posts publicados do autor e atualiza a data do
+    último post, num único UPDATE. Autor ainda sem linha: recalcula (cria).
+    """
+    if not delta:
+        return
+    updated = AuthorStats.objects.filter(author_id=author_id).update(
+        post_count=F('post_count') + delta, latest_post_at=latest_post_subquery(),
+    )
+    if not updated:
+        recount_author_stats([author_id])
+
+
+def recount_author_stats(author_ids):
+    # Recalcula (ou cria) as estatísticas de vários autores: uma agregação e um upsert
+    author_ids = set(author_ids)
+    if not author_ids:
+        return
+    totals = {
+        row['author']: row
+        for row in Post.objects.filter(author__in=author_ids, status='published')
+        .order_by().values('author').annotate(total=Count('pk'), latest=Max('created_at'))
+    }
+    AuthorStats.objects.bulk_create(
+        [
+            AuthorStats(author_id=pk, post_count=totals.get(pk, {}).get('total', 0),
+                        latest_post_at=totals.get(pk, {}).get('latest'))
+            for pk in author_ids
+        ],
+        update_conflicts=True, unique_fields=['author'], update_fields=['post_count', 'latest_post_at'],
+    )
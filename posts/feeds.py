@@ -0,0 +1,92 @@
+# posts/feeds.py
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse, reverse_lazy
+from django.utils.feedgenerator import Atom1Feed
+
+from .models import Post
+
+# Itens por feed: leitores de feed só olham os mais recentes
+FEED_LIMIT = 20
+
+
+def feed_posts(author=None):
+    # Os mesmos dados dos cards (resumo, sem o corpo), na ordem da lista
+    queryset = (
+        Post.objects.filter(status='published').select_related('author')
+        .defer('content', 'content_html').order_by('-created_at', '-id')
+    )
+    return queryset.filter(author=author) if author is not None else queryset
+
+
+def feed_validators(scope, username=None):
+    """
+    ETag/Last-Modified de um feed a partir de (id, updated_at) dos itens que
+    ele mostraria: uma leitura de FEED_LIMIT linhas pelo índice, sem COUNT e
+    sem montar o XML. Qualquer item novo, editado ou removido muda o ETag.
+    """
+    queryset = Post.objects.filter(status='published')
+    if username is not None:
+        queryset = queryset.filter(author__username=username)
+    rows = list(queryset.order_by('-created_at', '-id').values_list('pk', 'updated_at')[:FEED_LIMIT])
+    if not rows:
+        return None, None  # feed vazio ou autor inexistente: resposta normal
+    items = ','.join(f'{pk}:{updated_at.timestamp()}' for pk, updated_at in rows)
+    return f'feed:{scope}:{items}', max(updated_at for _, updated_at in rows)
+
+
+class LatestPostsFeed(Feed):
+    title = 'Meu Blog em Django'
+    link = reverse_lazy('post_list')
+    description = 'Posts publicados mais recentes.'
+
+    def items(self):
+        return feed_posts()[:FEED_LIMIT]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt
+
+    def item_pubdate(self, item):
+        return item.created_at
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.username
+
+    def item_author_link(self, item):
+        return reverse('author_posts', args=[item.author.username])
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(get_user_model(), username=username, is_active=True)
+
+    def title(self, obj):
+        return f'Posts de {obj.username}'
+
+    def link(self, obj):
+        return reverse('author_posts', args=[obj.username])
+
+    def description(self, obj):
+        return f'Posts publicados mais recentes de {obj.username}.'
+
+    def items(self, obj):
+        return feed_posts(obj)[:FEED_LIMIT]
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
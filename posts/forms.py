@@ -1,6 +1,9 @@
 # posts/forms.py
 from django import forms
+from django.db import transaction
+
 from .models import Comment, Post
+from .tags import parse_tag_names, set_post_tags
 
 class CommentForm(forms.ModelForm):
     # O conteúdo do comentário será a única coisa visível/editável pelo usuário
@@ -17,6 +20,17 @@ class CommentForm(forms.ModelForm):
         }
 
 class PostForm(forms.ModelForm):
+    # Tags digitadas separadas por vírgula; as que ainda não existem são criadas
+    tags = forms.CharField(
+        required=False,
+        label='Tags',
+        help_text='Separadas por vírgula, no máximo 10.',
+        widget=forms.TextInput(attrs={
+            'class': 'w-full px-4 py-2 border border-slate-300 rounded-lg focus:ring-primary focus:border-primary transition duration-150',
+            'placeholder': 'django, python, performance'
+        }),
+    )
+
     class Meta:
         model = Post
         fields = ('title', 'content', 'status')
@@ -38,4 +52,21 @@ class PostForm(forms.ModelForm):
             'status': forms.Select(attrs={
                 'class': 'w-full px-4 py-2 border border-slate-300 rounded-lg focus:ring-primary focus:border-primary transition duration-150',
             }),
-        }
\ No newline at end of file
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Tags atuais (id -> nome): preenchem o campo e poupam uma leitura no save
+        self.current_tags = dict(self.instance.tags.values_list('pk', 'name')) if self.instance.pk else {}
+        self.initial.setdefault('tags', ', '.join(self.current_tags.values()))
+
+    def clean_tags(self):
+        return parse_tag_names(self.cleaned_data['tags'])
+
+    def save(self, commit=True):
+        # Post e tags na mesma transação; sem mudança no campo, nenhuma query a mais
+        with transaction.atomic(savepoint=False):
+            post = super().save(commit)
+            if commit and 'tags' in self.changed_data:
+                set_post_tags(post, self.cleaned_data['tags'], current=set(self.current_tags))
+        return post
@@ -0,0 +1,174 @@
+# posts/management/commands/benchmark_admin.py
+import random
+import time
+from datetime import datetime, timedelta
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from posts.bulk import chunked, preserve_auto_timestamps
+from posts.counters import recount_approved_comments, set_comments_approval, set_comments_approval_in_batches
+from posts.models import Comment, Post
+from posts.templatetags.post_admin import IndexedDates
+
+User = get_user_model()
+
+# Conteúdo dos comentários criados pelo benchmark
+MARKER = '[benchmark_admin]'
+
+
+class CommentAdminBefore(admin.ModelAdmin):
+    # A configuração antiga de posts/admin.py, para comparar
+    list_display = ('post', 'author', 'created_at', 'approved')
+    list_filter = ('approved', 'created_at')
+
+
+class PostAdminBefore(admin.ModelAdmin):
+    list_display = ('title', 'author', 'status', 'created_at')
+    list_filter = ('status', 'created_at', 'author')
+
+
+class Command(BaseCommand):
+    help = ('Mede as changelists do admin de comentários e posts com a configuração '
+            'antiga e a atual (queries por página, COUNTs e tempo), em páginas sem '
+            'filtro, filtradas, por autor e no date_hierarchy; e a aprovação em massa '
+            'numa transação só contra os lotes. Cria os comentários que faltarem.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comments', type=int, default=1000000,
+                            help='Comentários no banco (cria os que faltarem).')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Quantas vezes cada medida é repetida (usa a mediana).')
+        parser.add_argument('--approve', type=int, default=50000,
+                            help='Comentários pendentes aprovados na medida da ação em massa.')
+
+    def handle(self, *args, **options):
+        self.ensure_comments(options['comments'])
+        superuser = User.objects.filter(is_superuser=True).first()
+        if superuser is None:
+            raise CommandError('Crie um superusuário antes (createsuperuser).')
+        self.user = superuser
+        self.repeat = options['repeat']
+        self.stdout.write(f'{Comment.objects.count()} comentários, {Post.objects.count()} posts, '
+                          f'{User.objects.count()} usuários\n')
+
+        before = admin.AdminSite(name='antes')
+        author = Comment.objects.order_by('-pk').values_list('author_id', flat=True).first()
+        year = str(timezone.localtime().year)
+        pages = [
+            ('comentários', Comment, CommentAdminBefore, [
+                ('sem filtro', {}), ('pendentes', {'approved__exact': '0'}),
+                ('por autor', {'author__id__exact': author}), ('ano', {'created_at__year': year}),
+            ]),
+            ('posts', Post, PostAdminBefore, [
+                ('sem filtro', {}), ('publicados', {'status__exact': 'published'}),
+                ('por autor', {'author__id__exact': author}),
+            ]),
+        ]
+        self.stdout.write(f'{"changelist":<12} {"página":<11} {"config.":<7} {"queries":>8} '
+                          f'{"COUNTs":>7} {"ms":>9}')
+        for name, model, before_class, cases in pages:
+            configurations = [('antes', before_class(model, before)), ('depois', admin.site._registry[model])]
+            for case, params in cases:
+                for label, model_admin in configurations:
+                    queries, counts, ms = self.measure_changelist(model_admin, params)
+                    self.stdout.write(f'{name:<12} {case:<11} {label:<7} {queries:>8} {counts:>7} {ms:>9.1f}')
+
+        self.measure_date_hierarchy(year)
+        self.measure_approval(options['approve'])
+
+    def measure_date_hierarchy(self, year):
+        # Os períodos do menu: SELECT DISTINCT de Django contra os saltos no índice
+        self.stdout.write(f'\n{"date_hierarchy":<24} {"DISTINCT (ms)":>14} {"índice (ms)":>12}')
+        # O filtro de ano como a changelist aplica: um intervalo no fuso atual
+        start = timezone.make_aware(datetime(int(year), 1, 1))
+        in_year = Comment.objects.filter(created_at__gte=start, created_at__lt=start.replace(year=start.year + 1))
+        for name, queryset, kind in (
+            ('comentários por ano', Comment.objects.all(), 'year'),
+            ('comentários por mês', in_year, 'month'),
+            ('posts por ano', Post.objects.all(), 'year'),
+        ):
+            indexed = IndexedDates(queryset, 'created_at')
+            distinct = self.measure(lambda: list(queryset.datetimes('created_at', kind)))
+            seeks = self.measure(lambda: list(indexed.datetimes('created_at', kind)))
+            self.stdout.write(f'{name:<24} {distinct:>14.1f} {seeks:>12.1f}')
+
+    def measure(self, func):
+        timings = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        return timings[len(timings) // 2]
+
+    def measure_changelist(self, model_admin, params):
+        factory = RequestFactory()
+        timings = []
+        for _ in range(self.repeat):
+            request = factory.get('/admin/', params)
+            request.user = self.user
+            reset_queries()
+            start = time.perf_counter()
+            with CaptureQueriesContext(connection) as captured:
+                model_admin.changelist_view(request).render()
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        counts = sum(1 for query in captured if 'COUNT(' in query['sql'])
+        return len(captured), counts, timings[len(timings) // 2]
+
+    def measure_approval(self, count):
+        pending = Comment.objects.filter(approved=False, content=MARKER).order_by('pk')
+        ids = list(pending.values_list('pk', flat=True)[:count])
+        if not ids:
+            return
+        # Como um "selecionar todos" da changelist: um filtro, não uma lista de ids
+        selected = Comment.objects.filter(pk__gte=ids[0], pk__lte=ids[-1])
+        self.stdout.write(f'\n{"aprovar " + str(len(ids)) + " comentários":<34} {"total (s)":>10} '
+                          f'{"maior lock (ms)":>16}')
+        # Antes: uma transação só (desfeita no fim, para medir a outra forma nos mesmos comentários)
+        start = time.perf_counter()
+        with transaction.atomic():
+            set_comments_approval(selected, True)
+            single = time.perf_counter() - start
+            transaction.set_rollback(True)
+        self.stdout.write(f'{"uma transação (antes)":<34} {single:>10.2f} {single * 1000:>16.1f}')
+
+        start = time.perf_counter()
+        set_comments_approval_in_batches(selected, True, 1000)
+        batched = time.perf_counter() - start
+        # O maior lock é o de um lote; medido à parte, revertendo 1000 deles
+        start = time.perf_counter()
+        set_comments_approval(Comment.objects.filter(pk__in=ids[:1000]), False)
+        batch = time.perf_counter() - start
+        for chunk in chunked(ids[1000:], 1000):
+            set_comments_approval(Comment.objects.filter(pk__in=chunk), False)
+        self.stdout.write(f'{"lotes de 1000 (depois)":<34} {batched:>10.2f} {batch * 1000:>16.1f}')
+
+    def ensure_comments(self, count, batch_size=10000):
+        missing = count - Comment.objects.count()
+        if missing <= 0:
+            return
+        authors = list(User.objects.order_by('pk').values_list('pk', flat=True)[:500])
+        posts = list(Post.objects.filter(status='published').order_by('-created_at').values_list('pk', flat=True)[:20000])
+        if not authors or not posts:
+            raise CommandError('Sem usuários ou posts publicados: rode seed_blog antes.')
+        self.stdout.write(f'Criando {missing} comentários...')
+        rng = random.Random(24)
+        # Espalhados pelos últimos três anos, 90% aprovados
+        now = timezone.now()
+        with preserve_auto_timestamps(Comment):
+            for offset in range(0, missing, batch_size):
+                with transaction.atomic():
+                    Comment.objects.bulk_create([
+                        Comment(post_id=rng.choice(posts), author_id=rng.choice(authors), content=MARKER,
+                                approved=rng.random() < 0.9,
+                                created_at=now - timedelta(seconds=rng.randrange(3 * 365 * 86400)))
+                        for _ in range(min(batch_size, missing - offset))
+                    ], batch_size=1000)
+        recount_approved_comments(posts)
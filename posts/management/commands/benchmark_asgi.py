@@ -0,0 +1,136 @@
+# posts/management/commands/benchmark_asgi.py
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from importlib.util import find_spec
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from posts.models import Post
+
+# Valor de POSTS_ASYNC_VIEWS em cada cenário
+MODES = {
+    'sync': '',
+    'async': 'post_list,post_detail',
+}
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+class Command(BaseCommand):
+    help = ('Sobe o uvicorn com as views síncronas e depois com as async e mede '
+            'vazão e latência (p50/p99) da lista e do detalhe sob alta concorrência.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=64)
+        parser.add_argument('--requests', type=int, default=2000, help='Requisições por cenário.')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--posts', type=int, default=20, help='Quantos posts publicados visitar.')
+        parser.add_argument('--modes', default='sync,async')
+
+    def handle(self, *args, **options):
+        if find_spec('uvicorn') is None:
+            raise CommandError('O benchmark precisa do uvicorn (pip install uvicorn).')
+        modes = [mode for mode in options['modes'].split(',') if mode]
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f'Modos desconhecidos: {", ".join(sorted(unknown))}')
+
+        slugs = list(Post.objects.filter(status='published').order_by('-created_at')
+                     .values_list('slug', flat=True)[:options['posts']])
+        if not slugs:
+            raise CommandError('Sem posts publicados: rode import_blog antes.')
+        paths = [reverse('post_list')] + [reverse('post_detail', args=[slug]) for slug in slugs]
+
+        self.stdout.write(f'{options["concurrency"]} conexões, {options["requests"]} requisições por cenário')
+        self.stdout.write(f'{"views":<6} {"req/s":>9} {"p50 ms":>9} {"p99 ms":>9} {"erros":>6}')
+        for mode in modes:
+            with self.server(mode, options['port']):
+                # Aquecimento: conexões, templates compilados, caches do processo
+                asyncio.run(self.load(options['port'], paths, len(paths) * 2, 4))
+                elapsed, latencies, errors = asyncio.run(
+                    self.load(options['port'], paths, options['requests'], options['concurrency'])
+                )
+            self.stdout.write(
+                f'{mode:<6} {len(latencies) / elapsed:>9.0f} {percentile(latencies, 0.5) * 1000:>9.1f} '
+                f'{percentile(latencies, 0.99) * 1000:>9.1f} {errors:>6}'
+            )
+
+    def server(self, mode, port, **extra_env):
+        command = self
+
+        class Server:
+            def __enter__(self):
+                env = {**os.environ, 'POSTS_ASYNC_VIEWS': MODES[mode],
+                       'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE),
+                       **extra_env}
+                self.process = subprocess.Popen(
+                    [sys.executable, '-m', 'uvicorn', 'blogproject.asgi:application',
+                     '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning', '--no-access-log'],
+                    cwd=settings.BASE_DIR, env=env,
+                )
+                command.wait_for_port(port, self.process)
+                return self
+
+            def __exit__(self, *exc):
+                self.process.terminate()
+                self.process.wait(timeout=10)
+
+        return Server()
+
+    def wait_for_port(self, port, process, timeout=15):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError('O uvicorn terminou antes de aceitar conexões.')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+                return
+            except OSError:
+                time.sleep(0.1)
+        process.terminate()
+        raise CommandError(f'O uvicorn não abriu a porta {port} em {timeout}s.')
+
+    async def load(self, port, paths, total, concurrency):
+        latencies = []
+        errors = 0
+        counter = iter(range(total))
+
+        async def client():
+            nonlocal errors
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            try:
+                for i in counter:
+                    path = paths[i % len(paths)]
+                    start = time.perf_counter()
+                    writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+                    status = await self.read_response(reader)
+                    if status == 200:
+                        latencies.append(time.perf_counter() - start)
+                    else:
+                        errors += 1
+            finally:
+                writer.close()
+
+        start = time.perf_counter()
+        await asyncio.gather(*[client() for _ in range(concurrency)])
+        return time.perf_counter() - start, latencies, errors
+
+    async def read_response(self, reader):
+        # HTTP/1.1 com keep-alive: status, cabeçalhos e um corpo com Content-Length
+        head = await reader.readuntil(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        status = int(lines[0].split()[1])
+        headers = dict(line.split(': ', 1) for line in lines[1:] if ': ' in line)
+        length = int({k.lower(): v for k, v in headers.items()}.get('content-length', 0))
+        if length:
+            await reader.readexactly(length)
+        return status
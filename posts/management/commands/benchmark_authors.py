@@ -0,0 +1,129 @@
+# posts/management/commands/benchmark_authors.py
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.bulk import preserve_auto_timestamps
+from posts.counters import recount_author_stats
+from posts.models import AuthorStats, Post
+from posts.pagination import KeysetPaginator, encode_cursor
+from posts.rendering import rendered_fields
+from posts.views import AuthorPostsView
+
+from .benchmark_pagination import Command as PaginationBenchmarkCommand
+
+User = get_user_model()
+
+# Marca do post criado e apagado na medição dos sinais
+MARKER = '[benchmark_authors]'
+
+
+class Command(PaginationBenchmarkCommand):
+    help = ('Mede o arquivo de um autor prolífico (/author/<username>/): estatísticas '
+            'mantidas (AuthorStats) contra COUNT/MAX na hora, páginas por cursor e por '
+            'offset em várias profundidades, a requisição inteira e o custo dos sinais '
+            'ao publicar e apagar um post. Cria os posts do autor se faltarem.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', default='autor_prolifico')
+        parser.add_argument('--posts', type=int, default=100000,
+                            help='Posts publicados que o autor deve ter (cria os que faltarem).')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Quantas vezes cada medida é repetida (usa a mediana).')
+        parser.add_argument('--depths', default='1,10,100,1000,10000',
+                            help='Páginas a medir, separadas por vírgula.')
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        author = self.ensure_author(options['username'], options['posts'])
+        queryset = Post.objects.filter(author=author, status='published').order_by('-created_at', '-id')
+        per_page = AuthorPostsView.paginate_by
+        total = queryset.count()
+        self.stdout.write(f'{author.username}: {total} posts publicados, {per_page} por página\n')
+
+        stored = self.measure(repeat, lambda: AuthorStats.objects.get(author=author))
+        computed = self.measure(repeat, lambda: queryset.aggregate(total=Count('pk'), latest=Max('created_at')))
+        self.stdout.write(f'{"estatísticas":<28} {"mantidas (ms)":>14} {"COUNT/MAX (ms)":>15}')
+        self.stdout.write(f'{"total e último post":<28} {stored:>14.2f} {computed:>15.2f}\n')
+
+        self.stdout.write(f'{"página":>10} {"offset (ms)":>14} {"cursor (ms)":>14} {"requisição (ms)":>16}')
+        client = Client()
+        url = reverse('author_posts', args=[author.username])
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        with override_settings(ALLOWED_HOSTS=hosts, POSTS_PAGE_CACHE_ENABLED=False):
+            for depth in [int(d) for d in options['depths'].split(',')]:
+                if (depth - 1) * per_page >= total:
+                    break
+                offset_ms = self.measure(repeat, lambda: self.offset_page(queryset, per_page, depth))
+                cursor = ''
+                if depth > 1:
+                    boundary = queryset.only('created_at', 'id')[(depth - 1) * per_page - 1]
+                    cursor = encode_cursor([boundary.created_at.isoformat(), boundary.id], 'n')
+                paginator = KeysetPaginator(queryset, per_page)
+                cursor_ms = self.measure(repeat, lambda: list(paginator.page(cursor or None)))
+                request_ms = self.measure(repeat, lambda: client.get(url, {'cursor': cursor} if cursor else {}))
+                self.stdout.write(f'{depth:>10} {offset_ms:>14.2f} {cursor_ms:>14.2f} {request_ms:>16.2f}')
+
+        if connection.vendor == 'sqlite':
+            deep = KeysetPaginator(queryset, per_page).get_queryset(cursor or None)[1]
+            self.stdout.write(f'\nPlano da página mais funda: {deep.explain()}')
+
+        self.measure_signals(author, repeat)
+
+    def measure_signals(self, author, repeat):
+        # Publicar e apagar atualizam AuthorStats com um UPDATE cada, sem COUNT
+        timings = {'publicar': [], 'apagar': []}
+        queries = {}
+        for i in range(repeat):
+            start = time.perf_counter()
+            with CaptureQueriesContext(connection) as captured:
+                post = Post.objects.create(author=author, title=f'{MARKER} {i}', slug=f'benchmark-authors-{i}',
+                                           content=MARKER, status='published')
+            timings['publicar'].append((time.perf_counter() - start) * 1000)
+            queries['publicar'] = len(captured)
+            start = time.perf_counter()
+            with CaptureQueriesContext(connection) as captured:
+                post.delete()
+            timings['apagar'].append((time.perf_counter() - start) * 1000)
+            queries['apagar'] = len(captured)
+        self.stdout.write(f'\n{"post do autor":<14} {"ms":>8} {"queries":>8}')
+        for name, values in timings.items():
+            values.sort()
+            self.stdout.write(f'{name:<14} {values[len(values) // 2]:>8.2f} {queries[name]:>8}')
+
+    def ensure_author(self, username, count, batch_size=5000):
+        author, _ = User.objects.get_or_create(username=username)
+        existing = Post.objects.filter(author=author, status='published').count()
+        if existing >= count:
+            return author
+        self.stdout.write(f'Criando {count - existing} posts para {username}...')
+        content = 'Lorem ipsum dolor sit amet. ' * 20
+        rendered = rendered_fields(content)
+        # Um post a cada 10 minutos, do mais recente para trás
+        now = timezone.now()
+        with preserve_auto_timestamps(Post):
+            for offset in range(existing, count, batch_size):
+                with transaction.atomic():
+                    Post.objects.bulk_create([
+                        Post(
+                            author=author,
+                            title=f'Post {n} de {username}',
+                            slug=f'{username.replace("_", "-")}-{n}',
+                            content=content,
+                            status='published',
+                            created_at=now - timedelta(minutes=10 * n),
+                            updated_at=now - timedelta(minutes=10 * n),
+                            **rendered,
+                        )
+                        for n in range(offset, min(offset + batch_size, count))
+                    ], batch_size=1000)
+        recount_author_stats([author.pk])
+        return author
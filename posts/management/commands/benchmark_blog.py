@@ -0,0 +1,299 @@
+# posts/management/commands/benchmark_blog.py
+import json
+import platform
+import re
+import resource
+import subprocess
+import time
+import tracemalloc
+import urllib.request
+from datetime import datetime, timezone as dt_timezone
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Post
+from posts.pagination import KeysetPaginator
+from posts.search import tokenize
+from posts.views import PostDetailView, PostListView, comment_page
+
+User = get_user_model()
+
+# Marca do conteúdo criado pelo benchmark (apagado no final)
+MARKER = '[benchmark_blog]'
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Scenario:
+    def __init__(self, name, method, url, data=None, logged_in=False, prepare=None):
+        self.name = name
+        self.method = method
+        self.url = url            # str ou função(i) -> str
+        self.data = data          # dict, função(i) -> dict ou None
+        self.logged_in = logged_in
+        self.prepare = prepare    # função(total) chamada antes, fora da medição
+
+    def url_for(self, i):
+        return self.url(i) if callable(self.url) else self.url
+
+    def data_for(self, i):
+        return self.data(i) if callable(self.data) else self.data
+
+
+class Command(BaseCommand):
+    help = ('Mede lista, detalhe, busca, comentário e CRUD de posts pelo cliente de '
+            'testes (ou um servidor local) e grava percentis de latência, queries por '
+            'requisição e memória em JSON, para comparar entre commits.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100, help='Requisições por cenário.')
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--scenarios', default='', help='Nomes separados por vírgula (padrão: todos).')
+        parser.add_argument('--memory-iterations', type=int, default=10,
+                            help='Requisições medidas com tracemalloc (0 desliga).')
+        parser.add_argument('--base-url', default='',
+                            help='Servidor já rodando (ex.: http://127.0.0.1:8000); só cenários GET.')
+        parser.add_argument('--output', default='', help='Arquivo JSON com os resultados.')
+        parser.add_argument('--compare', default='', help='JSON de uma rodada anterior.')
+        parser.add_argument('--fail-on-regression', type=float, default=None, metavar='PCT',
+                            help='Falha se o p95 de algum cenário piorar mais que PCT%%.')
+
+    def handle(self, *args, **options):
+        self.setup_fixtures()
+        scenarios = self.build_scenarios()
+        if options['scenarios']:
+            wanted = options['scenarios'].split(',')
+            unknown = set(wanted) - {s.name for s in scenarios}
+            if unknown:
+                raise CommandError(f'Cenários desconhecidos: {", ".join(sorted(unknown))}')
+            scenarios = [s for s in scenarios if s.name in wanted]
+        if options['base_url']:
+            scenarios = [s for s in scenarios if s.method == 'get' and not s.logged_in]
+
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        results = {}
+        try:
+            # Sem o limite de escrita: os cenários de POST repetem o mesmo usuário
+            with override_settings(ALLOWED_HOSTS=hosts, POSTS_THROTTLE_ENABLED=False):
+                for scenario in scenarios:
+                    results[scenario.name] = self.run_scenario(scenario, options)
+                    self.report_line(scenario.name, results[scenario.name])
+        finally:
+            self.cleanup()
+
+        report = {
+            'meta': self.metadata(options),
+            'scenarios': results,
+            'rss_max_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, indent=2, sort_keys=True)
+            self.stdout.write(f'Resultados gravados em {options["output"]}')
+        if options['compare']:
+            self.compare(options['compare'], results, options['fail_on_regression'])
+
+    # ----------------------------------------------------
+    # DADOS E CENÁRIOS
+    # ----------------------------------------------------
+    def setup_fixtures(self):
+        published = Post.objects.filter(status='published')
+        total = published.count()
+        if not total:
+            raise CommandError('Sem posts publicados: rode seed_blog antes.')
+        self.user, _ = User.objects.get_or_create(username='benchmark')
+        self.hot = published.order_by('-approved_comment_count', 'pk').first()
+        self.cold = published.order_by('approved_comment_count', 'pk').first()
+        # Página do meio da lista (paginação profunda), no modo configurado
+        if PostListView().get_pagination_mode() == 'cursor':
+            middle = published.order_by('-created_at', '-id')[total // 2]
+            cursor = KeysetPaginator(published, 1).build_page([middle, middle], 'n').next_cursor
+            self.deep_query = f'cursor={cursor}'
+        else:
+            self.deep_query = f'page={total // 2 // PostListView.paginate_by + 1}'
+        # Segunda página dos comentários do post quente (carregada sob demanda)
+        self.comments_cursor = comment_page(self.hot, PostDetailView.comments_per_page).next_cursor
+        # Uma palavra frequente no título do post quente
+        self.search_term = (tokenize(self.hot.title) or ['django'])[0]
+        self.own_post = Post.objects.create(author=self.user, title=f'{MARKER} Editável',
+                                            slug='benchmark-blog-editavel', content=MARKER,
+                                            status='published')
+        self.to_delete = []
+
+    def build_scenarios(self):
+        def prepare_delete(total):
+            self.to_delete = [
+                Post.objects.create(author=self.user, title=f'{MARKER} Apagar {i}',
+                                    slug=f'benchmark-blog-apagar-{i}', content=MARKER).slug
+                for i in range(total)
+            ]
+
+        return [
+            Scenario('list', 'get', reverse('post_list')),
+            Scenario('list_deep', 'get', f"{reverse('post_list')}?{self.deep_query}"),
+            Scenario('detail_hot', 'get', self.hot.get_absolute_url()),
+            Scenario('detail_cold', 'get', self.cold.get_absolute_url()),
+            Scenario('comments_next', 'get',
+                     f"{reverse('post_comments', args=[self.hot.slug])}?cursor={self.comments_cursor or ''}"),
+            Scenario('detail_logged_in', 'get', self.hot.get_absolute_url(), logged_in=True),
+            Scenario('search', 'get', f"{reverse('post_search')}?q={self.search_term}"),
+            Scenario('feed', 'get', reverse('post_feed')),
+            Scenario('feed_author', 'get', reverse('author_feed', args=[self.hot.author.username])),
+            Scenario('sitemap_index', 'get', reverse('sitemap_index')),
+            Scenario('sitemap_shard', 'get', reverse('sitemap_shard', args=['posts', 0])),
+            Scenario('comment_post', 'post', self.hot.get_absolute_url(),
+                     data={'content': MARKER}, logged_in=True),
+            Scenario('post_create', 'post', reverse('post_create'), logged_in=True,
+                     data=lambda i: {'title': f'{MARKER} Novo {i}', 'content': MARKER, 'status': 'published'}),
+            Scenario('post_update', 'post', reverse('post_update', args=[self.own_post.slug]), logged_in=True,
+                     data=lambda i: {'title': self.own_post.title, 'content': f'{MARKER} {i}', 'status': 'published'}),
+            Scenario('post_delete', 'post', lambda i: reverse('post_delete', args=[self.to_delete[i]]),
+                     logged_in=True, prepare=prepare_delete),
+        ]
+
+    def cleanup(self):
+        Comment.objects.filter(content=MARKER).delete()
+        Post.objects.filter(title__startswith=MARKER).delete()
+
+    # ----------------------------------------------------
+    # EXECUÇÃO
+    # ----------------------------------------------------
+    def run_scenario(self, scenario, options):
+        warmup, iterations = options['warmup'], options['iterations']
+        memory_iterations = 0 if options['base_url'] else options['memory_iterations']
+        total = warmup + iterations + memory_iterations
+        if scenario.prepare:
+            scenario.prepare(total)
+        send = self.remote_sender(options['base_url']) if options['base_url'] else self.client_sender(scenario)
+
+        for i in range(warmup):
+            send(scenario, i)
+        latencies, queries, errors = [], [], 0
+        for i in range(warmup, warmup + iterations):
+            start = time.perf_counter()
+            status, count = send(scenario, i)
+            latencies.append((time.perf_counter() - start) * 1000)
+            queries.append(count)
+            errors += status >= 400
+
+        # Pico de memória alocada por requisição, numa passada separada
+        # (o tracemalloc deixa tudo mais lento e distorceria a latência)
+        peaks = []
+        for i in range(warmup + iterations, total):
+            tracemalloc.start()
+            send(scenario, i)
+            peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+            tracemalloc.stop()
+
+        return {
+            'requests': iterations,
+            'errors': errors,
+            'latency_ms': {
+                'p50': percentile(latencies, 0.5),
+                'p95': percentile(latencies, 0.95),
+                'p99': percentile(latencies, 0.99),
+                'mean': sum(latencies) / len(latencies) if latencies else 0.0,
+                'max': max(latencies, default=0.0),
+            },
+            'queries': {
+                'mean': sum(queries) / len(queries) if queries else 0.0,
+                'max': max(queries, default=0),
+            },
+            'memory_peak_kb': max(peaks) if peaks else None,
+        }
+
+    def client_sender(self, scenario):
+        client = Client()
+        if scenario.logged_in:
+            client.force_login(self.user)
+
+        def send(scenario, i):
+            with CaptureQueriesContext(connection) as captured:
+                response = getattr(client, scenario.method)(scenario.url_for(i), scenario.data_for(i) or {})
+                # Sitemap em streaming: o trabalho acontece enquanto a resposta é lida
+                for _ in getattr(response, 'streaming_content', ()):
+                    pass
+            return response.status_code, len(captured)
+        return send
+
+    def remote_sender(self, base_url):
+        def send(scenario, i):
+            # Queries vêm do cabeçalho Server-Timing (PerformanceMiddleware)
+            try:
+                with urllib.request.urlopen(base_url.rstrip('/') + scenario.url_for(i)) as response:
+                    response.read()
+                    status, timing = response.status, response.headers.get('Server-Timing', '')
+            except urllib.error.HTTPError as error:
+                status, timing = error.code, error.headers.get('Server-Timing', '')
+            match = re.search(r'desc="(\d+) queries"', timing)
+            return status, int(match.group(1)) if match else 0
+        return send
+
+    # ----------------------------------------------------
+    # RELATÓRIOS
+    # ----------------------------------------------------
+    def report_line(self, name, result):
+        if not hasattr(self, '_header'):
+            self._header = True
+            self.stdout.write(f'{"cenário":<18} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} '
+                              f'{"queries":>8} {"mem KB":>8} {"erros":>6}')
+        latency = result['latency_ms']
+        memory = f'{result["memory_peak_kb"]:.0f}' if result['memory_peak_kb'] is not None else '-'
+        self.stdout.write(f'{name:<18} {latency["p50"]:>8.2f} {latency["p95"]:>8.2f} {latency["p99"]:>8.2f} '
+                          f'{result["queries"]["mean"]:>8.1f} {memory:>8} {result["errors"]:>6}')
+
+    def metadata(self, options):
+        try:
+            commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR,
+                                    capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'commit': commit,
+            'timestamp': datetime.now(dt_timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'mode': 'server' if options['base_url'] else 'client',
+            'iterations': options['iterations'],
+            'dataset': {
+                'users': User.objects.count(),
+                'posts': Post.objects.count(),
+                'published': Post.objects.filter(status='published').count(),
+                'comments': Comment.objects.count(),
+            },
+        }
+
+    def compare(self, path, results, threshold):
+        with open(path, encoding='utf-8') as previous_file:
+            previous = json.load(previous_file)
+        self.stdout.write(f'\nComparado com {path} (commit {previous["meta"].get("commit")}):')
+        self.stdout.write(f'{"cenário":<18} {"p50 Δ%":>8} {"p95 Δ%":>8} {"queries Δ":>10}')
+        regressions = []
+        for name, result in results.items():
+            old = previous['scenarios'].get(name)
+            if old is None:
+                continue
+            deltas = {
+                key: (result['latency_ms'][key] / old['latency_ms'][key] - 1) * 100
+                if old['latency_ms'][key] else 0.0
+                for key in ('p50', 'p95')
+            }
+            queries = result['queries']['mean'] - old['queries']['mean']
+            self.stdout.write(f'{name:<18} {deltas["p50"]:>+8.1f} {deltas["p95"]:>+8.1f} {queries:>+10.1f}')
+            if threshold is not None and deltas['p95'] > threshold:
+                regressions.append(name)
+        if regressions:
+            raise CommandError(f'p95 piorou mais de {threshold}% em: {", ".join(regressions)}')
@@ -0,0 +1,133 @@
+# posts/management/commands/benchmark_database.py
+import copy
+import random
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, close_old_connections, connection, connections
+
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+# Comentários criados pelo benchmark (apagados no final)
+MARKER = '[benchmark_database]'
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = ('Leituras e escritas concorrentes (lista/detalhe e novos comentários) '
+            'contra o banco configurado; --compare mede também o perfil sem ajustes.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5.0, help='Duração de cada perfil.')
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--compare', action='store_true',
+                            help='Roda antes o perfil padrão (sem conexão persistente nem pragmas).')
+
+    def handle(self, *args, **options):
+        self.post_ids = list(Post.objects.filter(status='published').order_by().values_list('pk', flat=True)[:500])
+        self.author = User.objects.order_by('pk').first()
+        if not self.post_ids or self.author is None:
+            raise CommandError('Sem posts publicados: rode import_blog antes.')
+
+        profiles = [('configurado', {})]
+        if options['compare']:
+            profiles.insert(0, ('padrão', self.baseline_overrides()))
+
+        self.stdout.write(f'{connection.vendor}, {options["readers"]} leitores, '
+                          f'{options["writers"]} escritores, {options["seconds"]}s por perfil')
+        self.stdout.write(f'{"perfil":<12} {"leituras/s":>11} {"escritas/s":>11} '
+                          f'{"p95 leit. ms":>13} {"p95 escr. ms":>13} {"erros":>6}')
+        try:
+            for name, overrides in profiles:
+                result = self.run_profile(overrides, options)
+                self.stdout.write(
+                    f'{name:<12} {result["reads"] / result["elapsed"]:>11.0f} '
+                    f'{result["writes"] / result["elapsed"]:>11.0f} '
+                    f'{percentile(result["read_times"], 0.95) * 1000:>13.2f} '
+                    f'{percentile(result["write_times"], 0.95) * 1000:>13.2f} {result["errors"]:>6}'
+                )
+        finally:
+            Comment.objects.filter(content=MARKER).delete()
+
+    def baseline_overrides(self):
+        # O que o Django faz sem configuração: uma conexão por requisição e,
+        # no SQLite, journal de rollback (o padrão do arquivo) sem pragmas
+        overrides = {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False}
+        if connection.vendor == 'sqlite':
+            overrides['OPTIONS'] = {'init_command': 'PRAGMA journal_mode=DELETE'}
+        else:
+            options = dict(connections.settings[DEFAULT_DB_ALIAS].get('OPTIONS', {}))
+            options.pop('pool', None)
+            overrides['OPTIONS'] = options
+        return overrides
+
+    def run_profile(self, overrides, options):
+        # As threads criam conexões a partir deste mesmo dicionário
+        settings_dict = connections.settings[DEFAULT_DB_ALIAS]
+        saved = {key: copy.deepcopy(settings_dict.get(key)) for key in overrides}
+        settings_dict.update(overrides)
+        connections.close_all()
+        result = {'reads': 0, 'writes': 0, 'errors': 0, 'read_times': [], 'write_times': []}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + options['seconds']
+
+        def worker(operation, kind):
+            times, errors = [], 0
+            try:
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    try:
+                        operation()
+                    except OperationalError:
+                        errors += 1
+                    else:
+                        times.append(time.perf_counter() - start)
+                    # Fim da "requisição": fecha a conexão se o perfil não a mantém
+                    close_old_connections()
+            finally:
+                connection.close()
+                with lock:
+                    result[f'{kind}s'] += len(times)
+                    result[f'{kind}_times'].extend(times)
+                    result['errors'] += errors
+
+        threads = ([threading.Thread(target=worker, args=(self.read, 'read'))
+                    for _ in range(options['readers'])]
+                   + [threading.Thread(target=worker, args=(self.write, 'write'))
+                      for _ in range(options['writers'])])
+        start = time.perf_counter()
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            result['elapsed'] = time.perf_counter() - start
+            for key, value in saved.items():
+                if value is None:
+                    settings_dict.pop(key, None)
+                else:
+                    settings_dict[key] = value
+            connections.close_all()
+        return result
+
+    def read(self):
+        # As mesmas queries da lista e do detalhe
+        list(Post.objects.filter(status='published').select_related('author')
+             .order_by('-created_at', '-id')[:10])
+        post = Post.objects.select_related('author').get(pk=random.choice(self.post_ids))
+        list(post.comments.filter(approved=True).select_related('author')[:20])
+
+    def write(self):
+        Comment.objects.create(post_id=random.choice(self.post_ids), author=self.author, content=MARKER)
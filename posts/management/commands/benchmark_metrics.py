@@ -0,0 +1,108 @@
+# posts/management/commands/benchmark_metrics.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+
+from posts.metrics import (
+    RequestTimings, current_timings, install_execute_wrapper, route_metrics, timing_execute_wrapper,
+)
+from posts.models import Post
+
+MIDDLEWARE_PATH = 'posts.middleware.PerformanceMiddleware'
+
+
+class Command(BaseCommand):
+    help = ('Microbenchmark do PerformanceMiddleware: custo por requisição '
+            'desligado, ligado sem amostra e ligado medindo tudo, e custo por query.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--queries', type=int, default=20000)
+        parser.add_argument('--rounds', type=int, default=3, help='Usa a melhor de N rodadas.')
+
+    def handle(self, *args, **options):
+        post = Post.objects.filter(status='published').order_by('-created_at').first()
+        if post is None:
+            raise CommandError('Sem posts publicados: rode import_blog antes.')
+        path = post.get_absolute_url()
+        without = [m for m in settings.MIDDLEWARE if m != MIDDLEWARE_PATH]
+        scenarios = [
+            ('fora da pilha', {'MIDDLEWARE': without, 'POSTS_METRICS_ENABLED': False}),
+            ('amostra 0%', {'MIDDLEWARE': [MIDDLEWARE_PATH, *without], 'POSTS_METRICS_ENABLED': True,
+                            'POSTS_METRICS_SAMPLE_RATE': 0.0}),
+            ('amostra 100%', {'MIDDLEWARE': [MIDDLEWARE_PATH, *without], 'POSTS_METRICS_ENABLED': True,
+                              'POSTS_METRICS_SAMPLE_RATE': 1.0}),
+        ]
+
+        self.stdout.write(f'{options["requests"]} requisições a {path}, melhor de {options["rounds"]}')
+        self.stdout.write(f'{"cenário":<14} {"µs/req":>10} {"extra µs":>10} {"extra %":>8}')
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        # Rodadas intercaladas (todos os cenários em cada rodada), para que
+        # aquecimento e ruído da máquina não favoreçam um cenário
+        best = {}
+        for _ in range(options['rounds']):
+            for label, overrides in scenarios:
+                if not overrides['POSTS_METRICS_ENABLED'] and timing_execute_wrapper in connection.execute_wrappers:
+                    # Como num processo que nunca ligou as métricas
+                    connection.execute_wrappers.remove(timing_execute_wrapper)
+                with override_settings(ALLOWED_HOSTS=hosts, **overrides):
+                    elapsed = self.requests(path, options['requests'])
+                best[label] = min(best.get(label, elapsed), elapsed)
+        baseline = best[scenarios[0][0]]
+        for label, _ in scenarios:
+            extra = best[label] - baseline
+            self.stdout.write(f'{label:<14} {best[label] * 1e6:>10.1f} {extra * 1e6:>10.1f} '
+                              f'{extra / baseline * 100:>7.1f}%')
+
+        # Custo do execute_wrapper isolado, por query
+        self.stdout.write(f'\n{options["queries"]} x SELECT 1')
+        if timing_execute_wrapper in connection.execute_wrappers:
+            connection.execute_wrappers.remove(timing_execute_wrapper)
+        plain = self.best(options['rounds'], lambda: self.queries(options['queries']))
+        install_execute_wrapper(connection)
+        idle = self.best(options['rounds'], lambda: self.queries(options['queries']))
+        token = current_timings.set(RequestTimings())
+        try:
+            measured = self.best(options['rounds'], lambda: self.queries(options['queries']))
+        finally:
+            current_timings.reset(token)
+        for label, value in (('sem wrapper', plain), ('wrapper ocioso', idle), ('wrapper medindo', measured)):
+            self.stdout.write(f'{label:<16} {value * 1e6:>8.2f} µs/query  (+{(value - plain) * 1e6:.2f})')
+
+        # Trabalho do próprio middleware por requisição medida (sem a view)
+        bookkeeping = self.best(options['rounds'], lambda: self.bookkeeping(options['queries']))
+        self.stdout.write(f'\ncontabilidade por requisição medida: {bookkeeping * 1e6:.2f} µs')
+
+    def best(self, rounds, run):
+        return min(run() for _ in range(rounds))
+
+    def requests(self, path, total):
+        client = Client()
+        client.get(path)  # carrega o middleware e aquece os caches
+        start = time.perf_counter()
+        for _ in range(total):
+            client.get(path)
+        return (time.perf_counter() - start) / total
+
+    def queries(self, total):
+        with connection.cursor() as cursor:
+            start = time.perf_counter()
+            for _ in range(total):
+                cursor.execute('SELECT 1')
+            return (time.perf_counter() - start) / total
+
+    def bookkeeping(self, total):
+        start = time.perf_counter()
+        for _ in range(total):
+            timings = RequestTimings()
+            token = current_timings.set(timings)
+            current_timings.reset(token)
+            timings.finish()
+            route_metrics.observe('benchmark', timings)
+            timings.server_timing()
+        elapsed = (time.perf_counter() - start) / total
+        route_metrics.routes.pop('benchmark', None)
+        return elapsed
@@ -0,0 +1,88 @@
+# posts/management/commands/benchmark_pagination.py
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import transaction
+
+from posts.counters import recount_author_stats
+from posts.models import Post
+from posts.pagination import KeysetPaginator, encode_cursor
+from posts.rendering import rendered_fields
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Compara a latência da paginação por offset e por cursor em várias profundidades.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Cria N posts publicados antes de medir (ex.: 1000000).')
+        parser.add_argument('--per-page', type=int, default=5)
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Quantas vezes cada página é buscada (usa a mediana).')
+        parser.add_argument('--depths', default='1,10,100,1000,10000,100000',
+                            help='Páginas a medir, separadas por vírgula.')
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options['seed'])
+
+        queryset = Post.objects.filter(status='published').order_by('-created_at', '-id')
+        total = queryset.count()
+        per_page = options['per_page']
+        self.stdout.write(f'{total} posts publicados, {per_page} por página\n')
+        self.stdout.write(f'{"página":>10} {"offset (ms)":>14} {"cursor (ms)":>14}')
+
+        for depth in [int(d) for d in options['depths'].split(',')]:
+            if (depth - 1) * per_page >= total:
+                break
+            offset_ms = self.measure(options['repeat'], lambda: self.offset_page(queryset, per_page, depth))
+            # O cursor da página N é a chave do último post da página N-1
+            # (buscada fora da medição; o leitor a recebe no link "Próxima")
+            cursor = None
+            if depth > 1:
+                boundary = queryset.only('created_at', 'id')[(depth - 1) * per_page - 1]
+                cursor = encode_cursor([boundary.created_at.isoformat(), boundary.id], 'n')
+            paginator = KeysetPaginator(queryset, per_page)
+            cursor_ms = self.measure(options['repeat'], lambda: list(paginator.page(cursor)))
+            self.stdout.write(f'{depth:>10} {offset_ms:>14.2f} {cursor_ms:>14.2f}')
+
+    def offset_page(self, queryset, per_page, number):
+        # Mesmo caminho da ListView: Paginator faz COUNT(*) e depois OFFSET
+        page = Paginator(queryset, per_page).page(number)
+        return list(page.object_list)
+
+    def measure(self, repeat, func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        return timings[len(timings) // 2]
+
+    def seed(self, count, batch_size=10000):
+        author, _ = User.objects.get_or_create(username='benchmark')
+        start = Post.objects.count()
+        self.stdout.write(f'Criando {count} posts...')
+        content = 'Lorem ipsum dolor sit amet. ' * 20
+        # bulk_create não chama save(): o resumo e o HTML vão prontos
+        rendered = rendered_fields(content)
+        for offset in range(0, count, batch_size):
+            size = min(batch_size, count - offset)
+            with transaction.atomic():
+                Post.objects.bulk_create([
+                    Post(
+                        author=author,
+                        title=f'Post de benchmark {start + offset + i}',
+                        slug=f'benchmark-{start + offset + i}',
+                        content=content,
+                        status='published',
+                        **rendered,
+                    )
+                    for i in range(size)
+                ], batch_size=1000)
+        recount_author_stats([author.pk])
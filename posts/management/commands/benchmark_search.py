@@ -0,0 +1,89 @@
+# posts/management/commands/benchmark_search.py
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Q
+
+from posts.models import Post
+from posts.search import get_search_backend, search_posts
+
+User = get_user_model()
+
+WORDS = ('django python banco dados índice busca cache consulta página servidor '
+         'template modelo migração usuário comentário artigo rascunho sessão '
+         'desempenho latência memória tráfego leitor autor').split()
+
+
+class Command(BaseCommand):
+    help = 'Compara a busca pelo índice invertido com o caminho icontains (LIKE).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Cria N posts com texto aleatório antes de medir (ex.: 100000).')
+        parser.add_argument('--queries', default='django,cache página,latência servidor autor')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options['seed'])
+
+        backend = get_search_backend()
+        self.stdout.write(f'{Post.objects.count()} posts, índice: {backend.name}\n')
+        self.stdout.write(f'{"busca":<28} {"icontains (ms)":>15} {"índice (ms)":>12} {"resultados":>11}')
+        for query in options['queries'].split(','):
+            like_ms = self.measure(options['repeat'], lambda: self.icontains_page(query))
+            index_ms = self.measure(options['repeat'], lambda: self.index_page(query))
+            total = search_posts(query).count()
+            self.stdout.write(f'{query:<28} {like_ms:>15.2f} {index_ms:>12.2f} {total:>11}')
+
+    def icontains_page(self, query):
+        # O que o admin fazia: um LIKE '%termo%' por termo, em título e conteúdo
+        queryset = Post.objects.filter(status='published')
+        for word in query.split():
+            queryset = queryset.filter(Q(title__icontains=word) | Q(content__icontains=word))
+        return list(Paginator(queryset, 10).page(1).object_list)
+
+    def index_page(self, query):
+        return list(Paginator(search_posts(query), 10).page(1).object_list)
+
+    def measure(self, repeat, func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        return timings[len(timings) // 2]
+
+    def seed(self, count, batch_size=5000):
+        author, _ = User.objects.get_or_create(username='benchmark')
+        rng = random.Random(42)
+        # Vocabulário com distribuição de Zipf: poucas palavras muito comuns e
+        # uma cauda longa, como em texto real. As palavras das buscas ficam
+        # espalhadas pelo ranking (umas comuns, outras raras).
+        vocabulary = [f'termo{i}' for i in range(20000)]
+        for rank, word in enumerate(WORDS):
+            vocabulary[rank * 400 + 10] = word
+        weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+        backend = get_search_backend()
+        start = Post.objects.count()
+        self.stdout.write(f'Criando e indexando {count} posts...')
+        for offset in range(0, count, batch_size):
+            size = min(batch_size, count - offset)
+            with transaction.atomic():
+                # bulk_create não dispara sinais: indexamos o bloco à mão
+                posts = Post.objects.bulk_create([
+                    Post(
+                        author=author,
+                        title=' '.join(rng.choices(vocabulary, weights, k=6)).capitalize(),
+                        slug=f'busca-{start + offset + i}',
+                        content=' '.join(rng.choices(vocabulary, weights, k=150)),
+                        status='published',
+                    )
+                    for i in range(size)
+                ], batch_size=1000)
+                backend.index_posts(posts)
@@ -0,0 +1,113 @@
+# posts/management/commands/benchmark_sessions.py
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Post
+
+from .purge_sessions import Command as PurgeSessionsCommand
+
+User = get_user_model()
+
+MODEL_BACKEND = 'django.contrib.auth.backends.ModelBackend'
+CACHED_BACKEND = 'posts.auth.CachedModelBackend'
+
+# (nome, SESSION_ENGINE, AUTHENTICATION_BACKENDS); a primeira é a configuração antiga
+CONFIGURATIONS = [
+    ('db (antes)', 'django.contrib.sessions.backends.db', [MODEL_BACKEND]),
+    ('db + usuário em cache', 'django.contrib.sessions.backends.db', [CACHED_BACKEND, MODEL_BACKEND]),
+    ('cached_db', 'django.contrib.sessions.backends.cached_db', [CACHED_BACKEND, MODEL_BACKEND]),
+    ('signed_cookies', 'django.contrib.sessions.backends.signed_cookies', [CACHED_BACKEND, MODEL_BACKEND]),
+]
+
+# Prefixo das sessões expiradas criadas para medir a limpeza
+EXPIRED_PREFIX = 'benchmarksessions'
+
+
+class Command(BaseCommand):
+    help = ('Compara as estratégias de sessão (POSTS_SESSION_STRATEGY) e o cache de '
+            'usuário: queries por requisição (total e só sessão/usuário) e requisições '
+            'por segundo na lista e no detalhe, para visitantes anônimos e logados. '
+            'Mede também a limpeza de sessões expiradas em lotes contra um DELETE único.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requisições por medida.')
+        parser.add_argument('--expired', type=int, default=50000,
+                            help='Sessões expiradas criadas para medir a limpeza (0 pula).')
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(username='leitor_benchmark')
+        post = Post.objects.filter(status='published').order_by('-created_at', '-id').first()
+        pages = [('lista', reverse('post_list'))]
+        if post is not None:
+            pages.append(('detalhe', reverse('post_detail', args=[post.slug])))
+
+        self.stdout.write(f'{"configuração":<24} {"página":<8} {"visitante":<9} '
+                          f'{"queries":>8} {"sessão+usuário":>15} {"req/s":>8}')
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        for name, engine, backends in CONFIGURATIONS:
+            # Um processo só: o cache 'sessions' por processo não perde nada aqui
+            user_cache = 'sessions' if backends[0] == CACHED_BACKEND else None
+            with override_settings(ALLOWED_HOSTS=hosts, POSTS_PAGE_CACHE_ENABLED=False, SESSION_ENGINE=engine,
+                                   AUTHENTICATION_BACKENDS=backends, POSTS_USER_CACHE=user_cache):
+                caches[settings.SESSION_CACHE_ALIAS].clear()
+                # Cliente novo por configuração: o SessionMiddleware guarda o engine
+                visitors = [('anônimo', Client()), ('logado', Client())]
+                visitors[1][1].force_login(user, backend=backends[0])
+                for page, url in pages:
+                    for visitor, client in visitors:
+                        total, auth, rate = self.measure(client, url, options['requests'])
+                        self.stdout.write(f'{name:<24} {page:<8} {visitor:<9} {total:>8} {auth:>15} {rate:>8.0f}')
+
+        if options['expired']:
+            self.measure_purge(options['expired'])
+
+    def measure(self, client, url, requests):
+        client.get(url)  # aquece sessão, usuário e templates
+        reset_queries()  # o log de queries tem tamanho fixo: cheio, a captura vem vazia
+        with CaptureQueriesContext(connection) as captured:
+            client.get(url)
+        tables = ('"django_session"', 'FROM "auth_user"')
+        auth = sum(1 for q in captured if any(table in q['sql'] for table in tables))
+        start = time.perf_counter()
+        for _ in range(requests):
+            client.get(url)
+        return len(captured), auth, requests / (time.perf_counter() - start)
+
+    def measure_purge(self, count):
+        self.stdout.write(f'\n{"limpeza de " + str(count) + " sessões":<32} {"total (s)":>10} {"maior lock (ms)":>16}')
+        with override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db'):
+            self.create_expired(count)
+            start = time.perf_counter()
+            with transaction.atomic():
+                Session.objects.filter(expire_date__lt=timezone.now()).delete()
+            single = time.perf_counter() - start
+            self.stdout.write(f'{"DELETE único (clearsessions)":<32} {single:>10.2f} {single * 1000:>16.1f}')
+
+            self.create_expired(count)
+            start = last = time.perf_counter()
+            longest = 0.0
+            for _ in PurgeSessionsCommand().delete_expired(Session, 1000):
+                now = time.perf_counter()
+                longest, last = max(longest, now - last), now
+            batched = time.perf_counter() - start
+            self.stdout.write(f'{"purge_sessions (lotes de 1000)":<32} {batched:>10.2f} {longest * 1000:>16.1f}')
+
+    def create_expired(self, count, batch_size=5000):
+        expired = timezone.now() - timedelta(days=1)
+        for offset in range(0, count, batch_size):
+            with transaction.atomic():
+                Session.objects.bulk_create([
+                    Session(session_key=f'{EXPIRED_PREFIX}{n:010d}', session_data='', expire_date=expired)
+                    for n in range(offset, min(offset + batch_size, count))
+                ])
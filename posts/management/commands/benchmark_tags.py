@@ -0,0 +1,169 @@
+# posts/management/commands/benchmark_tags.py
+import random
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Post, PostTag, Tag
+from posts.pagination import KeysetPaginator, encode_cursor
+from posts.tags import invalidate_tag_cloud, recount_tag_counts, set_post_tags, tag_cloud, tag_cloud_rows, tagged_links
+from posts.views import TagPostsView
+
+from .benchmark_authors import Command as AuthorsBenchmarkCommand
+
+# Prefixo das tags geradas (tag-0001 é a mais popular)
+TAG_PREFIX = 'tag-'
+
+
+class Command(AuthorsBenchmarkCommand):
+    help = ('Mede as tags com muitos posts e ligações: arquivo de uma tag e interseção '
+            'de várias (/tag/a+b/) por cursor no índice parcial contra o JOIN com GROUP BY '
+            'HAVING, na primeira página e numa página funda; nuvem de tags do cache, do '
+            'índice de post_count e com GROUP BY; custo dos sinais ao publicar. Cria os '
+            'posts (do autor --username) e as ligações que faltarem, com tags numa '
+            'distribuição de Zipf.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', default='autor_tags')
+        parser.add_argument('--posts', type=int, default=1000000,
+                            help='Posts publicados no banco (cria os que faltarem).')
+        parser.add_argument('--tags', type=int, default=1000, help='Tags distintas.')
+        parser.add_argument('--links-per-post', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Quantas vezes cada medida é repetida (usa a mediana).')
+        parser.add_argument('--depth', type=int, default=1000, help='Página funda a medir.')
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        others = Post.objects.filter(status='published').exclude(author__username=options['username']).count()
+        author = self.ensure_author(options['username'], max(options['posts'] - others, 0))
+        tags = self.ensure_tags(options['tags'])
+        self.ensure_links(tags, options['links_per_post'])
+        self.stdout.write(f'{Post.objects.filter(status="published").count()} posts publicados, '
+                          f'{PostTag.objects.count()} ligações, {len(tags)} tags\n')
+
+        by_rank = Tag.objects.filter(slug__startswith=TAG_PREFIX).order_by('-post_count', 'slug')
+        ranked = list(by_rank)
+        rank = lambda n: ranked[min(n, len(ranked)) - 1]
+        cases = [
+            [rank(1)], [rank(100)], [rank(1), rank(2)], [rank(1), rank(50)],
+            [rank(2), rank(3), rank(5)], [rank(20), rank(200)],
+        ]
+        per_page = TagPostsView.paginate_by
+        self.stdout.write(f'{"tags":<48} {"página":>7} {"cursor (ms)":>12} {"GROUP BY (ms)":>14} {"requisição (ms)":>16}')
+        client = Client()
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        with override_settings(ALLOWED_HOSTS=hosts, POSTS_PAGE_CACHE_ENABLED=False):
+            for case in cases:
+                name = '+'.join(f'{tag.slug}({tag.post_count})' for tag in case)
+                url = reverse('tag_posts', args=['+'.join(tag.slug for tag in case)])
+                links = tagged_links(case)
+                paginator = KeysetPaginator(links, per_page, ordering=('created_at', 'post_id'))
+                for depth in (1, options['depth']):
+                    cursor = None
+                    if depth > 1:
+                        boundary = links.order_by('-created_at', '-post_id')[(depth - 1) * per_page - 1:][:1]
+                        boundary = next(iter(boundary), None)
+                        if boundary is None:
+                            continue
+                        cursor = encode_cursor([boundary.created_at.isoformat(), boundary.post_id], 'n')
+                    cursor_ms = self.measure(repeat, lambda: list(paginator.page(cursor)))
+                    naive_ms = self.measure(repeat, lambda: self.naive_page(case, per_page, depth))
+                    request_ms = self.measure(repeat, lambda: client.get(url, {'cursor': cursor} if cursor else {}))
+                    self.stdout.write(f'{name:<48} {depth:>7} {cursor_ms:>12.2f} {naive_ms:>14.2f} {request_ms:>16.2f}')
+
+        if connection.vendor == 'sqlite':
+            page = KeysetPaginator(tagged_links(cases[3]), per_page, ordering=('created_at', 'post_id'))
+            self.stdout.write(f'\nPlano da interseção: {page.get_queryset()[1].explain()}')
+
+        self.measure_cloud(repeat)
+        self.measure_signals(author, ranked[:10], repeat)
+
+    def naive_page(self, tags, per_page, depth):
+        # Como seria sem a tabela de ligações desnormalizada: JOIN com as
+        # ligações, GROUP BY post e HAVING com o número de tags, e OFFSET
+        queryset = (
+            Post.objects.filter(status='published', tags__in=tags)
+            .annotate(matched=Count('tags')).filter(matched=len(tags))
+            .order_by('-created_at', '-id')
+        )
+        offset = (depth - 1) * per_page
+        return list(queryset.values_list('pk', flat=True)[offset:offset + per_page])
+
+    def measure_cloud(self, repeat):
+        tag_cloud()
+        cached = self.measure(repeat, tag_cloud)
+        stored = self.measure(repeat, lambda: list(tag_cloud_rows()))
+        naive = self.measure(repeat, lambda: list(
+            Tag.objects.annotate(total=Count('posts', filter=Q(posts__status='published')))
+            .filter(total__gt=0).order_by('-total', 'name').values('name', 'slug', 'total')[:30]
+        ))
+        invalidate_tag_cloud()
+        self.stdout.write(f'\n{"nuvem de tags":<14} {"cache (ms)":>11} {"post_count (ms)":>16} {"GROUP BY (ms)":>14}')
+        self.stdout.write(f'{"30 maiores":<14} {cached:>11.2f} {stored:>16.2f} {naive:>14.2f}')
+
+    def measure_signals(self, author, tags, repeat):
+        # Publicar/despublicar um post com 10 tags: um UPDATE nos contadores e
+        # outro nas ligações, sem GROUP BY
+        post = Post.objects.create(author=author, title='[benchmark_tags]', slug='benchmark-tags',
+                                   content='[benchmark_tags]', status='draft')
+        set_post_tags(post, [tag.name for tag in tags])
+        timings = []
+        queries = 0
+        try:
+            for i in range(repeat * 2):
+                post.status = 'draft' if post.status == 'published' else 'published'
+                start = time.perf_counter()
+                with CaptureQueriesContext(connection) as captured:
+                    with transaction.atomic():
+                        post.save()
+                timings.append((time.perf_counter() - start) * 1000)
+                queries = len(captured)
+        finally:
+            post.delete()
+        timings.sort()
+        self.stdout.write(f'\n{"post com 10 tags":<24} {"ms":>8} {"queries":>8}')
+        self.stdout.write(f'{"publicar/despublicar":<24} {timings[len(timings) // 2]:>8.2f} {queries:>8}')
+
+    def ensure_tags(self, count):
+        existing = set(Tag.objects.filter(slug__startswith=TAG_PREFIX).values_list('slug', flat=True))
+        Tag.objects.bulk_create([
+            Tag(name=f'{TAG_PREFIX}{n:04d}', slug=f'{TAG_PREFIX}{n:04d}')
+            for n in range(1, count + 1) if f'{TAG_PREFIX}{n:04d}' not in existing
+        ], batch_size=1000)
+        return list(Tag.objects.filter(slug__startswith=TAG_PREFIX).order_by('slug').values_list('pk', flat=True))
+
+    def ensure_links(self, tags, per_post, batch_size=20000):
+        # Continua de onde parou: só posts com id acima do último já ligado
+        last = PostTag.objects.order_by('-post_id').values_list('post_id', flat=True).first() or 0
+        missing = Post.objects.filter(pk__gt=last).order_by('pk')
+        total = missing.count()
+        if not total:
+            return
+        self.stdout.write(f'Criando cerca de {total * per_post} ligações para {total} posts...')
+        # Zipf (s=1): a tag de posição r aparece com peso 1/r
+        weights = [1 / rank for rank in range(1, len(tags) + 1)]
+        rng = random.Random(23)
+        done = 0
+        while True:
+            posts = list(missing.filter(pk__gt=last).values_list('pk', 'created_at', 'status')[:batch_size])
+            if not posts:
+                break
+            links = []
+            for pk, created_at, status in posts:
+                chosen = set()
+                while len(chosen) < min(per_post, len(tags)):
+                    chosen.update(rng.choices(tags, weights, k=per_post - len(chosen)))
+                links.extend(PostTag(post_id=pk, tag_id=tag, published=status == 'published', created_at=created_at)
+                             for tag in chosen)
+            with transaction.atomic():
+                PostTag.objects.bulk_create(links, batch_size=5000)
+            last = posts[-1][0]
+            done += len(posts)
+            self.stdout.write(f'  {done}/{total} posts')
+        recount_tag_counts()
@@ -0,0 +1,74 @@
+# posts/management/commands/export_blog.py
+import csv
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.models import Comment, Post
+
+# Colunas exportadas; os mesmos nomes são aceitos por import_blog
+POST_FIELDS = {
+    'title': 'title',
+    'slug': 'slug',
+    'author': 'author__username',
+    'status': 'status',
+    'content': 'content',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+COMMENT_FIELDS = {
+    'post': 'post__slug',
+    'author': 'author__username',
+    'content': 'content',
+    'approved': 'approved',
+    'created_at': 'created_at',
+}
+
+
+class Command(BaseCommand):
+    help = 'Exporta posts ou comentários para JSONL/CSV em streaming (memória constante).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=['posts', 'comments'])
+        parser.add_argument('--output', '-o', default='-', help="Arquivo de saída, ou '-' para stdout.")
+        parser.add_argument('--format', choices=['jsonl', 'csv'], default=None,
+                            help='Padrão: deduzido pela extensão do arquivo.')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or ('csv' if options['output'].endswith('.csv') else 'jsonl')
+        if options['model'] == 'posts':
+            queryset, fields = Post.objects.order_by('pk'), POST_FIELDS
+        else:
+            queryset, fields = Comment.objects.order_by('pk'), COMMENT_FIELDS
+
+        # values() + iterator(): nenhuma instância de model e nenhum cache
+        # do queryset; só um bloco de linhas em memória por vez
+        rows = queryset.values_list(*fields.values()).iterator(chunk_size=options['chunk_size'])
+        names = list(fields)
+
+        output = sys.stdout if options['output'] == '-' else open(
+            options['output'], 'w', encoding='utf-8', newline='')
+        started = time.perf_counter()
+        count = 0
+        try:
+            if fmt == 'csv':
+                writer = csv.writer(output)
+                writer.writerow(names)
+            for row in rows:
+                row = [value.isoformat() if hasattr(value, 'isoformat') else value for value in row]
+                if fmt == 'csv':
+                    writer.writerow(row)
+                else:
+                    output.write(json.dumps(dict(zip(names, row)), ensure_ascii=False) + '\n')
+                count += 1
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+        elapsed = time.perf_counter() - started
+        self.stderr.write(
+            f'{count} linhas exportadas em {elapsed:.1f}s ({count / elapsed if elapsed else 0:.0f} linhas/s).'
+        )
@@ -0,0 +1,196 @@
+# posts/management/commands/import_blog.py
+import csv
+import json
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.bulk import CachedLookup, chunked, preserve_auto_timestamps
+from posts.cache import invalidate_post_pages
+from posts.counters import bump_content_version, recount_approved_comments, recount_author_stats
+from posts.models import Comment, Post
+from posts.search import index_posts
+from posts.slugs import unique_slugs
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Importa posts ou comentários de um arquivo JSONL/CSV em blocos '
+            '(bulk_create), lendo a entrada em streaming.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=['posts', 'comments'])
+        parser.add_argument('path', help="Arquivo de entrada, ou '-' para stdin.")
+        parser.add_argument('--format', choices=['jsonl', 'csv'], default=None,
+                            help='Padrão: deduzido pela extensão do arquivo.')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--create-authors', action='store_true',
+                            help='Cria usuários que ainda não existem (sem senha utilizável).')
+        parser.add_argument('--progress-every', type=int, default=50000)
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or ('csv' if options['path'].endswith('.csv') else 'jsonl')
+        self.authors = CachedLookup(User.objects.all(), User.USERNAME_FIELD)
+        self.posts = CachedLookup(Post.objects.all(), 'slug')
+        self.create_authors = options['create_authors']
+        self.progress_every = options['progress_every']
+        self.started = time.perf_counter()
+        self.imported = self.skipped = 0
+        # Slugs dos posts que ganharam comentários aprovados (detalhe no cache de página)
+        self.touched_slugs = set()
+        # Autores dos posts importados: as estatísticas são recalculadas uma
+        # vez no final, não a cada bloco (um autor com milhares de posts
+        # seria reagregado inteiro em todos os blocos)
+        self.touched_authors = set()
+        self.last_report = 0
+
+        stream = sys.stdin if options['path'] == '-' else open(options['path'], encoding='utf-8', newline='')
+        try:
+            rows = self.read_rows(stream, fmt)
+            importer = self.import_posts if options['model'] == 'posts' else self.import_comments
+            # Posts e comentários importados não disparam sinais: cada bloco
+            # atualiza índice de busca/contadores de comentários; estatísticas
+            # dos autores e cache de página são atualizados uma vez no final
+            with preserve_auto_timestamps(Post if options['model'] == 'posts' else Comment):
+                for batch in chunked(rows, options['batch_size']):
+                    with transaction.atomic():
+                        importer(batch)
+                    self.report()
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            # Mesmo se a importação parar no meio (CommandError numa linha
+            # inválida), os blocos já gravados ficam consistentes
+            self.finish()
+
+        elapsed = time.perf_counter() - self.started
+        self.stdout.write(self.style.SUCCESS(
+            f'{self.imported} linhas importadas, {self.skipped} ignoradas em {elapsed:.1f}s '
+            f'({self.imported / elapsed if elapsed else 0:.0f} linhas/s).'
+        ))
+
+    def finish(self):
+        # Estatísticas dos autores e cache de página dos blocos gravados
+        # (autores de um bloco desfeito só são recalculados à toa)
+        for ids in chunked(sorted(self.touched_authors), 1000):
+            with transaction.atomic():
+                recount_author_stats(ids)
+        bump_content_version()
+        invalidate_post_pages()
+        for slugs in chunked(sorted(self.touched_slugs), 1000):
+            invalidate_post_pages(*slugs, lists=False)
+
+    # ----------------------------------------------------
+    # LEITURA
+    # ----------------------------------------------------
+    def read_rows(self, stream, fmt):
+        if fmt == 'csv':
+            yield from csv.DictReader(stream)
+            return
+        for number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as error:
+                raise CommandError(f'Linha {number}: JSON inválido ({error}).')
+
+    def parse_date(self, value):
+        if not value:
+            return timezone.now()
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise CommandError(f'Data inválida: {value!r}')
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed, timezone.get_default_timezone())
+        return parsed
+
+    def parse_bool(self, value):
+        if isinstance(value, bool):
+            return value
+        return str(value).strip().lower() in ('1', 'true', 't', 'yes', 'sim')
+
+    # ----------------------------------------------------
+    # AUTORES
+    # ----------------------------------------------------
+    def resolve_authors(self, rows):
+        usernames = {row.get('author') for row in rows if row.get('author')}
+        self.authors.prefetch(usernames)
+        missing = [name for name in usernames if self.authors.get(name) is None]
+        if missing and self.create_authors:
+            User.objects.bulk_create(
+                [User(**{User.USERNAME_FIELD: name, 'password': '!'}) for name in missing],
+                ignore_conflicts=True,
+            )
+            # ignore_conflicts não devolve ids: busca de novo, uma query só
+            for name in missing:
+                self.authors.cache.pop(name)
+            self.authors.prefetch(missing)
+        return self.authors
+
+    # ----------------------------------------------------
+    # IMPORTADORES
+    # ----------------------------------------------------
+    def import_posts(self, rows):
+        authors = self.resolve_authors(rows)
+        valid = [row for row in rows
+                 if row.get('title') and row.get('author') and authors.get(row['author'])]
+        self.skipped += len(rows) - len(valid)
+        # Slugs gerados em lote, colisões resolvidas contra o índice único
+        slugs = unique_slugs([row.get('slug') or row['title'] for row in valid])
+        posts = []
+        for row, slug in zip(valid, slugs):
+            created_at = self.parse_date(row.get('created_at'))
+            posts.append(Post(
+                author_id=authors.get(row['author']),
+                title=row['title'][:200],
+                slug=slug,
+                content=row.get('content') or '',
+                status=row.get('status') if row.get('status') in ('draft', 'published') else 'draft',
+                created_at=created_at,
+                updated_at=self.parse_date(row.get('updated_at')) if row.get('updated_at') else created_at,
+            ))
+            # bulk_create não chama save(): resumo e HTML calculados aqui
+            posts[-1].render_content()
+        Post.objects.bulk_create(posts, batch_size=500)
+        index_posts(posts)
+        self.touched_authors.update(post.author_id for post in posts)
+        self.imported += len(posts)
+
+    def import_comments(self, rows):
+        authors = self.resolve_authors(rows)
+        self.posts.prefetch({row.get('post') for row in rows if row.get('post')})
+        kept = [
+            row for row in rows
+            if row.get('post') and row.get('author')
+            and self.posts.get(row['post']) and authors.get(row['author'])
+        ]
+        comments = [
+            Comment(
+                post_id=self.posts.get(row['post']),
+                author_id=authors.get(row['author']),
+                content=row.get('content') or '',
+                approved=self.parse_bool(row.get('approved', False)),
+                created_at=self.parse_date(row.get('created_at')),
+            )
+            for row in kept
+        ]
+        self.skipped += len(rows) - len(comments)
+        Comment.objects.bulk_create(comments, batch_size=500)
+        # Contadores desnormalizados só dos posts tocados por este bloco
+        recount_approved_comments({c.post_id for c in comments if c.approved})
+        self.touched_slugs.update(row['post'] for row, c in zip(kept, comments) if c.approved)
+        self.imported += len(comments)
+
+    def report(self):
+        if self.imported - self.last_report >= self.progress_every:
+            self.last_report = self.imported
+            elapsed = time.perf_counter() - self.started
+            self.stdout.write(f'  {self.imported} linhas ({self.imported / elapsed:.0f} linhas/s)')
@@ -0,0 +1,54 @@
+# posts/management/commands/loadtest_page_cache.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from posts.cache import get_page_cache, page_stats
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Mede requisições/s de leitores anônimos com o cache de página frio e quente.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500,
+                            help='Requisições por cenário.')
+        parser.add_argument('--posts', type=int, default=20,
+                            help='Quantos posts publicados visitar (detalhe).')
+
+    def handle(self, *args, **options):
+        slugs = list(
+            Post.objects.filter(status='published').order_by('-created_at')
+            .values_list('slug', flat=True)[:options['posts']]
+        )
+        # As duas montagens (/blog/ e /) e algumas páginas de detalhe
+        paths = ['/', '/blog/'] + [reverse('post_detail', args=[slug]) for slug in slugs]
+        total = options['requests']
+        client = Client()
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+
+        with override_settings(POSTS_PAGE_CACHE_ENABLED=False, ALLOWED_HOSTS=hosts):
+            cold = self.run(client, paths, total)
+        with override_settings(POSTS_PAGE_CACHE_ENABLED=True, ALLOWED_HOSTS=hosts):
+            get_page_cache().clear()
+            page_stats.reset()
+            for path in paths:
+                client.get(path)
+            warm = self.run(client, paths, total)
+            stats = page_stats.as_dict()
+
+        self.stdout.write(f'{"cenário":<8} {"req/s":>10} {"ms/req":>10}')
+        for label, elapsed in (('frio', cold), ('quente', warm)):
+            self.stdout.write(f'{label:<8} {total / elapsed:>10.1f} {elapsed / total * 1000:>10.2f}')
+        self.stdout.write(f'cache de página: {stats}')
+
+    def run(self, client, paths, total):
+        start = time.perf_counter()
+        for i in range(total):
+            response = client.get(paths[i % len(paths)])
+            if response.status_code != 200:
+                raise RuntimeError(f'{paths[i % len(paths)]} respondeu {response.status_code}')
+        return time.perf_counter() - start
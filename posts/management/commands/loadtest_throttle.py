@@ -0,0 +1,135 @@
+# posts/management/commands/loadtest_throttle.py
+import asyncio
+import time
+from collections import Counter
+from importlib.util import find_spec
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import CommandError
+from django.test import Client
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+
+from posts.models import Comment, Post
+
+from .benchmark_asgi import Command as AsgiBenchmarkCommand, percentile
+
+User = get_user_model()
+
+# Marca dos comentários criados pelo teste (apagados no final)
+MARKER = '[loadtest_throttle]'
+
+# (rótulo, com escritor inundando?, POSTS_THROTTLE_ENABLED do servidor)
+SCENARIOS = (
+    ('só leitores', False, '0'),
+    ('flood sem limite', True, '0'),
+    ('flood com limite', True, '1'),
+)
+
+
+class Command(AsgiBenchmarkCommand):
+    help = ('Sobe o uvicorn e mede a latência dos leitores (lista e detalhe) sozinhos, '
+            'com um usuário inundando o POST de comentários sem limite de escrita, '
+            'e com o limite ligado (posts/throttling.py).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8, help='Conexões de leitura.')
+        parser.add_argument('--writers', type=int, default=16, help='Conexões do escritor abusivo.')
+        parser.add_argument('--write-rate', type=float, default=300.0,
+                            help='POSTs por segundo oferecidos pelo escritor (0: o mais rápido possível).')
+        parser.add_argument('--duration', type=float, default=10.0, help='Segundos por cenário.')
+        parser.add_argument('--port', type=int, default=8766)
+        parser.add_argument('--posts', type=int, default=20, help='Quantos posts publicados visitar.')
+
+    def handle(self, *args, **options):
+        if find_spec('uvicorn') is None:
+            raise CommandError('O teste precisa do uvicorn (pip install uvicorn).')
+        slugs = list(Post.objects.filter(status='published').order_by('-created_at')
+                     .values_list('slug', flat=True)[:options['posts']])
+        if not slugs:
+            raise CommandError('Sem posts publicados: rode seed_blog antes.')
+        paths = [reverse('post_list')] + [reverse('post_detail', args=[slug]) for slug in slugs]
+
+        # Sessão de verdade no banco, usada pelo servidor; o CSRF vai no
+        # cookie e no cabeçalho com o mesmo segredo
+        user, _ = User.objects.get_or_create(username='loadtest_throttle')
+        client = Client()
+        client.force_login(user)
+        self.cookies = (f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}; '
+                        f'{settings.CSRF_COOKIE_NAME}=')
+        self.csrf = get_random_string(32)
+
+        rate = f'{options["write_rate"]:.0f} POSTs/s' if options['write_rate'] else 'sem pausa'
+        self.stdout.write(f'{options["readers"]} leitores, {options["writers"]} conexões de escrita '
+                          f'({rate}), {options["duration"]:.0f}s por cenário')
+        self.stdout.write(f'{"cenário":<18} {"leituras/s":>10} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} '
+                          f'{"aceitas":>8} {"429":>7} {"erros":>6}')
+        try:
+            for label, flood, throttle in SCENARIOS:
+                with self.server('sync', options['port'], POSTS_THROTTLE_ENABLED=throttle,
+                                 POSTS_THROTTLE_BACKEND='memory'):
+                    asyncio.run(self.load(options['port'], paths, len(paths) * 2, 4))
+                    latencies, errors, writes = asyncio.run(
+                        self.mixed(options['port'], paths, paths[1], options, flood))
+                self.stdout.write(
+                    f'{label:<18} {len(latencies) / options["duration"]:>10.0f} '
+                    f'{percentile(latencies, 0.5) * 1000:>8.1f} {percentile(latencies, 0.95) * 1000:>8.1f} '
+                    f'{percentile(latencies, 0.99) * 1000:>8.1f} {writes[302]:>8} {writes[429]:>7} '
+                    f'{errors + sum(n for status, n in writes.items() if status not in (302, 429)):>6}'
+                )
+        finally:
+            Comment.objects.filter(content=MARKER).delete()
+
+    async def mixed(self, port, paths, target, options, flood):
+        deadline = time.perf_counter() + options['duration']
+        latencies = []
+        errors = 0
+        writes = Counter()
+
+        async def reader(offset):
+            nonlocal errors
+            stream, writer = await asyncio.open_connection('127.0.0.1', port)
+            try:
+                i = offset
+                while time.perf_counter() < deadline:
+                    path = paths[i % len(paths)]
+                    i += 1
+                    start = time.perf_counter()
+                    writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+                    if await self.read_response(stream) == 200:
+                        latencies.append(time.perf_counter() - start)
+                    else:
+                        errors += 1
+            finally:
+                writer.close()
+
+        # Cada conexão do escritor manda no seu ritmo (taxa aberta): se o
+        # servidor recusa rápido, o escritor não passa a mandar mais
+        interval = options['writers'] / options['write_rate'] if options['write_rate'] else 0
+
+        async def flooder(offset):
+            body = urlencode({'content': MARKER}).encode()
+            request = (
+                f'POST {target} HTTP/1.1\r\nHost: localhost\r\n'
+                f'Cookie: {self.cookies}{self.csrf}\r\nX-CSRFToken: {self.csrf}\r\n'
+                f'Content-Type: application/x-www-form-urlencoded\r\nContent-Length: {len(body)}\r\n\r\n'
+            ).encode() + body
+            stream, writer = await asyncio.open_connection('127.0.0.1', port)
+            next_send = time.perf_counter() + interval * offset / options['writers']
+            try:
+                while time.perf_counter() < deadline:
+                    if interval:
+                        await asyncio.sleep(max(0.0, next_send - time.perf_counter()))
+                        next_send += interval
+                    writer.write(request)
+                    writes[await self.read_response(stream)] += 1
+            finally:
+                writer.close()
+
+        clients = [reader(i) for i in range(options['readers'])]
+        if flood:
+            clients += [flooder(i) for i in range(options['writers'])]
+        await asyncio.gather(*clients)
+        return latencies, errors, writes
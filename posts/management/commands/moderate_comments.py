@@ -0,0 +1,65 @@
+# posts/management/commands/moderate_comments.py
+import signal
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from posts.moderation import run_batch
+
+
+class Command(BaseCommand):
+    help = ('Worker da fila de moderação: pega comentários novos em lotes, passa '
+            'pelas regras de posts/moderation.py e aprova/rejeita em massa. Roda '
+            'até receber SIGINT/SIGTERM, ou só até esvaziar a fila (--once).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--interval', type=float, default=2.0,
+                            help='Segundos de espera quando a fila está vazia.')
+        parser.add_argument('--once', action='store_true', help='Sai quando a fila esvaziar.')
+        parser.add_argument('--max-batches', type=int, default=None)
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        # Termina o lote atual antes de sair (deploys, Ctrl+C)
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, self.stop)
+
+        totals = Counter()
+        batches = 0
+        while not self.stopping:
+            if options['max_batches'] is not None and batches >= options['max_batches']:
+                break
+            # Worker de vida longa: descarta conexões velhas ou quebradas como uma requisição faria
+            close_old_connections()
+            started = time.perf_counter()
+            try:
+                result = run_batch(options['batch_size'])
+            except Exception as error:
+                # O lote já voltou para a fila (com espera); o worker continua
+                batches += 1
+                self.stderr.write(f'Lote falhou: {error!r}')
+                time.sleep(options['interval'])
+                continue
+            if result is None:
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+                continue
+            batches += 1
+            totals.update(result)
+            self.stdout.write(
+                f'{sum(result.values())} tarefas em {(time.perf_counter() - started) * 1000:.0f} ms: '
+                f'{result["approve"]} aprovados, {result["reject"]} rejeitados, '
+                f'{result["hold"]} para moderação manual'
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{sum(totals.values())} comentários moderados em {batches} lotes '
+            f'({totals["approve"]} aprovados, {totals["reject"]} rejeitados, {totals["hold"]} manuais).'
+        ))
+
+    def stop(self, signum, frame):
+        self.stopping = True
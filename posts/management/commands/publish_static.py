@@ -0,0 +1,94 @@
+# posts/management/commands/publish_static.py
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.urls import reverse
+
+from posts.bulk import chunked
+from posts.publish import (
+    PageRenderer, detail_fingerprints, init_worker, list_fingerprint, load_manifest, publish_root,
+    remove_file, render_posts_in_worker, save_manifest, static_file,
+)
+
+
+class Command(BaseCommand):
+    help = ('Pré-renderiza em HTML estático o detalhe de cada post publicado e as '
+            'primeiras páginas da lista, com os templates do site, em vários '
+            'processos e com escrita atômica. Incremental: só refaz as páginas cuja '
+            'versão (updated_at e comentários) mudou desde o último build, conforme '
+            'o manifesto gravado na saída; --full refaz tudo (por exemplo depois de '
+            'mudar um template).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=None,
+                            help='Diretório de saída (padrão: settings.POSTS_PUBLISH_ROOT).')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Processos de renderização (1 renderiza no próprio processo).')
+        parser.add_argument('--full', action='store_true', help='Ignora o manifesto e refaz todas as páginas.')
+        parser.add_argument('--list-pages', type=int, default=10,
+                            help='Quantas páginas da lista pré-renderizar.')
+        parser.add_argument('--chunk-size', type=int, default=200,
+                            help='Posts por tarefa enviada a cada processo.')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        root = os.path.abspath(options['output'] or publish_root())
+        os.makedirs(root, exist_ok=True)
+        full = options['full']
+        # Mesmo com --full o manifesto antigo diz quais arquivos apagar
+        manifest = load_manifest(root)
+        previous = manifest['posts']
+
+        # 1. Versão atual de cada post publicado, comparada com a do manifesto
+        current = dict(detail_fingerprints())
+        changed = [slug for slug, etag in current.items() if full or previous.get(slug) != etag]
+
+        # 2. Renderiza só os posts que mudaram
+        posts = {slug: etag for slug, etag in previous.items() if slug in current}
+        written = list(self.render_posts(root, changed, options['workers'], options['chunk_size']))
+        for slug in written:
+            posts[slug] = current[slug]
+
+        # 3. Apaga as páginas de posts que saíram do ar (despublicados ou apagados)
+        removed = [slug for slug in previous if slug not in current]
+        for slug in removed:
+            remove_file(static_file(root, reverse('post_detail', args=[slug])))
+        manifest['posts'] = posts
+
+        # 4. Lista: uma versão só para todas as páginas (a mesma do ETag da view)
+        list_version = list_fingerprint()
+        list_rendered = full or manifest['list'] != list_version
+        if list_rendered:
+            files = PageRenderer(root).render_list(options['list_pages'])
+            for filename in set(manifest['list_files']) - set(files):
+                remove_file(os.path.join(root, filename))
+            manifest['list'], manifest['list_files'] = list_version, files
+
+        save_manifest(root, manifest)
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(written)} posts renderizados, {len(current) - len(changed)} sem mudança, '
+            f'{len(removed)} removidos; lista {"renderizada" if list_rendered else "sem mudança"} '
+            f'({len(manifest["list_files"])} páginas) em {time.perf_counter() - start:.1f}s -> {root}'
+        ))
+        if len(written) < len(changed):
+            # Ficam fora do manifesto e são tentados de novo no próximo build
+            self.stderr.write(f'{len(changed) - len(written)} posts não puderam ser renderizados.')
+
+    def render_posts(self, root, slugs, workers, chunk_size):
+        # Gera os slugs gravados com sucesso
+        if not slugs:
+            return
+        if workers <= 1:
+            yield from PageRenderer(root).render_posts(slugs)
+            return
+        # Cada processo abre a própria conexão: a herdada do fork não pode ser
+        # compartilhada, então o pai fecha a sua antes de criar o pool
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=init_worker, initargs=(root,)) as pool:
+            for written in pool.map(render_posts_in_worker, chunked(slugs, chunk_size)):
+                yield from written
@@ -0,0 +1,48 @@
+# posts/management/commands/purge_sessions.py
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = ('Apaga as sessões expiradas em lotes pequenos, cada um na sua '
+            'transação, para não segurar o lock da tabela como o DELETE único do '
+            'clearsessions. Sem efeito com sessões em cookie assinado ou só em cache.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0.0,
+                            help='Segundos de espera entre os lotes (deixa as requisições escreverem).')
+
+    def handle(self, *args, **options):
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if not hasattr(store, 'get_model_class'):
+            self.stdout.write(f'{settings.SESSION_ENGINE} não guarda sessões no banco: nada a apagar.')
+            return
+
+        model = store.get_model_class()
+        deleted = batches = 0
+        for count in self.delete_expired(model, options['batch_size']):
+            deleted += count
+            batches += 1
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(f'{deleted} sessões expiradas apagadas em {batches} lotes.'))
+
+    def delete_expired(self, model, batch_size):
+        # Gera quantas sessões cada lote (uma transação) apagou. O corte é fixo:
+        # sessões que expirarem durante a limpeza ficam para a próxima
+        expired = model.objects.filter(expire_date__lt=timezone.now()).order_by()
+        while True:
+            # Um lote de chaves pelo índice de expire_date e o DELETE pela chave primária
+            with transaction.atomic():
+                keys = list(expired.values_list('pk', flat=True)[:batch_size])
+                if not keys:
+                    return
+                deleted = model.objects.filter(pk__in=keys).delete()[0]
+            yield deleted
@@ -0,0 +1,31 @@
+# posts/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.models import Post
+from posts.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de busca de posts (FTS5 ou índice em Python puro) em blocos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        chunk_size = options['chunk_size']
+        backend.clear()
+        indexed = last_pk = 0
+        while True:
+            posts = list(
+                Post.objects.filter(pk__gt=last_pk).order_by('pk')
+                .only('pk', 'title', 'content')[:chunk_size]
+            )
+            if not posts:
+                break
+            with transaction.atomic():
+                backend.index_posts(posts)
+            last_pk = posts[-1].pk
+            indexed += len(posts)
+        self.stdout.write(self.style.SUCCESS(f'{indexed} posts indexados ({backend.name}).'))
@@ -0,0 +1,55 @@
+# posts/management/commands/recount_comments.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+
+from posts.counters import approved_count_subquery, recount_approved_comments
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Recalcula Post.approved_comment_count em blocos, ou apenas '
+            'verifica a consistência do contador (--check).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--check', action='store_true',
+                            help='Não altera nada; falha se algum contador estiver errado.')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        processed = mismatched = 0
+        last_pk = 0
+        # Percorre os posts por faixas de id (keyset), uma transação por bloco,
+        # para não segurar o lock de escrita durante a tabela inteira
+        while True:
+            ids = list(
+                Post.objects.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+            last_pk = ids[-1]
+            wrong = list(
+                Post.objects.filter(pk__in=ids)
+                .annotate(actual=approved_count_subquery())
+                .exclude(approved_comment_count=F('actual'))
+                .values_list('pk', 'approved_comment_count', 'actual')
+            )
+            mismatched += len(wrong)
+            if options['check']:
+                for pk, stored, actual in wrong:
+                    self.stderr.write(f'Post {pk}: contador={stored}, real={actual}')
+            elif wrong:
+                with transaction.atomic():
+                    recount_approved_comments([pk for pk, _, _ in wrong])
+            processed += len(ids)
+
+        if options['check']:
+            if mismatched:
+                raise CommandError(f'{mismatched} de {processed} posts com contador inconsistente.')
+            self.stdout.write(self.style.SUCCESS(f'{processed} posts verificados, todos consistentes.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'{processed} posts verificados, {mismatched} contadores corrigidos.'
+            ))
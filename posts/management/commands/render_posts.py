@@ -0,0 +1,64 @@
+# posts/management/commands/render_posts.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from posts.models import Post
+from posts.rendering import rendered_fields
+from posts.signals import invalidate_after_commit
+
+RENDERED_FIELDS = ('excerpt', 'content_html')
+
+
+class Command(BaseCommand):
+    help = ('Preenche Post.excerpt e Post.content_html em blocos (posts antigos, '
+            'importados com bulk_create ou depois de trocar POSTS_CONTENT_MARKUP). '
+            'Só grava os posts cujo valor mudou; --check apenas verifica.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--check', action='store_true',
+                            help='Não altera nada; falha se algum post estiver desatualizado.')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        processed = stale = 0
+        last_pk = 0
+        # Faixas de id (keyset) e uma transação por bloco: o lock de escrita
+        # do SQLite fica livre entre os blocos para as requisições
+        while True:
+            posts = list(
+                Post.objects.filter(pk__gt=last_pk).order_by('pk')
+                .only('pk', 'slug', 'content', *RENDERED_FIELDS)[:chunk_size]
+            )
+            if not posts:
+                break
+            last_pk = posts[-1].pk
+            changed = []
+            now = timezone.now()
+            for post in posts:
+                fields = rendered_fields(post.content)
+                if any(getattr(post, name) != value for name, value in fields.items()):
+                    for name, value in fields.items():
+                        setattr(post, name, value)
+                    # O HTML servido mudou: ETag/Last-Modified do detalhe, o
+                    # manifesto do publish_static e as chaves dos fragmentos
+                    # vêm de updated_at
+                    post.updated_at = now
+                    changed.append(post)
+            stale += len(changed)
+            processed += len(posts)
+            if changed and not options['check']:
+                with transaction.atomic():
+                    Post.objects.bulk_update(changed, [*RENDERED_FIELDS, 'updated_at'])
+                    # A versão da lista (ETag) muda aqui, e o cache de página
+                    # só é purgado se for compartilhado com o servidor (num
+                    # LocMemCache expira em POSTS_PAGE_CACHE_TIMEOUT)
+                    invalidate_after_commit(*[post.slug for post in changed])
+
+        if options['check']:
+            if stale:
+                raise CommandError(f'{stale} de {processed} posts com resumo/HTML desatualizado.')
+            self.stdout.write(self.style.SUCCESS(f'{processed} posts verificados, todos atualizados.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{processed} posts verificados, {stale} renderizados.'))
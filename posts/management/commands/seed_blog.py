@@ -0,0 +1,183 @@
+# posts/management/commands/seed_blog.py
+import bisect
+import itertools
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from posts.bulk import chunked, preserve_auto_timestamps
+from posts.cache import invalidate_post_pages
+from posts.counters import bump_content_version, recount_approved_comments, recount_author_stats
+from posts.models import Comment, Post
+from posts.search import index_posts
+from posts.slugs import unique_slugs
+
+User = get_user_model()
+
+WORDS = ('django python banco dados índice busca cache consulta página servidor '
+         'template modelo migração usuário comentário artigo rascunho sessão '
+         'desempenho latência memória tráfego leitor autor produção deploy '
+         'fila worker réplica conexão transação bloqueio').split()
+
+
+class Zipf:
+    # Sorteio com pesos 1/rank^s: poucos itens muito frequentes e uma cauda longa
+    def __init__(self, items, s, rng):
+        self.items = list(items)
+        self.cum_weights = list(itertools.accumulate(1 / (rank + 1) ** s for rank in range(len(self.items))))
+        self.rng = rng
+
+    def sample(self, k=1):
+        return self.rng.choices(self.items, cum_weights=self.cum_weights, k=k)
+
+    def one(self):
+        total = self.cum_weights[-1]
+        return self.items[bisect.bisect(self.cum_weights, self.rng.random() * total)]
+
+
+class Command(BaseCommand):
+    help = ('Gera usuários, posts e comentários sintéticos com bulk_create: autores '
+            'concentrados, posts "quentes" com milhares de comentários, rascunhos e '
+            'publicados. Com a mesma --seed, gera sempre os mesmos dados.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=100000)
+        parser.add_argument('--draft-ratio', type=float, default=0.2)
+        parser.add_argument('--hot-posts', type=int, default=10,
+                            help='Posts publicados que recebem --hot-share dos comentários.')
+        parser.add_argument('--hot-share', type=float, default=0.3)
+        parser.add_argument('--approved-ratio', type=float, default=0.85)
+        parser.add_argument('--days', type=int, default=730, help='Período coberto pelas datas.')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--prefix', default='leitor', help='Prefixo dos usernames gerados.')
+        parser.add_argument('--password', default=None,
+                            help='Senha de todos os usuários gerados (padrão: sem senha utilizável).')
+
+    def handle(self, *args, **options):
+        if options['posts'] and not options['users']:
+            raise CommandError('Posts precisam de pelo menos um usuário (--users).')
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        # Datas relativas ao início do dia: a mesma seed gera as mesmas datas no mesmo dia
+        self.end = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.start = self.end - timedelta(days=options['days'])
+        self.words = Zipf(WORDS + [f'termo{i}' for i in range(5000)], 1.1, self.rng)
+        started = time.perf_counter()
+
+        user_ids = self.create_users(options)
+        posts = self.create_posts(options, user_ids)
+        comments, touched = self.create_comments(options, user_ids, posts)
+
+        bump_content_version()
+        invalidate_post_pages()
+        # Detalhes dos posts que ganharam comentários aprovados
+        slugs = [post.slug for post in posts if post.pk in touched]
+        for group in chunked(slugs, 1000):
+            invalidate_post_pages(*group, lists=False)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(user_ids)} usuários, {len(posts)} posts e {comments} comentários em {elapsed:.1f}s.'
+        ))
+
+    def random_date(self, after=None):
+        start = after or self.start
+        return start + (self.end - start) * self.rng.random()
+
+    def text(self, low, high):
+        return ' '.join(self.words.sample(self.rng.randint(low, high)))
+
+    def create_users(self, options):
+        prefix = options['prefix']
+        usernames = [f'{prefix}{i}' for i in range(options['users'])]
+        existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        # Um único hash reaproveitado: make_password por usuário levaria minutos
+        password = make_password(options['password']) if options['password'] else '!'
+        User.objects.bulk_create(
+            [User(username=name, password=password) for name in usernames if name not in existing],
+            batch_size=self.batch_size,
+        )
+        by_name = dict(User.objects.filter(username__in=usernames).values_list('username', 'pk'))
+        return [by_name[name] for name in usernames]
+
+    def create_posts(self, options, user_ids):
+        # Autores em Zipf: os primeiros usuários escrevem a maior parte dos posts
+        authors = Zipf(user_ids, 1.2, self.rng)
+        posts = []
+        with preserve_auto_timestamps(Post):
+            for offset in range(0, options['posts'], self.batch_size):
+                size = min(self.batch_size, options['posts'] - offset)
+                titles = [self.text(3, 8).capitalize() for _ in range(size)]
+                batch = []
+                for title, slug in zip(titles, unique_slugs(titles)):
+                    created_at = self.random_date()
+                    published = self.rng.random() >= options['draft_ratio']
+                    batch.append(Post(
+                        author_id=authors.one(),
+                        title=title[:200],
+                        slug=slug,
+                        content=self.text(40, 400),
+                        status='published' if published else 'draft',
+                        created_at=created_at,
+                        updated_at=created_at,
+                    ))
+                    # bulk_create não chama save(): resumo e HTML calculados aqui
+                    batch[-1].render_content()
+                with transaction.atomic():
+                    Post.objects.bulk_create(batch)
+                    index_posts(batch)
+                posts.extend(batch)
+                self.stdout.write(f'  {len(posts)} posts')
+        # bulk_create não dispara os sinais das estatísticas por autor
+        for ids in chunked(sorted({post.author_id for post in posts}), 1000):
+            with transaction.atomic():
+                recount_author_stats(ids)
+        return posts
+
+    def create_comments(self, options, user_ids, posts):
+        published = [post for post in posts if post.status == 'published']
+        if not published or not options['comments']:
+            return 0, set()
+        hot = published[:options['hot_posts']]
+        # O resto segue Zipf sobre uma ordem embaralhada dos posts publicados
+        rest = published[:]
+        self.rng.shuffle(rest)
+        tail = Zipf(rest, 1.0, self.rng)
+        readers = Zipf(user_ids, 0.8, self.rng)
+
+        def comments():
+            for _ in range(options['comments']):
+                if hot and self.rng.random() < options['hot_share']:
+                    post = self.rng.choice(hot)
+                else:
+                    post = tail.one()
+                yield Comment(
+                    post_id=post.pk,
+                    author_id=readers.one(),
+                    content=self.text(5, 60),
+                    approved=self.rng.random() < options['approved_ratio'],
+                    created_at=self.random_date(after=post.created_at),
+                )
+
+        created = 0
+        touched = set()
+        with preserve_auto_timestamps(Comment):
+            for batch in chunked(comments(), self.batch_size):
+                with transaction.atomic():
+                    Comment.objects.bulk_create(batch)
+                created += len(batch)
+                touched.update(comment.post_id for comment in batch if comment.approved)
+                self.stdout.write(f'  {created} comentários')
+        # bulk_create não dispara os sinais dos contadores
+        for ids in chunked(sorted(touched), 1000):
+            with transaction.atomic():
+                recount_approved_comments(ids)
+        return created, touched
@@ -0,0 +1,80 @@
+# posts/management/commands/stress_slugs.py
+import threading
+import time
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from posts.models import Post
+from posts.slugs import base_slug, save_with_unique_slug
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Cria posts com o mesmo título a partir de várias threads ao mesmo '
+            'tempo e verifica se nenhum cadastro falhou por slug repetido.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=16)
+        parser.add_argument('--per-worker', type=int, default=10)
+        parser.add_argument('--title', default='Título Concorrente Ação')
+        parser.add_argument('--author', default=None,
+                            help='Usuário dono dos posts (padrão: o primeiro superusuário ou usuário).')
+        parser.add_argument('--keep', action='store_true', help='Não apaga os posts criados.')
+
+    def handle(self, *args, **options):
+        author = self.get_author(options['author'])
+        title = options['title']
+        errors = Counter()
+        created = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(options['workers'])
+
+        def worker():
+            barrier.wait()
+            try:
+                for _ in range(options['per_worker']):
+                    post = Post(author=author, title=title, content='stress', status='draft')
+                    try:
+                        save_with_unique_slug(post)
+                    except Exception as error:
+                        with lock:
+                            errors[type(error).__name__] += 1
+                    else:
+                        with lock:
+                            created.append(post.pk)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(options['workers'])]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        slugs = list(Post.objects.filter(pk__in=created).values_list('slug', flat=True))
+        expected = options['workers'] * options['per_worker']
+        self.stdout.write(f'{len(created)}/{expected} posts criados em {elapsed:.2f}s '
+                          f'({len(created) / elapsed:.0f}/s), slugs distintos: {len(set(slugs))}')
+        self.stdout.write(f'base: {base_slug(title)}; erros: {dict(errors) or 0}')
+
+        if not options['keep']:
+            Post.objects.filter(pk__in=created).delete()
+        if errors or len(set(slugs)) != len(created):
+            raise CommandError('Houve falhas na criação concorrente de slugs.')
+
+    def get_author(self, username):
+        if username:
+            try:
+                return User.objects.get(**{User.USERNAME_FIELD: username})
+            except User.DoesNotExist:
+                raise CommandError(f'Usuário {username!r} não existe.')
+        author = User.objects.order_by('-is_superuser', 'pk').first()
+        if author is None:
+            raise CommandError('Crie um usuário antes (createsuperuser).')
+        return author
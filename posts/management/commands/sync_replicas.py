@@ -0,0 +1,43 @@
+# posts/management/commands/sync_replicas.py
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from posts.routers import read_replicas
+
+
+class Command(BaseCommand):
+    help = ('Replicação de mentira para desenvolvimento com SQLite: copia o banco '
+            'primário para cada arquivo de POSTS_READ_REPLICAS com a API de backup '
+            'do SQLite. Com --interval repete a cópia, e o intervalo é o atraso da '
+            'réplica. Em PostgreSQL a replicação é do próprio banco.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0,
+                            help='Segundos entre as cópias (0 copia uma vez e sai).')
+
+    def handle(self, *args, **options):
+        primary = connections['default']
+        if primary.vendor != 'sqlite':
+            raise CommandError('sync_replicas só copia bancos SQLite.')
+        replicas = read_replicas()
+        if not replicas:
+            raise CommandError('Nenhuma réplica configurada (POSTS_DATABASE_REPLICAS).')
+
+        while True:
+            start = time.perf_counter()
+            primary.ensure_connection()
+            for alias in replicas:
+                # Conexões já abertas na réplica (deste ou de outros processos)
+                # enxergam a cópia nova na próxima transação
+                target = sqlite3.connect(connections[alias].settings_dict['NAME'])
+                try:
+                    primary.connection.backup(target)
+                finally:
+                    target.close()
+            self.stdout.write(f'{len(replicas)} réplicas atualizadas em {(time.perf_counter() - start) * 1000:.0f} ms.')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
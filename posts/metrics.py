@@ -0,0 +1,243 @@
+# posts/metrics.py
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+# Limites (em ms) dos buckets dos histogramas de tempo
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Métricas de tempo medidas em cada requisição
+TIMINGS = ('total', 'db', 'template')
+
+
+class Histogram:
+    # Contagem por bucket (não cumulativa), soma e total de observações
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = len(BUCKETS_MS)
+        for i, bound in enumerate(BUCKETS_MS):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other):
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.sum += other.sum
+        self.count += other.count
+
+    def quantile(self, q):
+        # Estimativa pelo limite superior do bucket onde o quantil cai
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS + (float('inf'),), self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float('inf')
+
+
+class RollingHistogram:
+    """
+    Histograma da janela recente: `slots` fatias de window/slots segundos;
+    as fatias mais velhas que a janela são descartadas ao girar.
+    """
+
+    def __init__(self, window=300, slots=10):
+        self.slot_seconds = window / slots
+        self.slots = {}
+        self.max_slots = slots
+
+    def observe(self, value, now):
+        slot = int(now // self.slot_seconds)
+        if slot not in self.slots:
+            self.slots[slot] = Histogram()
+            for old in [s for s in self.slots if s <= slot - self.max_slots]:
+                del self.slots[old]
+        self.slots[slot].observe(value)
+
+    def snapshot(self, now):
+        current = int(now // self.slot_seconds)
+        merged = Histogram()
+        for slot, histogram in self.slots.items():
+            if slot > current - self.max_slots:
+                merged.merge(histogram)
+        return merged
+
+
+class RouteMetrics:
+    """
+    Métricas por rota, em memória e por processo: histogramas cumulativos
+    (para o Prometheus, que calcula as taxas) e da janela recente (para o
+    painel JSON), mais o total de queries.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.routes = {}
+
+    def _route(self, name):
+        if name not in self.routes:
+            self.routes[name] = {
+                'requests': 0,
+                'queries': 0,
+                'cumulative': {timing: Histogram() for timing in TIMINGS},
+                'rolling': {timing: RollingHistogram(*rolling_window()) for timing in TIMINGS},
+            }
+        return self.routes[name]
+
+    def observe(self, route, timings):
+        now = time.time()
+        values = timings.as_dict()
+        with self._lock:
+            data = self._route(route)
+            data['requests'] += 1
+            data['queries'] += timings.queries
+            for timing in TIMINGS:
+                data['cumulative'][timing].observe(values[timing])
+                data['rolling'][timing].observe(values[timing], now)
+
+    def as_dict(self):
+        now = time.time()
+        with self._lock:
+            result = {}
+            for route, data in sorted(self.routes.items()):
+                recent = {timing: data['rolling'][timing].snapshot(now) for timing in TIMINGS}
+                result[route] = {
+                    'requests': data['requests'],
+                    'queries': data['queries'],
+                    'recent': {
+                        timing: {
+                            'count': histogram.count,
+                            'avg_ms': histogram.sum / histogram.count if histogram.count else 0.0,
+                            'p50_ms': histogram.quantile(0.5),
+                            'p95_ms': histogram.quantile(0.95),
+                            'p99_ms': histogram.quantile(0.99),
+                        }
+                        for timing, histogram in recent.items()
+                    },
+                }
+            return result
+
+    def prometheus(self):
+        # Formato de exposição em texto do Prometheus (version 0.0.4)
+        lines = []
+        with self._lock:
+            routes = sorted(self.routes.items())
+            for timing in TIMINGS:
+                name = f'posts_request_{timing}_milliseconds'
+                lines.append(f'# HELP {name} Tempo de {timing} por requisição, por rota.')
+                lines.append(f'# TYPE {name} histogram')
+                for route, data in routes:
+                    histogram = data['cumulative'][timing]
+                    cumulative = 0
+                    for bound, count in zip(BUCKETS_MS + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{route="{route}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_sum{{route="{route}"}} {histogram.sum:.3f}')
+                    lines.append(f'{name}_count{{route="{route}"}} {histogram.count}')
+            lines.append('# HELP posts_request_queries_total Queries executadas, por rota.')
+            lines.append('# TYPE posts_request_queries_total counter')
+            for route, data in routes:
+                lines.append(f'posts_request_queries_total{{route="{route}"}} {data["queries"]}')
+        return '\n'.join(lines) + '\n'
+
+
+def cache_stats_prometheus(caches):
+    # Acertos e falhas dos caches de fragmento e de página (posts/cache.py)
+    lines = []
+    for kind, label in (('hits', 'Acertos'), ('misses', 'Falhas')):
+        name = f'posts_cache_{kind}_total'
+        lines.append(f'# HELP {name} {label} de cache, por cache.')
+        lines.append(f'# TYPE {name} counter')
+        for cache, stats in sorted(caches.items()):
+            lines.append(f'{name}{{cache="{cache}"}} {stats[kind]}')
+    return '\n'.join(lines) + '\n'
+
+
+def rolling_window():
+    return (getattr(settings, 'POSTS_METRICS_WINDOW', 300), 10)
+
+
+route_metrics = RouteMetrics()
+
+
+# ----------------------------------------------------
+# MEDIÇÃO DE UMA REQUISIÇÃO
+# ----------------------------------------------------
+class RequestTimings:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.template = 0.0
+        self.total = None
+
+    def add_template(self, seconds):
+        self.template += seconds
+
+    def finish(self):
+        self.total = time.perf_counter() - self.start
+
+    def as_dict(self):
+        # Em milissegundos
+        total = self.total if self.total is not None else time.perf_counter() - self.start
+        return {'total': total * 1000, 'db': self.db * 1000, 'template': self.template * 1000}
+
+    def server_timing(self):
+        values = self.as_dict()
+        return (f'db;dur={values["db"]:.1f};desc="{self.queries} queries", '
+                f'tpl;dur={values["template"]:.1f}, total;dur={values["total"]:.1f}')
+
+
+# A requisição medida no momento; uma ContextVar segue a requisição também
+# para as threads do sync_to_async (views e ORM async)
+current_timings = contextvars.ContextVar('posts_request_timings', default=None)
+
+
+def timing_execute_wrapper(execute, sql, params, many, context):
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db += time.perf_counter() - start
+        timings.queries += 1
+
+
+def install_execute_wrapper(connection):
+    # Fica instalado na conexão; sem requisição medida, custa um ContextVar.get()
+    if timing_execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(timing_execute_wrapper)
+
+
+@contextmanager
+def measure_template():
+    # Para quem renderiza o template fora do ciclo do TemplateResponse
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add_template(time.perf_counter() - start)
@@ -0,0 +1,200 @@
+# posts/middleware.py
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .metrics import current_timings, install_execute_wrapper, RequestTimings, route_metrics
+from .routers import choose_replica, is_pinned, pin_to_primary, read_replicas, replica_reads
+from .throttling import acheck_ip_throttle, check_throttle, throttled_response, view_throttle_scope
+
+
+def _install_on_new_connection(sender, connection, **kwargs):
+    install_execute_wrapper(connection)
+
+
+def _install_on_open_connections():
+    # Conexões abertas antes do middleware existir (ex.: nos testes)
+    for connection in connections.all(initialized_only=True):
+        install_execute_wrapper(connection)
+
+
+class PerformanceMiddleware:
+    """
+    Mede as requisições das rotas de `posts`: total de queries, tempo de
+    banco, tempo de template e tempo total. Devolve os números no cabeçalho
+    Server-Timing e os acumula em histogramas por rota (posts/metrics.py).
+
+    POSTS_METRICS_ENABLED=False tira o middleware da pilha (MiddlewareNotUsed);
+    POSTS_METRICS_SAMPLE_RATE < 1 mede só uma fração das requisições.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'POSTS_METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'POSTS_METRICS_SAMPLE_RATE', 1.0)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        connection_created.connect(_install_on_new_connection, dispatch_uid='posts_metrics_wrapper')
+        _install_on_open_connections()
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings)
+
+    def sampled(self):
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def process_template_response(self, request, response):
+        # O render acontece logo depois deste hook; o callback marca o fim
+        timings = current_timings.get()
+        if timings is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda r: timings.add_template(time.perf_counter() - started))
+        return response
+
+    def finish(self, request, response, timings):
+        timings.finish()
+        route = route_name(request)
+        if route is not None:
+            route_metrics.observe(route, timings)
+            response['Server-Timing'] = timings.server_timing()
+        return response
+
+
+class WriteThrottleMiddleware:
+    """
+    Limite de escrita (posts/throttling.py) para as views que declaram
+    `throttle_scope`, em duas etapas:
+
+    - o balde do IP, logo no início da pilha: sob ASGI, o POST recusado
+      responde 429 direto do event loop, sem passar pela thread dos
+      middlewares e views síncronos que os leitores também usam;
+    - o balde do usuário, em process_view, quando request.user já existe.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'POSTS_THROTTLE_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        scope = view_throttle_scope(request)
+        if scope is not None:
+            wait = check_throttle(request, scope, 'ip')
+            if wait:
+                return throttled_response(wait)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        scope = view_throttle_scope(request)
+        if scope is not None:
+            wait = await acheck_ip_throttle(request, scope)
+            if wait:
+                return throttled_response(wait)
+        return await self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        scope = view_throttle_scope(request)
+        if scope is not None:
+            wait = check_throttle(request, scope, 'user')
+            if wait:
+                return throttled_response(wait)
+        return None
+
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Decide por requisição se as leituras podem ir para uma réplica
+    (posts/routers.py), sorteada uma vez para a requisição inteira: só
+    GET/HEAD de quem não escreveu há pouco. Um POST
+    bem-sucedido prende o visitante ao primário por POSTS_PRIMARY_PIN_SECONDS
+    com um cookie, sem tocar a sessão, para ele ver o próprio post ou
+    comentário mesmo com a réplica atrasada.
+
+    Sem POSTS_READ_REPLICAS o middleware sai da pilha (MiddlewareNotUsed).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not read_replicas():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def read_replica(self, request):
+        # A réplica de todas as leituras desta requisição, ou None (primário)
+        if request.method in ('GET', 'HEAD') and not is_pinned(request):
+            return choose_replica()
+        return None
+
+    def finish(self, request, response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+            pin_to_primary(response)
+        return response
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with replica_reads(self.read_replica(request)):
+            response = self.get_response(request)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        # O ContextVar acompanha o sync_to_async das views e do ORM
+        with replica_reads(self.read_replica(request)):
+            response = await self.get_response(request)
+        return self.finish(request, response)
+
+def route_name(request):
+    # Só as rotas das views de `posts` (post_list, post_detail, post_create...)
+    match = getattr(request, 'resolver_match', None)
+    if match is None or not match.url_name:
+        return None
+    view = getattr(match.func, 'view_class', match.func)
+    if not view.__module__.startswith('posts.'):
+        return None
+    return match.url_name
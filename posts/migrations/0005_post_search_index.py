@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:23
+
+import django.db.models.deletion
+from django.db import DatabaseError, migrations, models
+
+
+def create_fts_table(apps, schema_editor):
+    # Só no SQLite, e só se ele foi compilado com FTS5; sem a tabela a busca
+    # usa o índice em Python puro (PostSearchTerm, ver posts/search.py)
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE VIRTUAL TABLE posts_post_fts USING fts5("
+                "title, content, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+    except DatabaseError:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            'INSERT INTO posts_post_fts (rowid, title, content) '
+            'SELECT id, title, content FROM posts_post'
+        )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute('DROP TABLE IF EXISTS posts_post_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_post_approved_comment_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveIntegerField(default=1)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='posts.post')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('term', 'post'), name='post_search_term_unique')],
+            },
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:25
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_comment_post_approved_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModerationTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pendente'), ('processing', 'Em processamento'), ('done', 'Concluída'), ('failed', 'Falhou')], default='pending', max_length=10)),
+                ('decision', models.CharField(blank=True, choices=[('approve', 'Aprovado'), ('reject', 'Rejeitado'), ('hold', 'Moderação manual')], max_length=10)),
+                ('reason', models.CharField(blank=True, max_length=255)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['author', 'created_at'], name='comment_author_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='moderationtask',
+            name='comment',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='moderation_task', to='posts.comment'),
+        ),
+        migrations.AddIndex(
+            model_name='moderationtask',
+            index=models.Index(fields=['status', 'run_after', 'id'], name='moderation_queue_idx'),
+        ),
+    ]
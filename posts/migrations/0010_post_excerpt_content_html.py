@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:36
+
+import html
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+# Cópia congelada de posts/rendering.py como era nesta migração: mudanças
+# futuras no renderizador não mudam o que ela faz. O conteúdo ainda era só
+# HTML; com POSTS_CONTENT_MARKUP = 'markdown', rode render_posts depois
+EXCERPT_LENGTH = 250
+
+
+def rendered_fields(content):
+    content_html = content or ''
+    text = ' '.join(html.unescape(strip_tags(content_html)).split())
+    return {'content_html': content_html, 'excerpt': Truncator(text).chars(EXCERPT_LENGTH)}
+
+
+def backfill_rendered_fields(apps, schema_editor):
+    # Sem isto os cards dos posts existentes (que só mostram o excerpt)
+    # ficariam vazios até alguém rodar render_posts; blocos pela chave primária
+    Post = apps.get_model('posts', 'Post')
+    last_pk = 0
+    while True:
+        posts = list(Post.objects.filter(pk__gt=last_pk).order_by('pk').only('pk', 'content')[:500])
+        if not posts:
+            break
+        last_pk = posts[-1].pk
+        for post in posts:
+            for name, value in rendered_fields(post.content).items():
+                setattr(post, name, value)
+        Post.objects.bulk_update(posts, ['excerpt', 'content_html'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_moderation_task'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Conteúdo renderizado'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Resumo'),
+        ),
+        migrations.RunPython(backfill_rendered_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def backfill_author_stats(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    AuthorStats = apps.get_model('posts', 'AuthorStats')
+    rows = (
+        Post.objects.filter(status='published').order_by()
+        .values('author').annotate(total=Count('pk'), latest=Max('created_at'))
+    )
+    AuthorStats.objects.bulk_create(
+        [AuthorStats(author_id=row['author'], post_count=row['total'], latest_post_at=row['latest'])
+         for row in rows],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('posts', '0010_post_excerpt_content_html'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='post_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Posts publicados')),
+                ('latest_post_at', models.DateTimeField(blank=True, null=True, verbose_name='Último post')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', 'status', 'created_at', 'id'], name='post_author_status_created_idx'),
+        ),
+        migrations.RunPython(backfill_author_stats, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,11 @@
 # post/models.py
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.urls import reverse
 
+from .rendering import rendered_fields
+
 # Obtém o Model de Usuário que o Django está usando (boa prática de referência)
 User = get_user_model()
 
@@ -19,9 +21,16 @@ class Post(models.Model):
     # O conteúdo do post
     content = models.TextField(verbose_name='Conteúdo')
 
+    # Gerados a partir do conteúdo a cada save() (ver posts/rendering.py): a
+    # lista mostra só o resumo e nunca precisa carregar o corpo inteiro.
+    # Posts antigos ou gravados com bulk_create: comando render_posts
+    excerpt = models.CharField(max_length=255, blank=True, editable=False, verbose_name='Resumo')
+    content_html = models.TextField(blank=True, editable=False, verbose_name='Conteúdo renderizado')
+
     # URL amigável (slug). Usado em URLs: /blog/um-titulo-de-post
     # unique=True: garante que o slug seja exclusivo
-    slug = models.SlugField(max_length=200, unique=True)
+    # blank=True: em branco no admin, é gerado a partir do título (posts/slugs.py)
+    slug = models.SlugField(max_length=200, unique=True, blank=True)
 
     # Data de criação (automaticamente preenchida na primeira vez)
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
@@ -36,14 +45,63 @@ class Post(models.Model):
     )
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='draft')
 
+    # Contador desnormalizado de comentários aprovados (evita COUNT por post).
+    # Mantido pelos sinais em posts/signals.py e por posts/counters.py
+    approved_comment_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Comentários aprovados'
+    )
+
+    # Tags do post (/tag/<slug>/), pela tabela de ligação PostTag
+    tags = models.ManyToManyField('Tag', through='PostTag', related_name='posts', blank=True)
+
     # Método mágico que define como o post será apresentado
     def __str__(self):
         return self.title
+
+    # Recalcula resumo e HTML sempre que o conteúdo é gravado. O post e as
+    # estatísticas do autor (sinais) são gravados na mesma transação
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if 'content' not in self.get_deferred_fields() and (update_fields is None or 'content' in update_fields):
+            self.render_content()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'excerpt', 'content_html'}
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
+
+    def render_content(self):
+        for name, value in rendered_fields(self.content).items():
+            setattr(self, name, value)
+
+    # Guarda o slug lido do banco: se ele mudar, o cache da URL antiga
+    # também precisa ser invalidado (ver posts/signals.py)
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'slug' in field_names:
+            instance._loaded_slug = instance.slug
+        # Autor e status lidos do banco: AuthorStats só muda quando um deles muda
+        if 'author_id' in field_names and 'status' in field_names:
+            instance._loaded_publication = instance.publication
+        return instance
+
+    @property
+    def publication(self):
+        # (autor, publicado?) — o que conta nas estatísticas do autor
+        return self.author_id, self.status == 'published'
     
     # Classe meta para definir ordenação e outros metadados
     class Meta:
         # Posts serão listados do mais novo para o mais antigo (0 '-' inverte a ordem)
         ordering = ['-created_at']
+        # Índice composto usado pela paginação por cursor da lista de posts
+        indexes = [
+            models.Index(fields=['status', 'created_at', 'id'], name='post_status_created_id_idx'),
+            # Arquivo por autor (/author/<username>/), por cursor (created_at, id)
+            models.Index(fields=['author', 'status', 'created_at', 'id'], name='post_author_status_created_idx'),
+            # Changelist do admin (todos os status) e o date_hierarchy dela
+            models.Index(fields=['created_at', 'id'], name='post_created_id_idx'),
+        ]
     
     def get_absolute_url(self):
         from django.urls import reverse
@@ -79,5 +137,171 @@ class Comment(models.Model):
     def __str__(self):
         return f"Comentário de {self.author} em {self.post.title}"
 
+    # Guarda o estado de aprovação e o post lidos do banco, para o sinal
+    # post_save saber se o contador de algum post precisa mudar (o admin
+    # permite mover um comentário para outro post)
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'approved' in field_names:
+            instance._loaded_approved = instance.approved
+        if 'post_id' in field_names:
+            instance._loaded_post_id = instance.post_id
+        return instance
+
+    # O comentário e o contador do post são gravados na mesma transação
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
+        self._loaded_approved = self.approved
+        self._loaded_post_id = self.post_id
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Comentário aprovado mais recente (validadores da lista) sem ordenar a tabela
+            models.Index(fields=['created_at'], condition=models.Q(approved=True),
+                         name='comment_approved_created_idx'),
+            # Páginas de comentários aprovados de um post, por cursor (created_at, id).
+            # O filtro approved fica na condição do índice parcial: no SQLite
+            # "WHERE approved" não conta como igualdade numa coluna do índice
+            models.Index(fields=['post', 'created_at', 'id'], condition=models.Q(approved=True),
+                         name='comment_post_approved_idx'),
+            # Comentários recentes de cada autor (regras de moderação, posts/moderation.py)
+            models.Index(fields=['author', 'created_at'], name='comment_author_created_idx'),
+            # Changelist do admin (aprovados ou não) e o date_hierarchy dela
+            models.Index(fields=['created_at', 'id'], name='comment_created_id_idx'),
+        ]
+
+class AuthorStats(models.Model):
+    # Agregados por autor mostrados no arquivo do autor, mantidos pelos
+    # sinais de Post (posts/signals.py) em vez de um COUNT por requisição
+    author = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='post_stats')
+    # Só posts publicados
+    post_count = models.PositiveIntegerField(default=0, verbose_name='Posts publicados')
+    latest_post_at = models.DateTimeField(null=True, blank=True, verbose_name='Último post')
+
+    def __str__(self):
+        return f'{self.author}: {self.post_count} posts'
+
+
+class ContentVersion(models.Model):
+    # Versão de um conjunto de páginas (ex.: 'list', a lista de posts),
+    # somada pelos sinais (posts/signals.py) a cada mudança que elas mostram:
+    # o ETag/Last-Modified delas vem de uma busca pela chave primária
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    changed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.name} v{self.version}'
+
+
+class Tag(models.Model):
+    # Categorias dos posts. post_count conta só os posts publicados e é
+    # mantido por posts/tags.py a cada mudança, sem GROUP BY por requisição
+    name = models.CharField(max_length=50, unique=True, verbose_name='Nome')
+    slug = models.SlugField(max_length=50, unique=True)
+    post_count = models.PositiveIntegerField(default=0, editable=False, verbose_name='Posts publicados')
+
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['name']
+        indexes = [
+            # Nuvem de tags: as mais usadas, lidas em ordem pelo índice
+            models.Index(fields=['-post_count', 'name'], name='tag_post_count_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    def get_absolute_url(self):
+        return reverse('tag_posts', args=[self.slug])
+
+
+class PostTag(models.Model):
+    # Ligação post <-> tag. Status e data do post são copiados para cá
+    # (posts/tags.py): o arquivo de uma tag é um intervalo no índice parcial
+    # (tag, created_at, post) WHERE published, sem JOIN com posts_post
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='tag_links')
+    # O índice único (tag, post) já começa pela tag: sem índice próprio
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='post_links', db_index=False)
+    published = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            # Também é o índice das interseções: "o post X tem a tag Y?" é uma busca nele
+            models.UniqueConstraint(fields=['tag', 'post'], name='post_tag_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['tag', 'created_at', 'post'], condition=models.Q(published=True),
+                         name='post_tag_published_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.tag_id} -> {self.post_id}'
+
+
+class PostSearchTerm(models.Model):
+    # Índice invertido usado pela busca quando o banco não tem FTS5
+    # (ver posts/search.py): uma linha por (termo, post)
+    term = models.CharField(max_length=64)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='search_terms')
+    # Ocorrências do termo no post (as do título valem mais)
+    weight = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['term', 'post'], name='post_search_term_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.term} -> {self.post_id}'
+
+
+class ModerationTask(models.Model):
+    # Fila de moderação no próprio banco (ver posts/moderation.py): um
+    # comentário novo vira uma tarefa, processada em lote pelo comando
+    # moderate_comments, fora da requisição
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pendente'),
+        (PROCESSING, 'Em processamento'),
+        (DONE, 'Concluída'),
+        (FAILED, 'Falhou'),
+    )
+
+    # Decisões do pipeline: aprovar, rejeitar (spam) ou deixar para a moderação manual
+    APPROVE = 'approve'
+    REJECT = 'reject'
+    HOLD = 'hold'
+    DECISION_CHOICES = (
+        (APPROVE, 'Aprovado'),
+        (REJECT, 'Rejeitado'),
+        (HOLD, 'Moderação manual'),
+    )
+
+    comment = models.OneToOneField(Comment, on_delete=models.CASCADE, related_name='moderation_task')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    decision = models.CharField(max_length=10, choices=DECISION_CHOICES, blank=True)
+    # Regra que decidiu e o motivo (ex.: "SpamRule: mais de 2 links")
+    reason = models.CharField(max_length=255, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Só é pega pelo worker a partir deste instante (novas tentativas com espera)
+    run_after = models.DateTimeField(default=timezone.now)
+    # Quando um worker pegou a tarefa; tarefas presas há muito tempo voltam à fila
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Próximo lote da fila: status + run_after, na ordem de chegada
+            models.Index(fields=['status', 'run_after', 'id'], name='moderation_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f'Moderação do comentário {self.comment_id} ({self.status})'
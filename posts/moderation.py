@@ -0,0 +1,244 @@
+# posts/moderation.py
+import re
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .counters import set_comments_approval
+from .models import Comment, ModerationTask
+
+# Ordem em que as regras são consultadas; a primeira que decidir vence.
+# Sem decisão de nenhuma, o comentário fica para a moderação manual.
+DEFAULT_RULES = (
+    'posts.moderation.SpamRule',
+    'posts.moderation.RateLimitRule',
+    'posts.moderation.TrustedAuthorRule',
+)
+
+LINK_RE = re.compile(r'https?://|www\.', re.IGNORECASE)
+
+
+def setting(name, default):
+    return getattr(settings, f'POSTS_MODERATION_{name}', default)
+
+
+# ----------------------------------------------------
+# REGRAS
+# ----------------------------------------------------
+class ModerationRule:
+    """
+    Uma regra vê o lote inteiro: prepare() faz as queries de todos os
+    comentários de uma vez e check() decide cada um sem tocar o banco,
+    devolvendo (decisão, motivo) ou None para passar à próxima regra.
+    """
+
+    def prepare(self, comments):
+        pass
+
+    def check(self, comment):
+        return None
+
+
+class SpamRule(ModerationRule):
+    # Links demais, palavras bloqueadas ou o mesmo texto repetido pelo autor
+    def __init__(self):
+        self.max_links = setting('MAX_LINKS', 2)
+        self.blocked_words = [word.lower() for word in setting('BLOCKED_WORDS', ())]
+        self.duplicate_window = setting('DUPLICATE_WINDOW', 60 * 60 * 24)
+
+    def prepare(self, comments):
+        # Só a janela recente de cada autor (índice author + created_at), não o histórico todo
+        since = min(c.created_at for c in comments) - timedelta(seconds=self.duplicate_window)
+        earlier = (
+            Comment.objects
+            .filter(author_id__in={c.author_id for c in comments}, created_at__gte=since,
+                    content__in={c.content for c in comments})
+            .exclude(pk__in=[c.pk for c in comments])
+        )
+        self.seen = set(earlier.values_list('author_id', 'content'))
+
+    def check(self, comment):
+        if len(LINK_RE.findall(comment.content)) > self.max_links:
+            return ModerationTask.REJECT, f'mais de {self.max_links} links'
+        text = comment.content.lower()
+        for word in self.blocked_words:
+            if word in text:
+                return ModerationTask.REJECT, f'palavra bloqueada "{word}"'
+        key = (comment.author_id, comment.content)
+        if key in self.seen:
+            return ModerationTask.REJECT, 'texto repetido'
+        self.seen.add(key)
+        return None
+
+
+class RateLimitRule(ModerationRule):
+    # Mais de `limit` comentários do mesmo autor em `window` segundos
+    def __init__(self):
+        self.limit, self.window = setting('RATE_LIMIT', (5, 600))
+
+    def prepare(self, comments):
+        since = min(c.created_at for c in comments) - timedelta(seconds=self.window)
+        self.counts = dict(
+            Comment.objects
+            .filter(author_id__in={c.author_id for c in comments}, created_at__gte=since)
+            .order_by().values('author_id').annotate(total=Count('pk'))
+            .values_list('author_id', 'total')
+        )
+
+    def check(self, comment):
+        if self.counts.get(comment.author_id, 0) > self.limit:
+            return ModerationTask.HOLD, f'mais de {self.limit} comentários em {self.window}s'
+        return None
+
+
+class TrustedAuthorRule(ModerationRule):
+    # Equipe, ou autores com comentários aprovados e nenhum rejeitado
+    def __init__(self):
+        self.min_approved = setting('TRUSTED_MIN_APPROVED', 3)
+
+    def prepare(self, comments):
+        authors = {c.author_id for c in comments}
+        self.approved = dict(
+            Comment.objects.filter(author_id__in=authors, approved=True)
+            .order_by().values('author_id').annotate(total=Count('pk'))
+            .values_list('author_id', 'total')
+        )
+        self.rejected = set(
+            ModerationTask.objects.filter(comment__author_id__in=authors, decision=ModerationTask.REJECT)
+            .values_list('comment__author_id', flat=True)
+        )
+
+    def check(self, comment):
+        if comment.author.is_staff:
+            return ModerationTask.APPROVE, 'equipe'
+        approved = self.approved.get(comment.author_id, 0)
+        if approved >= self.min_approved and comment.author_id not in self.rejected:
+            return ModerationTask.APPROVE, f'{self.min_approved}+ comentários aprovados'
+        return None
+
+
+def get_rules():
+    # Instâncias novas a cada lote: prepare() guarda o estado do lote
+    return [import_string(path)() for path in setting('RULES', DEFAULT_RULES)]
+
+
+def moderate(comments, rules=None):
+    """
+    Passa os comentários (com o autor carregado) pelo pipeline e retorna
+    {comment_id: (decisão, motivo)}.
+    """
+    if not comments:
+        return {}
+    rules = get_rules() if rules is None else rules
+    for rule in rules:
+        rule.prepare(comments)
+    decisions = {}
+    for comment in comments:
+        for rule in rules:
+            result = rule.check(comment)
+            if result is not None:
+                decision, reason = result
+                decisions[comment.pk] = (decision, f'{type(rule).__name__}: {reason}'[:255])
+                break
+        else:
+            decisions[comment.pk] = (ModerationTask.HOLD, 'nenhuma regra decidiu')
+    return decisions
+
+
+# ----------------------------------------------------
+# FILA
+# ----------------------------------------------------
+def enqueue_moderation(comment):
+    return ModerationTask.objects.create(comment=comment)
+
+
+def claim_tasks(batch_size, now=None):
+    """
+    Pega o próximo lote da fila e o marca como em processamento. No
+    PostgreSQL, SKIP LOCKED deixa vários workers pegarem lotes diferentes;
+    no SQLite a transação IMMEDIATE já serializa os workers. Tarefas presas
+    em processamento além de POSTS_MODERATION_LOCK_TIMEOUT voltam à fila.
+    """
+    now = now or timezone.now()
+    stale = now - timedelta(seconds=setting('LOCK_TIMEOUT', 300))
+    with transaction.atomic():
+        ready = (
+            ModerationTask.objects
+            .filter(Q(status=ModerationTask.PENDING, run_after__lte=now)
+                    | Q(status=ModerationTask.PROCESSING, locked_at__lt=stale))
+            .order_by('id')
+            .select_for_update(skip_locked=True)
+        )
+        ids = list(ready.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return []
+        ModerationTask.objects.filter(pk__in=ids).update(
+            status=ModerationTask.PROCESSING, locked_at=now, attempts=F('attempts') + 1,
+        )
+    return list(ModerationTask.objects.filter(pk__in=ids).select_related('comment__author').order_by('id'))
+
+
+def process_tasks(tasks, rules=None):
+    """
+    Decide o lote e grava tudo numa transação: um UPDATE em massa para os
+    aprovados (set_comments_approval recalcula os contadores e dispara
+    comments_approval_changed, que invalida as páginas no COMMIT) e um
+    UPDATE por (decisão, motivo) nas tarefas. Retorna um Counter por decisão.
+    """
+    # Comentário já aprovado à mão enquanto esperava na fila: nada a decidir
+    pending = [task.comment for task in tasks if not task.comment.approved]
+    decisions = moderate(pending, rules)
+    # Poucos motivos distintos por lote: agrupar sai bem mais barato que o
+    # bulk_update, que monta um CASE WHEN por linha
+    groups = {}
+    for task in tasks:
+        outcome = decisions.get(task.comment_id, (ModerationTask.APPROVE, 'aprovado manualmente'))
+        groups.setdefault(outcome, []).append(task.pk)
+    approve = [pk for pk, (decision, _) in decisions.items() if decision == ModerationTask.APPROVE]
+    now = timezone.now()
+    with transaction.atomic():
+        if approve:
+            set_comments_approval(Comment.objects.filter(pk__in=approve), True)
+        for (decision, reason), ids in groups.items():
+            ModerationTask.objects.filter(pk__in=ids).update(
+                status=ModerationTask.DONE, decision=decision, reason=reason,
+                finished_at=now, locked_at=None,
+            )
+    return Counter({decision: len(ids) for (decision, _), ids in groups.items()})
+
+
+def release_tasks(tasks, error, now=None):
+    # Devolve o lote à fila com espera exponencial; esgotadas as tentativas, falha
+    now = now or timezone.now()
+    max_attempts = setting('MAX_ATTEMPTS', 5)
+    backoff = setting('RETRY_BACKOFF', 30)
+    for task in tasks:
+        task.locked_at = None
+        task.reason = f'erro: {error}'[:255]
+        if task.attempts >= max_attempts:
+            task.status = ModerationTask.FAILED
+            task.finished_at = now
+        else:
+            task.status = ModerationTask.PENDING
+            task.run_after = now + timedelta(seconds=backoff * 2 ** (task.attempts - 1))
+    ModerationTask.objects.bulk_update(tasks, ['status', 'reason', 'run_after', 'locked_at', 'finished_at'])
+
+
+def run_batch(batch_size, rules=None):
+    """
+    Um ciclo do worker. Retorna None com a fila vazia, ou o Counter das
+    decisões; se o lote falhar, ele volta à fila e o erro sobe.
+    """
+    tasks = claim_tasks(batch_size)
+    if not tasks:
+        return None
+    try:
+        return process_tasks(tasks, rules)
+    except Exception as error:
+        release_tasks(tasks, error)
+        raise
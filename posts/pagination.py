@@ -0,0 +1,213 @@
+# posts/pagination.py
+import base64
+import json
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(values, direction):
+    # O cursor é opaco para o leitor: JSON compacto em base64 "url-safe"
+    payload = json.dumps([direction] + list(values), separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        direction, *values = payload
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise InvalidCursor(token)
+    if direction not in ('n', 'p'):
+        raise InvalidCursor(token)
+    return direction, values
+
+
+class CursorPage:
+    # Imita a interface do Page do Django (has_next, has_previous, object_list)
+    # mas sem número de página nem contagem total.
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginação por cursor (keyset) sobre uma ordenação decrescente e única,
+    por padrão (created_at, id). Cada página custa o mesmo que a primeira:
+    não há COUNT(*) nem OFFSET, só um filtro sobre o índice.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('created_at', 'id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+
+    def _key(self, obj):
+        values = []
+        for field in self.ordering:
+            value = getattr(obj, field)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return values
+
+    def _parse_key(self, values):
+        if len(values) != len(self.ordering):
+            raise InvalidCursor(values)
+        parsed = []
+        for field, value in zip(self.ordering, values):
+            model_field = self.queryset.model._meta.get_field(field)
+            if model_field.get_internal_type() == 'DateTimeField':
+                try:
+                    # Bem formada mas impossível ('2020-13-45...') levanta ValueError
+                    value = parse_datetime(value) if isinstance(value, str) else None
+                except ValueError:
+                    value = None
+                if value is None:
+                    raise InvalidCursor(values)
+            else:
+                # null ou lista/objeto no lugar de um escalar viraria
+                # `id__lt=None` (ValueError) ou um filtro sem sentido
+                if value is None or isinstance(value, (list, dict)):
+                    raise InvalidCursor(values)
+                try:
+                    value = model_field.to_python(value)
+                except Exception:
+                    raise InvalidCursor(values)
+                if value is None:
+                    raise InvalidCursor(values)
+            parsed.append(value)
+        return parsed
+
+    def _seek(self, values, lookup):
+        # Monta a <= x AND ((a < x) OR (a = x AND b < y) OR ...). O primeiro
+        # termo redundante permite ao banco usar o índice como um intervalo.
+        condition = Q(**{f'{self.ordering[0]}__{lookup}e': values[0]})
+        alternatives = Q()
+        for i, field in enumerate(self.ordering):
+            clause = Q(**{f'{field}__{lookup}': values[i]})
+            for prev_field, prev_value in zip(self.ordering[:i], values[:i]):
+                clause &= Q(**{prev_field: prev_value})
+            alternatives |= clause
+        return condition & alternatives
+
+    def get_queryset(self, cursor=None):
+        """
+        Retorna (direction, queryset) já fatiado com per_page + 1 linhas;
+        a linha extra só serve para saber se existe outra página.
+        """
+        direction = 'n'
+        queryset = self.queryset
+        if cursor:
+            direction, values = decode_cursor(cursor)
+            values = self._parse_key(values)
+            lookup = 'lt' if direction == 'n' else 'gt'
+            queryset = queryset.filter(self._seek(values, lookup))
+        if direction == 'n':
+            order = [f'-{field}' for field in self.ordering]
+        else:
+            order = list(self.ordering)
+        return direction, queryset.order_by(*order)[:self.per_page + 1]
+
+    def build_page(self, rows, direction, cursor=None):
+        rows = list(rows)
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == 'p':
+            rows.reverse()
+        next_cursor = previous_cursor = None
+        if rows:
+            if direction == 'n':
+                if has_more:
+                    next_cursor = encode_cursor(self._key(rows[-1]), 'n')
+                if cursor:
+                    previous_cursor = encode_cursor(self._key(rows[0]), 'p')
+            else:
+                next_cursor = encode_cursor(self._key(rows[-1]), 'n')
+                if has_more:
+                    previous_cursor = encode_cursor(self._key(rows[0]), 'p')
+        return CursorPage(rows, next_cursor, previous_cursor)
+
+    def page(self, cursor=None):
+        try:
+            direction, queryset = self.get_queryset(cursor)
+        except InvalidCursor:
+            raise Http404('Cursor de paginação inválido.')
+        return self.build_page(queryset, direction, cursor)
+
+    async def apage(self, cursor=None):
+        # Versão async de page(), para as views ASGI (ORM async)
+        try:
+            direction, queryset = self.get_queryset(cursor)
+        except InvalidCursor:
+            raise Http404('Cursor de paginação inválido.')
+        return self.build_page([row async for row in queryset], direction, cursor)
+
+
+def estimate_row_count(model, using):
+    """
+    Número aproximado de linhas da tabela, sem COUNT(*): a estatística do
+    planner no PostgreSQL e no MySQL; no SQLite, o maior rowid (uma busca na
+    árvore da chave primária; conta a mais os ids de linhas apagadas).
+    None quando o banco não tem a estatística.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+        elif connection.vendor == 'mysql':
+            cursor.execute('SELECT table_rows FROM information_schema.tables '
+                           'WHERE table_schema = DATABASE() AND table_name = %s', [table])
+        elif connection.vendor == 'sqlite':
+            cursor.execute(f'SELECT MAX(rowid) FROM {connection.ops.quote_name(table)}')
+        else:
+            return None
+        row = cursor.fetchone()
+    # reltuples é -1 numa tabela que ainda não passou por ANALYZE
+    return row[0] if row and row[0] is not None and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator das changelists de tabelas grandes (posts/admin.py). Sem
+    filtro, o total vem da estatística da tabela (estimate_row_count); com
+    filtro, o COUNT para em POSTS_ADMIN_COUNT_LIMIT linhas, e as páginas
+    além do limite deixam de ser oferecidas. Tabelas pequenas continuam com
+    o COUNT(*) exato.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        limit = getattr(settings, 'POSTS_ADMIN_COUNT_LIMIT', 10000)
+        if not queryset.query.has_filters():
+            estimate = estimate_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > limit:
+                return estimate
+        return queryset.order_by()[:limit].count()
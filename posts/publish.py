@@ -0,0 +1,179 @@
+# posts/publish.py
+"""
+Pré-renderização das páginas públicas em HTML estático (comando
+publish_static). Cada página é pedida às próprias views, como um visitante
+anônimo, e gravada em <raiz>/<caminho>/index.html; páginas com query string
+(?cursor=... da lista) vão para <raiz>/<caminho>/_query/<query>.html. Um
+servidor na frente pode servir os arquivos e só mandar ao Django quem tem
+cookie de sessão ou pede uma página que não existe, por exemplo (nginx):
+
+    location / {
+        if ($cookie_sessionid) { proxy_pass http://django; }
+        try_files $uri/_query/$args.html $uri/index.html @django;
+    }
+"""
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db.models import OuterRef
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .counters import content_version
+from .models import Post
+from .pagination import KeysetPaginator
+from .views import PostListView, detail_validators, latest_approved_comment, list_validators
+
+MANIFEST_NAME = '.publish-manifest.json'
+
+
+def publish_root():
+    return getattr(settings, 'POSTS_PUBLISH_ROOT', os.path.join(settings.BASE_DIR, 'public'))
+
+
+def static_file(root, path, query=''):
+    # '/ola/' -> <raiz>/ola/index.html; '/' + 'cursor=abc' -> <raiz>/_query/cursor=abc.html
+    directory = os.path.join(root, *[part for part in path.split('/') if part])
+    if query:
+        return os.path.join(directory, '_query', f'{query}.html')
+    return os.path.join(directory, 'index.html')
+
+
+def write_atomic(filename, content):
+    """
+    Grava num arquivo temporário no mesmo diretório e troca com os.replace:
+    quem lê o arquivo vê a versão antiga ou a nova, nunca uma pela metade.
+    """
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(filename), prefix='.tmp-')
+    try:
+        with os.fdopen(descriptor, 'wb') as output:
+            output.write(content)
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, filename)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def remove_file(filename):
+    # Apaga a página e os diretórios que ficarem vazios (nunca a raiz)
+    try:
+        os.unlink(filename)
+        os.removedirs(os.path.dirname(filename))
+    except OSError:
+        pass
+
+
+def load_manifest(root):
+    try:
+        with open(os.path.join(root, MANIFEST_NAME), encoding='utf-8') as manifest:
+            return json.load(manifest)
+    except (OSError, ValueError):
+        return {'posts': {}, 'list': None, 'list_files': []}
+
+
+def save_manifest(root, manifest):
+    manifest['built_at'] = timezone.now().isoformat()
+    write_atomic(os.path.join(root, MANIFEST_NAME), json.dumps(manifest, indent=1, sort_keys=True).encode())
+
+
+def detail_fingerprints():
+    """
+    (slug, ETag) de cada post publicado, numa query só. O ETag é o mesmo do
+    PostDetailView (updated_at, contador e último comentário aprovado): um
+    comentário novo também muda a página, não só o updated_at.
+    """
+    rows = (
+        Post.objects.filter(status='published')
+        .annotate(latest_comment=latest_approved_comment(post=OuterRef('pk')))
+        .order_by('pk')
+        .values_list('slug', 'pk', 'updated_at', 'approved_comment_count', 'latest_comment')
+        .iterator(chunk_size=2000)
+    )
+    for slug, *validators in rows:
+        yield slug, detail_validators(validators)[0]
+
+
+def list_fingerprint():
+    return list_validators(content_version().first(), '')[0]
+
+
+class PageRenderer:
+    """
+    Pede as páginas às views pelo cliente de testes do Django, como um
+    visitante anônimo: mesmos templates, middlewares e context processors
+    do site. O cache de página fica desligado para não servir uma cópia.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.client = Client()
+        self.settings = override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'], POSTS_PAGE_CACHE_ENABLED=False,
+        )
+
+    def render(self, path, query=''):
+        # Retorna (arquivo, resposta); só grava respostas 200
+        with self.settings:
+            response = self.client.get(f'{path}?{query}' if query else path)
+        filename = static_file(self.root, path, query)
+        if response.status_code == 200:
+            write_atomic(filename, response.content)
+        return filename, response
+
+    def render_posts(self, slugs):
+        # Retorna os slugs gravados com sucesso
+        written = []
+        for slug in slugs:
+            _, response = self.render(reverse('post_detail', args=[slug]))
+            if response.status_code == 200:
+                written.append(slug)
+        return written
+
+    def list_queries(self, pages):
+        # Query string das primeiras `pages` páginas da lista, na ordem dos
+        # links "Próxima" (cursor ou número, conforme POSTS_PAGINATION_MODE)
+        view = PostListView()
+        queryset = view.get_queryset()
+        if view.get_pagination_mode() != 'cursor':
+            total = Paginator(queryset, view.paginate_by).num_pages
+            return [''] + [f'page={number}' for number in range(2, min(pages, total) + 1)]
+        paginator = KeysetPaginator(queryset, view.paginate_by)
+        queries, cursor = [''], None
+        while len(queries) < pages:
+            # Só as chaves da página: o cursor da seguinte sai da última linha
+            page = paginator.page(cursor)
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+            queries.append(f'cursor={cursor}')
+        return queries
+
+    def render_list(self, pages):
+        # Retorna os arquivos gravados, relativos à raiz
+        path = reverse('post_list')
+        files = []
+        for query in self.list_queries(pages):
+            filename, response = self.render(path, query)
+            if response.status_code != 200:
+                break
+            files.append(os.path.relpath(filename, self.root))
+        return files
+
+
+# Um renderizador por processo do pool (ver publish_static)
+_worker_renderer = None
+
+
+def init_worker(root):
+    global _worker_renderer
+    _worker_renderer = PageRenderer(root)
+
+
+def render_posts_in_worker(slugs):
+    return _worker_renderer.render_posts(slugs)
@@ -0,0 +1,37 @@
+# posts/rendering.py
+import html
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+# Tamanho do resumo mostrado nos cards da lista e da busca
+EXCERPT_LENGTH = 250
+
+
+def render_content(content):
+    """
+    HTML do corpo do post. Com POSTS_CONTENT_MARKUP = 'markdown' o texto
+    passa pelo pacote markdown (opcional); senão o conteúdo já é HTML.
+    """
+    markup = getattr(settings, 'POSTS_CONTENT_MARKUP', 'html')
+    if markup == 'markdown':
+        try:
+            import markdown
+        except ImportError:
+            raise ImproperlyConfigured("POSTS_CONTENT_MARKUP = 'markdown' precisa do pacote markdown.")
+        return markdown.markdown(content or '')
+    return content or ''
+
+
+def render_excerpt(content_html):
+    # Texto puro (sem tags nem entidades) cortado como o truncatechars:250 fazia
+    text = ' '.join(html.unescape(strip_tags(content_html)).split())
+    return Truncator(text).chars(EXCERPT_LENGTH)
+
+
+def rendered_fields(content):
+    # Valores das colunas pré-calculadas para um conteúdo
+    content_html = render_content(content)
+    return {'content_html': content_html, 'excerpt': render_excerpt(content_html)}
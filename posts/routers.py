@@ -0,0 +1,92 @@
+# posts/routers.py
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+# Cookie que prende o visitante ao primário logo depois de uma escrita; o
+# valor é o instante (epoch) em que a janela acaba
+PIN_COOKIE = 'posts_primary'
+
+# Réplica sorteada pelo ReplicaRoutingMiddleware para a requisição inteira,
+# só durante GETs/HEADs de quem não está preso ao primário. Fora de
+# requisições (comandos, shell, workers de moderação) fica None e as
+# leituras continuam no primário, como as escritas.
+_read_replica = ContextVar('posts_read_replica', default=None)
+
+
+def read_replicas():
+    return getattr(settings, 'POSTS_READ_REPLICAS', [])
+
+
+def pin_seconds():
+    return getattr(settings, 'POSTS_PRIMARY_PIN_SECONDS', 5)
+
+
+def is_pinned(request):
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def pin_to_primary(response):
+    # Lê-suas-escritas: as próximas requisições deste visitante vão ao
+    # primário até a réplica ter tido tempo de receber a escrita
+    seconds = pin_seconds()
+    response.set_cookie(PIN_COOKIE, f'{time.time() + seconds:.3f}', max_age=seconds,
+                        httponly=True, samesite='Lax', secure=settings.SESSION_COOKIE_SECURE)
+
+
+def choose_replica():
+    # Uma por requisição: ETag, post e comentários lidos de réplicas com
+    # atrasos diferentes poderiam montar uma página que nunca existiu
+    replicas = read_replicas()
+    return random.choice(replicas) if replicas else None
+
+
+@contextmanager
+def replica_reads(alias):
+    token = _read_replica.set(alias)
+    try:
+        yield
+    finally:
+        _read_replica.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Leituras na réplica escolhida pelo middleware para a requisição; escritas (e
+    leituras feitas para escrever, como get_or_create e select_for_update)
+    sempre no primário. Sem POSTS_READ_REPLICAS tudo fica no 'default'.
+    """
+
+    # Lidos sempre no primário: a sessão criada no login ainda não está na
+    # réplica, e lê-la de lá deslogaria o visitante
+    primary_apps = ('sessions',)
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in self.primary_apps:
+            return 'default'
+        alias = _read_replica.get()
+        # Dentro de uma transação no primário a leitura precisa ver o que ela escreveu
+        if alias and not connections['default'].in_atomic_block:
+            return alias
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primário e réplicas têm os mesmos dados
+        databases = {'default', *read_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # As réplicas recebem o esquema pela replicação, não pelo migrate
+        return False if db in read_replicas() else None
@@ -0,0 +1,258 @@
+# posts/search.py
+import math
+import re
+import unicodedata
+from collections import Counter
+
+from django.db import connections
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+
+from .models import Post, PostSearchTerm
+
+FTS_TABLE = 'posts_post_fts'
+
+# Palavras muito comuns que não ajudam a ordenar os resultados
+STOPWORDS = frozenset('''
+    a ao aos as com como da das de do dos e em na nas no nos o os ou para
+    por que se sem um uma uns umas the and of to in is
+'''.split())
+
+# Peso de um termo que aparece no título em relação ao conteúdo
+TITLE_WEIGHT = 5
+
+# Tamanho da coluna PostSearchTerm.term: termos maiores são cortados antes
+# de contar (indexar) e de buscar, para os dois lados baterem
+TERM_MAX_LENGTH = PostSearchTerm._meta.get_field('term').max_length
+
+
+def tokenize(text):
+    # Minúsculas, sem acentos ("Ação" -> "acao"), só palavras com 2+ letras
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode().lower()
+    return [word for word in re.findall(r'\w+', text) if len(word) > 1 and word not in STOPWORDS]
+
+
+def query_terms(query):
+    # Termos únicos da busca, na ordem em que apareceram
+    return list(dict.fromkeys(tokenize(query)))[:10]
+
+
+def fts5_table_exists(using='default'):
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        return cursor.fetchone() is not None
+
+
+class FTS5SearchBackend:
+    """Índice invertido do próprio SQLite (FTS5), ordenado por bm25."""
+
+    name = 'fts5'
+
+    def __init__(self, using='default'):
+        self.using = using
+
+    def index_posts(self, posts):
+        rows = [(post.pk, post.title, post.content) for post in posts]
+        if not rows:
+            return
+        # REPLACE pelo rowid (= id do post): um único comando por post
+        with connections[self.using].cursor() as cursor:
+            cursor.executemany(
+                f'INSERT OR REPLACE INTO {FTS_TABLE} (rowid, title, content) VALUES (%s, %s, %s)', rows
+            )
+
+    def remove_posts(self, post_ids):
+        with connections[self.using].cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(pk,) for pk in post_ids])
+
+    def clear(self):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+    def _match(self, terms, prefix=False):
+        # Cada termo entre aspas (sem operadores vindos do usuário); espaço = AND.
+        # Com prefix, "djan"* casa com django, djangonauta...
+        star = '*' if prefix else ''
+        return ' '.join(f'"{term}"{star}' for term in terms)
+
+    # CROSS JOIN força o SQLite a partir do índice FTS5 e só depois buscar
+    # o post pelo id; com JOIN simples ele pode varrer posts_post inteiro
+
+    def _where(self, published_only):
+        where = f'{FTS_TABLE} MATCH %s'
+        if published_only:
+            where += " AND p.status = 'published'"
+        return where
+
+    def count(self, terms, published_only=True, prefix=False):
+        sql = (f'SELECT COUNT(*) FROM {FTS_TABLE} CROSS JOIN posts_post p ON p.id = {FTS_TABLE}.rowid '
+               f'WHERE {self._where(published_only)}')
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(sql, [self._match(terms, prefix)])
+            return cursor.fetchone()[0]
+
+    def search(self, terms, offset, limit, published_only=True, prefix=False):
+        sql = (f'SELECT {FTS_TABLE}.rowid FROM {FTS_TABLE} '
+               f'CROSS JOIN posts_post p ON p.id = {FTS_TABLE}.rowid '
+               f'WHERE {self._where(published_only)} '
+               f'ORDER BY bm25({FTS_TABLE}, {float(TITLE_WEIGHT)}, 1.0), p.created_at DESC '
+               f'LIMIT %s OFFSET %s')
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(sql, [self._match(terms, prefix), limit, offset])
+            return [row[0] for row in cursor.fetchall()]
+
+
+class InvertedIndexSearchBackend:
+    """
+    Índice invertido em Python puro, guardado na tabela PostSearchTerm
+    (termo, post, peso). Funciona em qualquer banco; a ordenação é tf-idf.
+    """
+
+    name = 'inverted'
+
+    def __init__(self, using='default'):
+        self.using = using
+
+    def _terms_for(self, post):
+        # Cortados antes de contar: dois termos longos com o mesmo começo
+        # viram uma linha só (a restrição única é (termo, post))
+        weights = Counter(word[:TERM_MAX_LENGTH] for word in tokenize(post.content))
+        for word in tokenize(post.title):
+            weights[word[:TERM_MAX_LENGTH]] += TITLE_WEIGHT
+        return [
+            PostSearchTerm(post_id=post.pk, term=term, weight=weight)
+            for term, weight in weights.items()
+        ]
+
+    def _query_terms(self, terms):
+        # O mesmo corte do índice; termos que ficam iguais contam uma vez
+        return list(dict.fromkeys(term[:TERM_MAX_LENGTH] for term in terms))
+
+    def index_posts(self, posts):
+        posts = list(posts)
+        if not posts:
+            return
+        PostSearchTerm.objects.using(self.using).filter(post__in=[p.pk for p in posts]).delete()
+        terms = [term for post in posts for term in self._terms_for(post)]
+        PostSearchTerm.objects.using(self.using).bulk_create(terms, batch_size=1000)
+
+    def remove_posts(self, post_ids):
+        PostSearchTerm.objects.using(self.using).filter(post__in=list(post_ids)).delete()
+
+    def clear(self):
+        PostSearchTerm.objects.using(self.using).all().delete()
+
+    def _term_filter(self, term, prefix):
+        return Q(term__startswith=term) if prefix else Q(term=term)
+
+    def _matches(self, terms, published_only, prefix=False):
+        terms = self._query_terms(terms)
+        if prefix:
+            lookup = Q()
+            for term in terms:
+                lookup |= self._term_filter(term, prefix)
+        else:
+            lookup = Q(term__in=terms)
+        queryset = PostSearchTerm.objects.using(self.using).filter(lookup)
+        if published_only:
+            queryset = queryset.filter(post__status='published')
+        # Só posts que contêm todos os termos (AND, como no FTS5)
+        if prefix:
+            # Um prefixo pode casar com vários termos do post: conta por prefixo
+            matched = {f'matched_{i}': Count('pk', filter=self._term_filter(term, prefix))
+                       for i, term in enumerate(terms)}
+            return (queryset.values('post').annotate(**matched)
+                    .filter(**{f'{name}__gt': 0 for name in matched}))
+        return (queryset.values('post')
+                .annotate(matched=Count('term', distinct=True))
+                .filter(matched=len(terms)))
+
+    def count(self, terms, published_only=True, prefix=False):
+        return self._matches(terms, published_only, prefix).count()
+
+    def search(self, terms, offset, limit, published_only=True, prefix=False):
+        # idf calculado a partir da frequência de documentos de cada termo.
+        # O total de posts é estimado pelo maior id (uma busca na chave
+        # primária) em vez de um COUNT(*) da tabela inteira a cada busca
+        terms = self._query_terms(terms)
+        total = Post.objects.using(self.using).order_by('-pk').values_list('pk', flat=True).first() or 1
+        document_frequency = dict(
+            PostSearchTerm.objects.using(self.using).filter(term__in=terms)
+            .values_list('term').annotate(df=Count('post'))
+        )
+        score = Sum(Case(
+            *[When(self._term_filter(term, prefix),
+                   then=F('weight') * Value(math.log(1 + total / document_frequency.get(term, 1))))
+              for term in terms],
+            default=Value(0.0),
+            output_field=FloatField(),
+        ))
+        rows = (self._matches(terms, published_only, prefix)
+                .annotate(score=score)
+                .order_by('-score', '-post__created_at')
+                .values_list('post', flat=True)[offset:offset + limit])
+        return list(rows)
+
+
+_backend_cache = {}
+
+
+def get_search_backend(using='default'):
+    # FTS5 quando a tabela virtual existe (criada pela migração 0005), senão
+    # o índice em Python puro
+    if using not in _backend_cache:
+        backend = FTS5SearchBackend if fts5_table_exists(using) else InvertedIndexSearchBackend
+        _backend_cache[using] = backend(using)
+    return _backend_cache[using]
+
+
+def index_posts(posts, using='default'):
+    get_search_backend(using).index_posts(posts)
+
+
+def remove_posts(post_ids, using='default'):
+    get_search_backend(using).remove_posts(post_ids)
+
+
+class SearchResults:
+    """
+    Resultado paginável de uma busca: o Paginator do Django só precisa de
+    count() e de fatias, e cada fatia busca apenas os posts daquela página.
+    """
+
+    def __init__(self, query, published_only=True, using='default', prefix=False):
+        self.terms = query_terms(query)
+        self.published_only = published_only
+        self.prefix = prefix
+        self.backend = get_search_backend(using)
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count = self.backend.count(self.terms, self.published_only, self.prefix) if self.terms else 0
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def ids(self, offset=0, limit=1000):
+        if not self.terms:
+            return []
+        return self.backend.search(self.terms, offset, limit, self.published_only, self.prefix)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        offset = index.start or 0
+        ids = self.ids(offset, (index.stop or offset + 1000) - offset)
+        # Só o que o card mostra: sem o corpo do post (ver Post.excerpt)
+        posts = Post.objects.filter(pk__in=ids).select_related('author').defer('content', 'content_html').in_bulk()
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+def search_posts(query, published_only=True, using='default', prefix=False):
+    # prefix=True casa cada termo pelo começo ("djan" acha "django"): busca
+    # e autocomplete do admin, onde o texto ainda está sendo digitado
+    return SearchResults(query, published_only, using, prefix)
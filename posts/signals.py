@@ -0,0 +1,183 @@
+# posts/signals.py
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .auth import forget_cached_user
+from .cache import invalidate_post_pages
+from .counters import (
+    adjust_approved_comment_count, adjust_author_stats, bump_content_version, comments_approval_changed,
+    recount_author_stats,
+)
+from .models import Comment, Post
+from .search import index_posts, remove_posts
+from .tags import forget_author_posts, forget_post, sync_post_links
+
+
+def invalidate_after_commit(*slugs, lists=True):
+    # Só invalida depois do COMMIT: antes disso um leitor ainda poderia
+    # recolocar no cache a versão antiga da página. A versão da lista (o
+    # ETag dela) muda já, na mesma transação da mudança
+    if lists:
+        bump_content_version()
+    transaction.on_commit(lambda: invalidate_post_pages(*slugs, lists=lists))
+
+
+# ----------------------------------------------------
+# CONTADOR DE COMENTÁRIOS APROVADOS
+# ----------------------------------------------------
+@receiver(post_save, sender=Comment)
+def update_count_on_comment_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = False if created else getattr(instance, '_loaded_approved', None)
+    if previous is None:
+        # Instância criada à mão (sem from_db): não sabemos o estado anterior
+        return
+    previous_post = instance.post_id if created else getattr(instance, '_loaded_post_id', instance.post_id)
+    if previous_post != instance.post_id:
+        # Movido para outro post: sai da contagem do antigo, entra na do novo
+        if previous:
+            adjust_approved_comment_count(previous_post, -1)
+        if instance.approved:
+            adjust_approved_comment_count(instance.post_id, 1)
+    elif instance.approved != previous:
+        adjust_approved_comment_count(instance.post_id, 1 if instance.approved else -1)
+
+
+@receiver(post_delete, sender=Comment)
+def update_count_on_comment_delete(sender, instance, origin=None, **kwargs):
+    # Se o próprio post está sendo apagado, não há contador para atualizar
+    if isinstance(origin, Post) or (isinstance(origin, QuerySet) and origin.model is Post):
+        return
+    if instance.approved:
+        adjust_approved_comment_count(instance.post_id, -1)
+
+
+# ----------------------------------------------------
+# ESTATÍSTICAS POR AUTOR
+# ----------------------------------------------------
+@receiver(post_save, sender=Post)
+def update_author_stats_on_post_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    current = instance.publication
+    previous = (None, False) if created else getattr(instance, '_loaded_publication', None)
+    instance._loaded_publication = current
+    if previous is None:
+        # Instância criada à mão (sem from_db): recalcula o autor atual
+        recount_author_stats([instance.author_id])
+        sync_post_links(instance)
+    elif previous != current:
+        # Editar um post sem mudar autor nem status não custa nenhuma query
+        previous_author, was_published = previous
+        if was_published:
+            adjust_author_stats(previous_author, -1)
+        if current[1]:
+            adjust_author_stats(instance.author_id, 1)
+        # Publicado ou despublicado: as ligações com as tags acompanham
+        if was_published != current[1]:
+            sync_post_links(instance)
+
+
+@receiver(post_delete, sender=Post)
+def update_author_stats_on_post_delete(sender, instance, origin=None, **kwargs):
+    # Se o próprio autor está sendo apagado, as estatísticas vão junto
+    User = get_user_model()
+    if isinstance(origin, User) or (isinstance(origin, QuerySet) and origin.model is User):
+        return
+    if instance.status == 'published':
+        adjust_author_stats(instance.author_id, -1)
+
+
+# ----------------------------------------------------
+# CONTADORES DAS TAGS (publicar/despublicar: ver acima)
+# ----------------------------------------------------
+# pre_delete: as ligações PostTag ainda existem (o CASCADE vem depois)
+@receiver(pre_delete, sender=Post)
+def update_tag_counts_on_post_delete(sender, instance, origin=None, **kwargs):
+    # Autor sendo apagado: update_tag_counts_on_author_delete já descontou tudo
+    User = get_user_model()
+    if isinstance(origin, User) or (isinstance(origin, QuerySet) and origin.model is User):
+        return
+    forget_post(instance)
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def update_tag_counts_on_author_delete(sender, instance, **kwargs):
+    forget_author_posts(instance.pk)
+
+# ----------------------------------------------------
+# INVALIDAÇÃO DO CACHE DE PÁGINA
+# ----------------------------------------------------
+@receiver(post_save, sender=Post)
+def invalidate_pages_on_post_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old_slug = getattr(instance, '_loaded_slug', None)
+    invalidate_after_commit(instance.slug, old_slug if old_slug != instance.slug else None)
+    instance._loaded_slug = instance.slug
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_pages_on_post_delete(sender, instance, **kwargs):
+    invalidate_after_commit(instance.slug)
+
+
+@receiver(post_save, sender=Comment)
+def invalidate_pages_on_comment_save(sender, instance, created, raw=False, **kwargs):
+    # Comentário pendente não aparece em lugar nenhum: nada a invalidar
+    if raw:
+        return
+    previous = False if created else getattr(instance, '_loaded_approved', None)
+    if not (instance.approved or previous):
+        return
+    slugs = [instance.post.slug]
+    previous_post = getattr(instance, '_loaded_post_id', instance.post_id)
+    if not created and previous_post != instance.post_id:
+        # Movido para outro post: a página do post antigo também muda
+        slugs.append(Post.objects.filter(pk=previous_post).values_list('slug', flat=True).first())
+    invalidate_after_commit(*slugs)
+
+
+@receiver(post_delete, sender=Comment)
+def invalidate_pages_on_comment_delete(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Post) or (isinstance(origin, QuerySet) and origin.model is Post):
+        return
+    if instance.approved:
+        invalidate_after_commit(Post.objects.filter(pk=instance.post_id).values_list('slug', flat=True).first())
+
+
+@receiver(comments_approval_changed)
+def invalidate_pages_on_bulk_approval(sender, post_ids, **kwargs):
+    slugs = list(Post.objects.filter(pk__in=post_ids).values_list('slug', flat=True))
+    invalidate_after_commit(*slugs)
+
+
+# ----------------------------------------------------
+# ÍNDICE DE BUSCA
+# ----------------------------------------------------
+@receiver(post_save, sender=Post)
+def update_search_index_on_post_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_posts([instance])
+
+
+@receiver(post_delete, sender=Post)
+def update_search_index_on_post_delete(sender, instance, **kwargs):
+    remove_posts([instance.pk])
+
+
+# ----------------------------------------------------
+# CACHE DE USUÁRIOS (posts/auth.py)
+# ----------------------------------------------------
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def forget_cached_user_on_change(sender, instance, **kwargs):
+    # Apaga já (a própria requisição não lê a versão antiga) e de novo
+    # depois do COMMIT, caso outra requisição tenha recolocado a antiga
+    forget_cached_user(instance.pk)
+    transaction.on_commit(lambda: forget_cached_user(instance.pk))
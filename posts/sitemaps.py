@@ -0,0 +1,121 @@
+# posts/sitemaps.py
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Max
+from django.urls import reverse
+
+from .bulk import chunked
+from .counters import content_version
+from .models import AuthorStats, Post
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def shard_size():
+    # O protocolo aceita até 50.000 URLs por arquivo
+    return getattr(settings, 'POSTS_SITEMAP_SHARD_SIZE', 50000)
+
+
+class SitemapSection:
+    """
+    Um tipo de página do sitemap, dividido em shards por faixa de chave
+    primária: o shard N cobre pk em [N * tamanho + 1, (N + 1) * tamanho].
+    Achar um shard é um intervalo no índice da pk, sem OFFSET, e nenhum
+    shard passa do limite do protocolo (buracos na pk só o deixam menor).
+    """
+
+    pk_field = 'pk'
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def entries(self, queryset):
+        # Gera (caminho, lastmod) a partir das linhas do shard
+        raise NotImplementedError
+
+    def lastmod_field(self):
+        raise NotImplementedError
+
+    def shard_count(self):
+        top = self.get_queryset().aggregate(top=Max(self.pk_field))['top']
+        return (top - 1) // shard_size() + 1 if top else 0
+
+    def shard(self, number):
+        size = shard_size()
+        return self.get_queryset().filter(**{
+            f'{self.pk_field}__gt': number * size, f'{self.pk_field}__lte': (number + 1) * size,
+        }).order_by(self.pk_field)
+
+    def validators(self, number):
+        # A versão da lista (ver posts/counters.py) muda com qualquer post
+        # salvo, apagado ou (des)publicado, o que cobre as URLs e os lastmod
+        # de todas as seções: uma busca pela chave primária em vez de varrer
+        # o shard. Shard inexistente: a view devolve o 404 normalmente
+        version, changed_at = content_version().first() or (0, None)
+        return f'sitemap:{type(self).__name__}:{number}:{version}', changed_at
+
+
+class PostSitemap(SitemapSection):
+    def get_queryset(self):
+        return Post.objects.filter(status='published')
+
+    def lastmod_field(self):
+        return 'updated_at'
+
+    def entries(self, queryset):
+        # Um reverse() por linha custaria mais que o resto; o caminho vem de
+        # um modelo com o slug trocado (slugs não precisam de escape)
+        template = reverse('post_detail', args=['__slug__'])
+        for slug, updated_at in queryset.values_list('slug', 'updated_at').iterator(chunk_size=2000):
+            yield template.replace('__slug__', slug), updated_at
+
+
+class AuthorSitemap(SitemapSection):
+    # Arquivos de autor com pelo menos um post publicado (ver AuthorStats)
+    pk_field = 'author_id'
+
+    def get_queryset(self):
+        return AuthorStats.objects.filter(post_count__gt=0)
+
+    def lastmod_field(self):
+        return 'latest_post_at'
+
+    def entries(self, queryset):
+        rows = queryset.values_list('author__username', 'latest_post_at').iterator(chunk_size=2000)
+        for username, latest_post_at in rows:
+            yield reverse('author_posts', args=[username]), latest_post_at
+
+
+SECTIONS = {
+    'posts': PostSitemap(),
+    'authors': AuthorSitemap(),
+}
+
+
+def sitemap_index(base_url):
+    # O índice é pequeno (um <sitemap> por shard): montado de uma vez
+    lines = [XML_HEADER, f'<sitemapindex xmlns="{SITEMAP_NS}">\n']
+    for name, section in SECTIONS.items():
+        for number in range(section.shard_count()):
+            location = base_url + reverse('sitemap_shard', args=[name, number])
+            lines.append(f'<sitemap><loc>{escape(location)}</loc></sitemap>\n')
+    lines.append('</sitemapindex>\n')
+    return ''.join(lines)
+
+
+def stream_urlset(base_url, entries, batch_size=500):
+    """
+    Gera o XML de um shard aos pedaços (para StreamingHttpResponse): as
+    linhas vêm do cursor do banco em blocos, e nem a lista de posts nem o
+    documento inteiro ficam na memória.
+    """
+    yield f'{XML_HEADER}<urlset xmlns="{SITEMAP_NS}">\n'
+    for batch in chunked(entries, batch_size):
+        yield ''.join(
+            f'<url><loc>{escape(base_url + path)}</loc>'
+            f'<lastmod>{lastmod.isoformat(timespec="seconds")}</lastmod></url>\n'
+            for path, lastmod in batch
+        )
+    yield '</urlset>\n'
@@ -0,0 +1,121 @@
+# posts/slugs.py
+import random
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, router, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+from .bulk import chunked
+from .models import Post
+
+SLUG_MAX_LENGTH = Post._meta.get_field('slug').max_length
+
+# Caminhos fixos (posts/urls.py e blogproject/urls.py) que um slug não pode
+# ocupar: as rotas do projeto vêm antes do detalhe montado na raiz
+RESERVED_SLUGS = frozenset({'new', 'search', 'author', 'tag', 'feed', 'admin', 'accounts', 'blog', 'metrics'})
+
+# Tentativas de salvar quando outro processo ocupa o slug no meio do caminho
+SAVE_ATTEMPTS = 8
+
+
+def base_slug(title, max_length=SLUG_MAX_LENGTH - 8):
+    # slugify remove acentos ("Ação Rápida" -> "acao-rapida"); sobra espaço
+    # no campo para o sufixo numérico ("-2", "-13"...)
+    return slugify(title)[:max_length].strip('-') or 'post'
+
+
+def prefix_range(base):
+    # Slugs "base-...": como intervalo ('base-' <= slug < 'base.'), que o
+    # índice único resolve por busca; LIKE 'base-%' no SQLite varre a tabela
+    return Q(slug__gte=f'{base}-', slug__lt=f'{base}.')
+
+
+def _candidates(base):
+    yield base
+    suffix = 2
+    while True:
+        yield f'{base}-{suffix}'
+        suffix += 1
+
+
+def _next_free(base, taken, skip=0):
+    # O primeiro slug livre; com `skip`, pula alguns livres (ver save_with_unique_slug)
+    for candidate in _candidates(base):
+        if candidate not in taken and candidate not in RESERVED_SLUGS:
+            if not skip:
+                return candidate
+            skip -= 1
+
+
+def unique_slugs(titles, queryset=None):
+    """
+    Gera slugs únicos para uma lista de títulos de uma só vez (usado na
+    importação em massa). Consulta o índice único de slug por prefixo,
+    uma vez por base colidente, em vez de uma query por linha; colisões
+    dentro do próprio lote também são resolvidas.
+    """
+    queryset = Post.objects.all() if queryset is None else queryset
+    bases = [base_slug(title) for title in titles]
+    unique_bases = set(bases)
+    taken = set(queryset.filter(slug__in=unique_bases).order_by().values_list('slug', flat=True))
+    # Só precisam dos sufixos ocupados as bases que já existem no banco e as
+    # que se repetem no lote (a segunda vira "base-2", que pode existir sem
+    # a base); os prefixos vão em grupos numa mesma query
+    repeated = {base for base, count in Counter(bases).items() if count > 1}
+    for group in chunked(sorted(((taken | RESERVED_SLUGS) & unique_bases) | repeated), 100):
+        condition = reduce(or_, [prefix_range(base) for base in group])
+        taken.update(queryset.filter(condition).order_by().values_list('slug', flat=True))
+    slugs = []
+    for base in bases:
+        slug = _next_free(base, taken)
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def unique_slug(title, queryset=None, exclude_pk=None, skip=0):
+    """
+    Slug livre para um único título: a base e todos os "base-N" existentes
+    vêm numa só query pelo índice único, e o primeiro sufixo livre é
+    escolhido em memória (sem um SELECT por tentativa).
+    """
+    queryset = Post.objects.all() if queryset is None else queryset
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    base = base_slug(title)
+    taken = set(queryset.filter(Q(slug=base) | prefix_range(base)).order_by()
+                .values_list('slug', flat=True))
+    return _next_free(base, taken, skip)
+
+
+def slug_matches_title(slug, title):
+    # "ola-mundo-3" ainda corresponde a "Olá Mundo": não troca a URL à toa
+    base = base_slug(title)
+    suffix = slug[len(base) + 1:] if slug.startswith(f'{base}-') else ''
+    return slug == base or suffix.isdigit()
+
+
+def save_with_unique_slug(post, save=None, attempts=SAVE_ATTEMPTS):
+    """
+    Gera o slug a partir do título e salva o post (com `save`, por padrão
+    post.save). Dois cadastros simultâneos podem escolher o mesmo sufixo:
+    o índice único recusa o segundo, que recalcula o slug e tenta de novo,
+    dentro de um savepoint para não invalidar a transação de fora. A cada
+    nova tentativa um dos próximos sufixos livres é sorteado, para que os
+    concorrentes não disputem todos o mesmo número outra vez.
+    """
+    save = save or post.save
+    using = router.db_for_write(Post, instance=post)
+    for attempt in range(attempts):
+        skip = random.randrange(2 ** (attempt + 1)) if attempt else 0
+        post.slug = unique_slug(post.title, Post.objects.using(using), exclude_pk=post.pk, skip=skip)
+        try:
+            with transaction.atomic(using=using):
+                save()
+            return post
+        except IntegrityError:
+            if attempt == attempts - 1:
+                raise
@@ -0,0 +1,209 @@
+# posts/tags.py
+import math
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, Count, Exists, F, OuterRef, Q, Value, When
+from django.utils.text import slugify
+
+from .models import PostTag, Tag
+
+# Limites do formulário e das URLs de interseção (/tag/a+b+c/)
+MAX_TAGS_PER_POST = 10
+MAX_TAGS_PER_QUERY = 4
+TAG_CLOUD_KEY = 'posts:tag-cloud'
+NAME_MAX_LENGTH = Tag._meta.get_field('name').max_length
+SLUG_MAX_LENGTH = Tag._meta.get_field('slug').max_length
+
+
+def parse_tag_names(text):
+    """
+    "Django, python,  Django " -> ['Django', 'python']: sem repetir o mesmo
+    slug, na ordem digitada. Levanta ValidationError acima dos limites.
+    """
+    names, slugs = [], set()
+    for name in (part.strip() for part in (text or '').split(',')):
+        slug = slugify(name)
+        if not slug or slug in slugs:
+            continue
+        if len(name) > NAME_MAX_LENGTH:
+            raise ValidationError(f'A tag "{name[:20]}..." passa de {NAME_MAX_LENGTH} caracteres.')
+        names.append(name)
+        slugs.add(slug)
+    if len(names) > MAX_TAGS_PER_POST:
+        raise ValidationError(f'No máximo {MAX_TAGS_PER_POST} tags por post.')
+    return names
+
+
+def get_or_create_tags(names):
+    # Tags pelo slug (a grafia da primeira vez vale) ou pelo nome, para uma
+    # tag cujo slug foi trocado no admin: uma busca e, para as novas, um
+    # INSERT em lote que ignora as criadas em paralelo
+    by_slug = {slugify(name)[:SLUG_MAX_LENGTH]: name for name in names}
+    lookup = Q(slug__in=by_slug) | Q(name__in=by_slug.values())
+
+    def match(tags):
+        slugs = {tag.slug: tag for tag in tags}
+        named = {tag.name: tag for tag in tags}
+        return {slug: slugs.get(slug) or named.get(name) for slug, name in by_slug.items()}
+
+    found = match(Tag.objects.filter(lookup))
+    missing = [Tag(name=by_slug[slug], slug=slug) for slug, tag in found.items() if tag is None]
+    if missing:
+        Tag.objects.bulk_create(missing, ignore_conflicts=True)
+        found = match(Tag.objects.filter(lookup))
+    tags = {tag.pk: tag for tag in found.values() if tag is not None}
+    return list(tags.values())
+
+
+def set_post_tags(post, names, current=None):
+    """
+    Troca as tags do post pelas de `names`, mexendo só nas ligações que
+    mudaram; os contadores das tags afetadas mudam junto (num UPDATE só) se
+    o post estiver publicado. O post precisa estar salvo. `current` são os
+    ids das tags atuais, quando quem chama já os leu.
+    """
+    with transaction.atomic(savepoint=False):
+        wanted = {tag.pk for tag in get_or_create_tags(names)}
+        if current is None:
+            current = set(PostTag.objects.filter(post=post).values_list('tag_id', flat=True))
+        added, removed = wanted - set(current), set(current) - wanted
+        published = post.status == 'published'
+        if removed:
+            PostTag.objects.filter(post=post, tag_id__in=removed).delete()
+        if added:
+            PostTag.objects.bulk_create([
+                PostTag(post=post, tag_id=pk, published=published, created_at=post.created_at) for pk in added
+            ])
+        if published and (added or removed):
+            update_tag_counts(
+                Tag.objects.filter(pk__in=added | removed),
+                Case(When(pk__in=added, then=Value(1)), default=Value(-1)),
+            )
+
+
+def adjust_tag_counts(tag_ids, delta):
+    # Incremento atômico (F) num UPDATE só; a nuvem é refeita depois do COMMIT
+    if tag_ids and delta:
+        update_tag_counts(Tag.objects.filter(pk__in=tag_ids), delta)
+
+
+def update_tag_counts(tags, delta):
+    if tags.update(post_count=F('post_count') + delta):
+        transaction.on_commit(invalidate_tag_cloud)
+
+
+def sync_post_links(post):
+    # O post mudou de status: as tags dele ganham ou perdem um post publicado
+    # e as ligações acompanham (dois UPDATEs, sem ler as ligações antes)
+    published = post.status == 'published'
+    update_tag_counts(
+        Tag.objects.filter(post_links__post=post, post_links__published=not published),
+        1 if published else -1,
+    )
+    PostTag.objects.filter(post=post).exclude(published=published).update(
+        published=published, created_at=post.created_at)
+
+
+def forget_post(post):
+    # O post publicado vai ser apagado: as tags dele perdem um post
+    if post.status == 'published':
+        update_tag_counts(Tag.objects.filter(post_links__post=post), -1)
+
+
+def forget_author_posts(author_id):
+    # O autor vai ser apagado com todos os posts: desconta das tags de uma
+    # vez (um UPDATE por total distinto) em vez de um UPDATE por post
+    totals = (
+        PostTag.objects.filter(post__author_id=author_id, published=True)
+        .order_by().values('tag').annotate(total=Count('pk'))
+    )
+    by_total = {}
+    for row in totals:
+        by_total.setdefault(row['total'], []).append(row['tag'])
+    for total, tag_ids in by_total.items():
+        adjust_tag_counts(tag_ids, -total)
+
+
+def recount_tag_counts(tag_ids=None):
+    # Recalcula os contadores (backfill, import em massa): só aqui há GROUP BY
+    links = PostTag.objects.filter(published=True)
+    tags = Tag.objects.all()
+    if tag_ids is not None:
+        links, tags = links.filter(tag__in=tag_ids), tags.filter(pk__in=tag_ids)
+    totals = dict(links.order_by().values_list('tag').annotate(total=Count('pk')))
+    changed = []
+    for tag in tags.only('pk', 'post_count'):
+        if tag.post_count != totals.get(tag.pk, 0):
+            tag.post_count = totals.get(tag.pk, 0)
+            changed.append(tag)
+    Tag.objects.bulk_update(changed, ['post_count'], batch_size=1000)
+    if changed:
+        transaction.on_commit(invalidate_tag_cloud)
+    return len(changed)
+
+
+def tagged_links(tags):
+    """
+    Ligações dos posts publicados que têm todas as `tags`, para paginar por
+    (created_at, post). O percurso é pelo índice parcial da tag com menos
+    posts, na ordem da página; cada outra tag é um EXISTS no índice único
+    (tag, post). Uma página custa no máximo o tamanho da menor tag, nunca
+    o das maiores, e em geral só as linhas da página.
+    """
+    driver, *others = sorted(tags, key=lambda tag: tag.post_count)
+    links = PostTag.objects.filter(tag=driver, published=True)
+    for tag in others:
+        links = links.filter(Exists(PostTag.objects.filter(tag=tag, post=OuterRef('post'))))
+    return links.only('post_id', 'created_at')
+
+
+# ----------------------------------------------------
+# NUVEM DE TAGS
+# ----------------------------------------------------
+def get_tag_cloud_cache():
+    return caches[getattr(settings, 'POSTS_TAG_CLOUD_CACHE', 'default')]
+
+
+def invalidate_tag_cloud():
+    get_tag_cloud_cache().delete(TAG_CLOUD_KEY)
+
+
+def tag_cloud_rows():
+    # As primeiras linhas do índice de post_count: nada de GROUP BY
+    size = getattr(settings, 'POSTS_TAG_CLOUD_SIZE', 30)
+    return Tag.objects.filter(post_count__gt=0).order_by('-post_count', 'name').values('name', 'slug', 'post_count')[:size]
+
+
+def build_tag_cloud(rows):
+    # Peso em escala logarítmica: poucas tags enormes não achatam as outras
+    top = math.log(rows[0]['post_count'] + 1) if rows else 1
+    for row in rows:
+        row['weight'] = 1 + round(4 * math.log(row['post_count'] + 1) / top)
+    return sorted(rows, key=lambda row: row['name'].lower())
+
+
+def tag_cloud():
+    """
+    As POSTS_TAG_CLOUD_SIZE tags com mais posts publicados, em ordem
+    alfabética e com um peso de 1 a 5. Vem do cache; na falta, custa uma
+    query curta, refeita só quando algum contador muda.
+    """
+    cache = get_tag_cloud_cache()
+    cloud = cache.get(TAG_CLOUD_KEY)
+    if cloud is None:
+        cloud = build_tag_cloud(list(tag_cloud_rows()))
+        cache.set(TAG_CLOUD_KEY, cloud, getattr(settings, 'POSTS_TAG_CLOUD_TIMEOUT', 60 * 60))
+    return cloud
+
+
+async def atag_cloud():
+    # Versão async de tag_cloud(), para as views ASGI
+    cache = get_tag_cloud_cache()
+    cloud = await cache.aget(TAG_CLOUD_KEY)
+    if cloud is None:
+        cloud = build_tag_cloud([row async for row in tag_cloud_rows()])
+        await cache.aset(TAG_CLOUD_KEY, cloud, getattr(settings, 'POSTS_TAG_CLOUD_TIMEOUT', 60 * 60))
+    return cloud
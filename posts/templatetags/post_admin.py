@@ -0,0 +1,115 @@
+# posts/templatetags/post_admin.py
+import copy
+from datetime import datetime
+
+from django import template
+from django.conf import settings
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.contrib.admin.templatetags.base import InclusionAdminNode
+from django.contrib.admin.utils import get_fields_from_path
+from django.db import models
+from django.db.models import Exists
+from django.utils import timezone
+
+from posts.bulk import chunked
+
+register = template.Library()
+
+
+def period_start(value, kind):
+    if kind == 'year':
+        return value.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    if kind == 'month':
+        return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_period(start, kind):
+    if kind == 'year':
+        return start.replace(year=start.year + 1)
+    if kind == 'month':
+        return start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+    return datetime.fromordinal(start.toordinal() + 1)
+
+
+class IndexedDates:
+    """
+    O que o date_hierarchy do admin pede ao queryset (aggregate com Min/Max
+    e datetimes() por ano/mês/dia), respondido pelo índice da data em vez
+    de ler a tabela inteira: o primeiro e o último valor com ORDER BY ...
+    LIMIT 1 e, numa query só, um EXISTS por período candidato entre os
+    dois (cada um uma busca no índice). São três queries curtas por menu,
+    qualquer que seja o tamanho da tabela ou o número de períodos (até
+    POSTS_ADMIN_DATE_PROBES candidatos por query).
+    """
+
+    def __init__(self, queryset, field_name):
+        self.queryset = queryset.order_by().select_related(None)
+        self.field_name = field_name
+        self.model = queryset.model
+        self._bounds = None
+
+    def bounds(self):
+        # ((valor, pk) do primeiro, (valor, pk) do último) ou (None, None); lido uma vez
+        if self._bounds is None:
+            self._bounds = tuple(
+                self.queryset.order_by(order, 'pk' if order == self.field_name else '-pk')
+                .values_list(self.field_name, 'pk').first()
+                for order in (self.field_name, f'-{self.field_name}')
+            )
+        return self._bounds
+
+    def aggregate(self, **kwargs):
+        first, last = self.bounds()
+        return {'first': first and first[0], 'last': last and last[0]}
+
+    def in_period(self, start, end):
+        # O intervalo do período vem antes dos filtros da changelist no WHERE:
+        # com dois "data >= x" o SQLite usa o primeiro como início do
+        # intervalo no índice (com o do ano, a busca de dezembro lia o ano todo)
+        bounds = {f'{self.field_name}__gte': start, f'{self.field_name}__lt': end}
+        return self.model._default_manager.using(self.queryset.db).filter(**bounds) & self.queryset
+
+    def datetimes(self, field_name, kind):
+        first, last = self.bounds()
+        if first is None:
+            return []
+        aware = timezone.is_aware(first[0])
+        local = lambda value: (timezone.localtime(value) if aware else value).replace(tzinfo=None)
+        starts = [period_start(local(first[0]), kind)]
+        end = period_start(local(last[0]), kind)
+        while starts[-1] < end:
+            starts.append(next_period(starts[-1], kind))
+        as_db = lambda value: timezone.make_aware(value) if aware else value
+
+        found = []
+        # A linha de fora é uma só (o primeiro, pela chave); os EXISTS não dependem dela
+        row = self.model._default_manager.using(self.queryset.db).filter(pk=first[1])
+        for group in chunked(starts, getattr(settings, 'POSTS_ADMIN_DATE_PROBES', 100)):
+            probes = {
+                f'period_{i}': Exists(self.in_period(as_db(start), as_db(next_period(start, kind))))
+                for i, start in enumerate(group)
+            }
+            flags = row.annotate(**probes).values_list(*probes).get()
+            found.extend(start for start, exists in zip(group, flags) if exists)
+        return found
+
+
+def indexed_date_hierarchy(cl):
+    field = get_fields_from_path(cl.model, cl.date_hierarchy)[-1] if cl.date_hierarchy else None
+    if not isinstance(field, models.DateTimeField):
+        return date_hierarchy(cl)
+    changelist = copy.copy(cl)
+    changelist.queryset = IndexedDates(cl.queryset, cl.date_hierarchy)
+    return date_hierarchy(changelist)
+
+
+@register.tag(name='indexed_date_hierarchy')
+def indexed_date_hierarchy_tag(parser, token):
+    """
+    {% indexed_date_hierarchy cl %}: o mesmo menu do {% date_hierarchy cl %}
+    do admin, sem o SELECT DISTINCT sobre a tabela toda (ver IndexedDates).
+    """
+    return InclusionAdminNode(
+        parser, token, func=indexed_date_hierarchy, template_name='date_hierarchy.html', takes_context=False,
+    )
@@ -0,0 +1,49 @@
+# posts/templatetags/post_cache.py
+from django import template
+
+from posts.cache import get_or_render_fragment
+
+register = template.Library()
+
+
+class PostFragmentNode(template.Node):
+    def __init__(self, nodelist, name, post, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.post = post
+        self.vary_on = vary_on
+
+    def render(self, context):
+        name = self.name.resolve(context)
+        post = self.post.resolve(context)
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        return get_or_render_fragment(
+            name, post, lambda: self.nodelist.render(context), vary_on=vary_on
+        )
+
+
+@register.tag
+def postfragment(parser, token):
+    """
+    Cacheia um trecho de template versionado pelo post:
+
+        {% postfragment 'card' post post.approved_comment_count %}
+            ...
+        {% endpostfragment %}
+
+    O primeiro argumento é o nome do fragmento, o segundo o post (a chave
+    usa post.id e post.updated_at); os demais também entram na chave. Passe
+    o campo pré-calculado exibido (post.excerpt): o render_posts o
+    reescreve sem mudar o updated_at.
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' precisa de um nome e de um post.")
+    nodelist = parser.parse(('endpostfragment',))
+    parser.delete_first_token()
+    return PostFragmentNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        parser.compile_filter(bits[2]),
+        [parser.compile_filter(bit) for bit in bits[3:]],
+    )
@@ -0,0 +1,74 @@
+# posts/testing.py
+from contextlib import ContextDecorator
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class query_budget(ContextDecorator):
+    """
+    Falha se o bloco (ou a função decorada) executar mais de `limit` queries.
+
+        with query_budget(3):
+            client.get('/blog/')
+
+        @query_budget(2)
+        def test_algo(self): ...
+    """
+
+    def __init__(self, limit, using='default', label=None):
+        self.limit = limit
+        self.using = using
+        self.label = label
+
+    def __enter__(self):
+        self.context = CaptureQueriesContext(connections[self.using])
+        self.context.__enter__()
+        return self.context
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.context.__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            return False
+        executed = len(self.context)
+        if executed > self.limit:
+            queries = '\n'.join(
+                f'{i}. {query["sql"]}' for i, query in enumerate(self.context.captured_queries, start=1)
+            )
+            label = f' em {self.label}' if self.label else ''
+            raise QueryBudgetExceeded(
+                f'{executed} queries executadas{label}, orçamento é {self.limit}:\n{queries}'
+            )
+        return False
+
+
+def get_view_query_budget(response):
+    # O orçamento é declarado na própria view: `query_budget = N`
+    view_class = getattr(response.resolver_match.func, 'view_class', None)
+    return getattr(view_class, 'query_budget', None)
+
+
+def request_within_budget(client, method, url, data=None, using='default'):
+    """
+    Faz a requisição e verifica se ela respeitou o `query_budget` declarado
+    pela view que a atendeu. Retorna a resposta.
+    """
+    context = CaptureQueriesContext(connections[using])
+    with context:
+        response = getattr(client, method.lower())(url, data or {})
+        if response.streaming:
+            # As queries de uma resposta em streaming rodam enquanto ela é lida
+            response.streaming_content = [b''.join(response.streaming_content)]
+    budget = get_view_query_budget(response)
+    if budget is None:
+        raise QueryBudgetExceeded(f'A view que atendeu {url} não declara query_budget.')
+    if len(context) > budget:
+        queries = '\n'.join(f'{i}. {q["sql"]}' for i, q in enumerate(context.captured_queries, start=1))
+        raise QueryBudgetExceeded(
+            f'{method.upper()} {url}: {len(context)} queries, orçamento é {budget}:\n{queries}'
+        )
+    return response
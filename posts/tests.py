@@ -1,3 +1,1544 @@
-from django.test import TestCase
+import importlib
+import importlib.util
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import CommandError, call_command
+from django.db import connection, connections, reset_queries
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, reverse
+from django.utils import timezone
+
+from . import urls as posts_urls
+from .admin import CommentAdmin, PostAdmin
+from .cache import fragment_stats, get_fragment_cache, get_page_cache
+from .checks import check_shared_session_caches
+from .counters import recount_author_stats, set_comments_approval
+from .metrics import route_metrics
+from .middleware import PerformanceMiddleware
+from .models import AuthorStats, Comment, ModerationTask, Post, PostSearchTerm, Tag
+from .pagination import encode_cursor
+from .routers import PIN_COOKIE
+from .search import FTS5SearchBackend, InvertedIndexSearchBackend, get_search_backend, search_posts
+from .slugs import save_with_unique_slug, unique_slug, unique_slugs
+from .forms import PostForm
+from .tags import get_tag_cloud_cache, parse_tag_names, set_post_tags, tag_cloud
+from .views import AsyncPostDetailView, AsyncPostListView, PostDetailView
+from .testing import QueryBudgetExceeded, query_budget, request_within_budget
+from .throttling import MemoryBuckets, memory_buckets, take_token
+
+User = get_user_model()
+
+
+class PostListPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('autor', password='senha-forte-123')
+        cls.posts = [
+            Post.objects.create(author=cls.author, title=f'Post {i}', slug=f'post-{i}',
+                                content='Conteúdo', status='published')
+            for i in range(12)
+        ]
+        Post.objects.create(author=cls.author, title='Rascunho', slug='rascunho',
+                            content='Conteúdo', status='draft')
+
+    @override_settings(POSTS_PAGINATION_MODE='cursor')
+    def test_cursor_pagination_walks_forward_and_back(self):
+        expected = [p.pk for p in sorted(self.posts, key=lambda p: (p.created_at, p.pk), reverse=True)]
+        seen, pages, url = [], [], reverse('post_list')
+        while url:
+            response = self.client.get(url)
+            page = response.context['page_obj']
+            pages.append(page)
+            seen.extend(p.pk for p in page)
+            url = f"{reverse('post_list')}?cursor={page.next_cursor}" if page.has_next() else None
+        self.assertEqual(seen, expected)
+        self.assertEqual([len(p) for p in pages], [5, 5, 2])
+        self.assertNotContains(response, 'Página')
+
+        # Voltando a partir da última página chegamos à mesma segunda página
+        response = self.client.get(f"{reverse('post_list')}?cursor={pages[-1].previous_cursor}")
+        self.assertEqual([p.pk for p in response.context['page_obj']], expected[5:10])
+        first = self.client.get(f"{reverse('post_list')}?cursor={response.context['page_obj'].previous_cursor}")
+        self.assertEqual([p.pk for p in first.context['page_obj']], expected[:5])
+        self.assertFalse(first.context['page_obj'].has_previous())
+
+    @override_settings(POSTS_PAGINATION_MODE='cursor')
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(reverse('post_list') + '?cursor=nao-e-um-cursor')
+        self.assertEqual(response.status_code, 404)
+        # Cursor bem formado com uma data impossível: 404, não 500
+        cursor = encode_cursor(['2020-13-45T00:00:00', 1], 'n')
+        for url in (reverse('post_list'), reverse('author_posts', args=[self.author.username])):
+            self.assertEqual(self.client.get(url, {'cursor': cursor}).status_code, 404)
+        # Chave sem valor ou com um valor não escalar: também 404
+        for values in (['2020-01-01T00:00:00', None], ['2020-01-01T00:00:00', [1]],
+                       ['2020-01-01T00:00:00', {'id': 1}]):
+            cursor = encode_cursor(values, 'n')
+            for url in (reverse('post_list'), reverse('author_posts', args=[self.author.username])):
+                self.assertEqual(self.client.get(url, {'cursor': cursor}).status_code, 404)
+
+    @override_settings(POSTS_PAGINATION_MODE='offset')
+    def test_offset_pagination_still_available(self):
+        response = self.client.get(reverse('post_list') + '?page=3')
+        self.assertEqual(response.context['page_obj'].paginator.num_pages, 3)
+        self.assertEqual(len(response.context['posts']), 2)
+
+
+class QueryBudgetTests(TestCase):
+    # Cada view de `posts` declara `query_budget`; todas as rotas do app
+    # precisam aparecer aqui, senão o teste falha.
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('autor', password='senha-forte-123')
+        cls.readers = [User.objects.create_user(f'leitor{i}', password='x') for i in range(5)]
+        cls.post = Post.objects.create(author=cls.author, title='Alvo', slug='alvo',
+                                       content='Conteúdo', status='published')
+        for i in range(10):
+            Post.objects.create(author=cls.readers[i % 5], title=f'Post {i}', slug=f'post-{i}',
+                                content='Conteúdo', status='published')
+        for reader in cls.readers:
+            Comment.objects.create(post=cls.post, author=reader, content='Oi', approved=True)
+        set_post_tags(cls.post, ['Django', 'Python'])
+
+    def scenarios(self):
+        return [
+            ('post_list', 'get', reverse('post_list'), None),
+            ('post_search', 'get', reverse('post_search') + '?q=conteudo', None),
+            ('author_posts', 'get', reverse('author_posts', args=['autor']), None),
+            ('tag_posts', 'get', reverse('tag_posts', args=['django+python']), None),
+            ('post_feed', 'get', reverse('post_feed'), None),
+            ('post_feed_atom', 'get', reverse('post_feed_atom'), None),
+            ('author_feed', 'get', reverse('author_feed', args=['autor']), None),
+            ('author_feed_atom', 'get', reverse('author_feed_atom', args=['autor']), None),
+            ('post_detail', 'get', reverse('post_detail', args=['alvo']), None),
+            ('post_detail', 'post', reverse('post_detail', args=['alvo']), {'content': 'Novo'}),
+            ('post_comments', 'get', reverse('post_comments', args=['alvo']), None),
+            ('post_create', 'get', reverse('post_create'), None),
+            ('post_create', 'post', reverse('post_create'),
+             {'title': 'Outro', 'content': 'Texto', 'status': 'published', 'tags': 'Django, Rust'}),
+            ('post_update', 'get', reverse('post_update', args=['alvo']), None),
+            ('post_update', 'post', reverse('post_update', args=['alvo']),
+             {'title': 'Alvo', 'content': 'Editado', 'status': 'published', 'tags': 'Django, Performance'}),
+            ('post_delete', 'get', reverse('post_delete', args=['alvo']), None),
+            ('post_delete', 'post', reverse('post_delete', args=['alvo']), None),
+        ]
+
+    def test_every_posts_view_stays_within_its_budget(self):
+        self.client.force_login(self.author)
+        covered = set()
+        for name, method, url, data in self.scenarios():
+            with self.subTest(name=name, method=method):
+                response = request_within_budget(self.client, method, url, data)
+                self.assertLess(response.status_code, 400)
+                covered.add(name)
+        declared = {pattern.name for pattern in posts_urls.urlpatterns}
+        self.assertEqual(declared - covered, set())
+
+    @override_settings(POSTS_PAGINATION_MODE='offset')
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cached_db', POSTS_USER_CACHE='sessions')
+    def test_list_query_count_does_not_grow_with_rows(self):
+        self.client.force_login(self.author)
+        # A primeira requisição carrega o usuário; depois sessão e usuário vêm do cache
+        self.client.get(reverse('post_list'))
+        with self.assertNumQueries(3):
+            self.client.get(reverse('post_list'))
+        for i in range(10, 20):
+            Post.objects.create(author=self.readers[i % 5], title=f'Post {i}', slug=f'post-{i}',
+                                content='Conteúdo', status='published')
+        with self.assertNumQueries(3):
+            self.client.get(reverse('post_list'))
+
+    def test_query_budget_reports_overruns(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with query_budget(1):
+                list(Post.objects.all())
+                list(Comment.objects.all())
+
+
+class CommentThreadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('autor', password='x')
+        cls.post = Post.objects.create(author=cls.author, title='Viral', slug='viral',
+                                       content='Conteúdo', status='published')
+        Comment.objects.bulk_create([
+            Comment(post=cls.post, author=cls.author, content=f'Comentário {i}', approved=i % 10 != 0)
+            for i in range(50)
+        ])
+        cls.expected = list(Comment.objects.filter(post=cls.post, approved=True)
+                            .order_by('-created_at', '-id').values_list('pk', flat=True))
+
+    def test_detail_renders_only_the_first_page(self):
+        url = reverse('post_detail', args=['viral'])
+        # ETag + post + comentários + tags do post
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        page = response.context['comments']
+        self.assertEqual([c.pk for c in page], self.expected[:PostDetailView.comments_per_page])
+        self.assertContains(response, 'class="comment ', count=PostDetailView.comments_per_page)
+        self.assertContains(response, f"{reverse('post_comments', args=['viral'])}?cursor={page.next_cursor}")
+
+    def test_endpoint_walks_the_thread_as_html_and_json(self):
+        seen, cursor = [], None
+        while True:
+            params = {'format': 'json', **({'cursor': cursor} if cursor else {})}
+            data = self.client.get(reverse('post_comments', args=['viral']), params).json()
+            seen.extend(c['id'] for c in data['comments'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(seen, self.expected)
+
+        first = self.client.get(reverse('post_detail', args=['viral'])).context['comments']
+        fragment = self.client.get(reverse('post_comments', args=['viral']), {'cursor': first.next_cursor})
+        self.assertNotContains(fragment, '<html')
+        self.assertContains(fragment, 'class="comment ', count=PostDetailView.comments_per_page)
+        self.assertNotContains(fragment, 'Seja o primeiro')
+
+    @override_settings(POSTS_PAGE_CACHE_ENABLED=True)
+    def test_fragment_and_detail_have_separate_cache_entries(self):
+        get_page_cache().clear()
+        for _ in range(2):
+            fragment = self.client.get(reverse('post_comments', args=['viral']))
+            self.assertNotContains(fragment, '<html')
+            detail = self.client.get(reverse('post_detail', args=['viral']))
+            self.assertContains(detail, '<html')
+            self.assertContains(detail, 'Conteúdo')
+
+    def test_missing_post_and_bad_cursor_404(self):
+        self.assertEqual(self.client.get(reverse('post_comments', args=['nao-existe'])).status_code, 404)
+        response = self.client.get(reverse('post_comments', args=['viral']), {'cursor': 'x'})
+        self.assertEqual(response.status_code, 404)
+
+
+class ModerationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('autor', password='x')
+        cls.post = Post.objects.create(author=cls.author, title='Alvo', slug='alvo',
+                                       content='Conteúdo', status='published')
+        cls.veteran = User.objects.create_user('veterano', password='x')
+        cls.newbie = User.objects.create_user('novato', password='x')
+        cls.flooder = User.objects.create_user('apressado', password='x')
+        Comment.objects.bulk_create([
+            Comment(post=cls.post, author=cls.veteran, content=f'Antigo {i}', approved=True)
+            for i in range(3)
+        ])
+
+    def comment(self, user, content):
+        self.client.force_login(user)
+        self.client.post(reverse('post_detail', args=['alvo']), {'content': content})
+        return Comment.objects.filter(author=user).latest('id')
+
+    def moderate(self):
+        call_command('moderate_comments', once=True, batch_size=4, stdout=StringIO())
+
+    def test_post_only_enqueues_and_worker_applies_rules(self):
+        trusted = self.comment(self.veteran, 'Ótimo texto!')
+        spam = self.comment(self.newbie, 'Compre http://a.example http://b.example http://c.example')
+        plain = self.comment(self.newbie, 'Gostei.')
+        flood = [self.comment(self.flooder, f'Mensagem {i}') for i in range(6)]
+        self.assertFalse(Comment.objects.filter(approved=True).exclude(author=self.veteran).exists())
+        self.assertEqual(ModerationTask.objects.filter(status=ModerationTask.PENDING).count(), 9)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.moderate()
+        decisions = dict(ModerationTask.objects.values_list('comment_id', 'decision'))
+        self.assertEqual(decisions[trusted.pk], ModerationTask.APPROVE)
+        self.assertEqual(decisions[spam.pk], ModerationTask.REJECT)
+        self.assertEqual(decisions[plain.pk], ModerationTask.HOLD)
+        self.assertEqual({decisions[c.pk] for c in flood}, {ModerationTask.HOLD})
+        self.assertFalse(ModerationTask.objects.exclude(status=ModerationTask.DONE).exists())
+        trusted.refresh_from_db()
+        self.post.refresh_from_db()
+        self.assertTrue(trusted.approved)
+        self.assertEqual(self.post.approved_comment_count, 4)
+
+    def test_failed_batch_is_retried_with_backoff(self):
+        comment = self.comment(self.newbie, 'Gostei.')
+        with override_settings(POSTS_MODERATION_MAX_ATTEMPTS=2), \
+                mock.patch('posts.moderation.moderate', side_effect=RuntimeError('fora do ar')):
+            err = StringIO()
+            call_command('moderate_comments', max_batches=1, interval=0, stdout=StringIO(), stderr=err)
+            task = ModerationTask.objects.get(comment=comment)
+            self.assertIn('fora do ar', err.getvalue())
+            self.assertEqual((task.status, task.attempts), (ModerationTask.PENDING, 1))
+            self.assertGreater(task.run_after, task.created_at)
+
+            ModerationTask.objects.filter(pk=task.pk).update(run_after=task.created_at)
+            call_command('moderate_comments', max_batches=1, interval=0, stdout=StringIO(), stderr=StringIO())
+            task.refresh_from_db()
+            self.assertEqual(task.status, ModerationTask.FAILED)
+
+
+class ApprovedCommentCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('autor', password='senha-forte-123')
+        cls.post = Post.objects.create(author=cls.author, title='Alvo', slug='alvo',
+                                       content='Conteúdo', status='published')
+
+    def count(self):
+        self.post.refresh_from_db(fields=['approved_comment_count'])
+        return self.post.approved_comment_count
+
+    def test_counter_follows_comment_lifecycle(self):
+        pending = Comment.objects.create(post=self.post, author=self.author, content='a')
+        Comment.objects.create(post=self.post, author=self.author, content='b', approved=True)
+        self.assertEqual(self.count(), 1)
+
+        pending = Comment.objects.get(pk=pending.pk)
+        pending.approved = True
+        pending.save()
+        pending.save()
+        self.assertEqual(self.count(), 2)
+
+        pending.delete()
+        self.assertEqual(self.count(), 1)
+
+    def test_moving_a_comment_moves_its_count_and_purges_both_posts(self):
+        other = Post.objects.create(author=self.author, title='Outro', slug='outro',
+                                    content='Conteúdo', status='published')
+        comment = Comment.objects.create(post=self.post, author=self.author, content='a', approved=True)
+        comment = Comment.objects.get(pk=comment.pk)
+        comment.post = other
+        with mock.patch('posts.signals.invalidate_post_pages') as invalidate, \
+                self.captureOnCommitCallbacks(execute=True):
+            comment.save()
+        self.assertEqual(self.count(), 0)
+        other.refresh_from_db()
+        self.assertEqual(other.approved_comment_count, 1)
+        invalidate.assert_called_once_with('outro', 'alvo', lists=True)
+
+        # Pendente e movido de volta: nenhum contador muda
+        comment.approved = False
+        comment.save()
+        comment.post = self.post
+        comment.save()
+        other.refresh_from_db()
+        self.assertEqual((self.count(), other.approved_comment_count), (0, 0))
+
+    def test_bulk_approval_recounts_affected_posts(self):
+        other = Post.objects.create(author=self.author, title='Outro', slug='outro',
+                                    content='Conteúdo', status='published')
+        for post in (self.post, self.post, other):
+            Comment.objects.create(post=post, author=self.author, content='x')
+
+        self.assertEqual(set_comments_approval(Comment.objects.all(), True), 3)
+        self.assertEqual(self.count(), 2)
+        other.refresh_from_db()
+        self.assertEqual(other.approved_comment_count, 1)
+
+        set_comments_approval(Comment.objects.filter(post=self.post), False)
+        self.assertEqual(self.count(), 0)
+
+    def test_recount_command_checks_and_repairs(self):
+        Comment.objects.create(post=self.post, author=self.author, content='x', approved=True)
+        Post.objects.filter(pk=self.post.pk).update(approved_comment_count=7)
+
+        with self.assertRaises(CommandError):
+            call_command('recount_comments', '--check', stdout=StringIO(), stderr=StringIO())
+        call_command('recount_comments', '--chunk-size', '1', stdout=StringIO())
+        self.assertEqual(self.count(), 1)
+        call_command('recount_comments', '--check', stdout=StringIO())
+
+
+class FragmentCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('autor', password='senha-forte-123')
+        cls.posts = [
+            Post.objects.create(author=cls.author, title=f'Post {i}', slug=f'post-{i}',
+                                content=f'Conteúdo {i}', status='published')
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        get_fragment_cache().clear()
+        fragment_stats.reset()
+
+    def test_cards_are_reused_across_requests_and_mounts(self):
+        self.client.get('/blog/')
+        self.assertEqual(fragment_stats.as_dict()['misses'], 3)
+        response = self.client.get('/')
+        self.assertEqual(fragment_stats.as_dict()['hits'], 3)
+        self.assertContains(response, 'Conteúdo 2')
+
+    def test_editing_a_post_changes_its_key(self):
+        self.client.get(reverse('post_list'))
+        post = self.posts[0]
+        post.content = 'Texto novo'
+        post.save()
+
+        fragment_stats.reset()
+        response = self.client.get(reverse('post_list'))
+        self.assertEqual(fragment_stats.as_dict(), {'hits': 2, 'misses': 1, 'hit_ratio': 2 / 3})
+        self.assertContains(response, 'Texto novo')
+
+    def test_new_approved_comment_refreshes_card(self):
+        self.client.get(reverse('post_list'))
+        Comment.objects.create(post=self.posts[1], author=self.author, content='x', approved=True)
+        response = self.client.get(reverse('post_list'))
+        self.assertContains(response, '1 comentário')
+
+
+@override_settings(POSTS_PAGE_CACHE_ENABLED=True)
+class AnonymousPageCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('autor', password='senha-forte-123')
+        cls.post = Post.objects.create(author=cls.author, title='Alvo', slug='alvo',
+                                       content='Original', status='published')
+
+    def setUp(self):
+        get_page_cache().clear()
+
+    def test_anonymous_pages_are_served_from_cache_on_both_mounts(self):
+        first = self.client.get('/blog/alvo/')
+        self.assertIn('Cookie', first['Vary'])
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get('/alvo/'), 'Original')
+        self.client.get('/blog/')
+        with self.assertNumQueries(0):
+            self.client.get('/')
+
+    def test_logged_in_readers_bypass_the_cache(self):
+        self.client.get('/alvo/')
+        self.client.force_login(self.author)
+        self.assertContains(self.client.get('/alvo/'), 'Editar Post')
+
+    def test_post_edit_purges_detail_and_lists(self):
+        self.client.get('/blog/alvo/')
+        self.client.get('/blog/')
+        self.client.force_login(self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('post_update', args=['alvo']),
+                             {'title': 'Alvo', 'content': 'Editado', 'status': 'published'})
+        self.client.logout()
+        self.assertContains(self.client.get('/alvo/'), 'Editado')
+        self.assertContains(self.client.get('/'), 'Editado')
+
+    def test_only_visible_comment_changes_purge(self):
+        self.client.get('/alvo/')
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            comment = Comment.objects.create(post=self.post, author=self.author, content='Pendente')
+        self.assertEqual(callbacks, [])
+        with self.assertNumQueries(0):
+            self.client.get('/alvo/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            set_comments_approval(Comment.objects.filter(pk=comment.pk), True)
+        self.assertContains(self.client.get('/blog/alvo/'), 'Pendente')
+
+
+class AuthorArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('autora', password='senha-forte-123')
+        cls.other = User.objects.create_user('outra', password='x')
+        cls.posts = [
+            Post.objects.create(author=cls.author, title=f'Post {i}', slug=f'post-{i}',
+                                content=f'Texto {i}', status='published')
+            for i in range(12)
+        ]
+        Post.objects.create(author=cls.author, title='Rascunho', slug='rascunho', content='x')
+
+    def stats(self, user):
+        return AuthorStats.objects.filter(author=user).values_list('post_count', 'latest_post_at').first()
+
+    def test_stats_are_maintained_incrementally(self):
+        latest = self.posts[-1]
+        self.assertEqual(self.stats(self.author), (12, latest.created_at))
+        # Editar sem mudar autor nem status não toca as estatísticas
+        post = Post.objects.get(slug='post-3')
+        post.title = 'Outro título'
+        with CaptureQueriesContext(connection) as captured:
+            post.save()
+        self.assertFalse(any('authorstats' in query['sql'] for query in captured))
+
+        latest = Post.objects.get(pk=latest.pk)
+        latest.status = 'draft'
+        latest.save()
+        self.assertEqual(self.stats(self.author), (11, self.posts[-2].created_at))
+        post.author = self.other
+        post.save()
+        self.assertEqual(self.stats(self.author)[0], 10)
+        self.assertEqual(self.stats(self.other), (1, post.created_at))
+        post.delete()
+        self.assertEqual(self.stats(self.other), (0, None))
+
+    def test_archive_is_cursor_paginated_without_count(self):
+        url = reverse('author_posts', args=['autora'])
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        self.assertFalse(any('COUNT(' in query['sql'] for query in captured[1:]))
+        self.assertContains(response, '12 posts publicados')
+        self.assertEqual([p.slug for p in response.context['posts']], [f'post-{i}' for i in range(11, 1, -1)])
+        response = self.client.get(url, {'cursor': response.context['page_obj'].next_cursor})
+        self.assertEqual([p.slug for p in response.context['posts']], ['post-1', 'post-0'])
+        self.assertNotContains(response, 'Rascunho')
+        self.assertEqual(self.client.get(reverse('author_posts', args=['ninguem'])).status_code, 404)
+
+    @override_settings(POSTS_PAGE_CACHE_ENABLED=True)
+    def test_each_archive_has_its_own_cache_entry(self):
+        get_page_cache().clear()
+        self.assertContains(self.client.get('/author/autora/'), 'Post 11')
+        self.assertContains(self.client.get('/author/outra/'), 'Nenhum post publicado')
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get('/blog/author/autora/'), 'Post 11')
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(author=self.other, title='Novo da outra', slug='novo', content='x',
+                                status='published')
+        self.assertContains(self.client.get('/author/outra/'), 'Novo da outra')
+
+
+class TagTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('autora', password='senha-forte-123')
+        cls.posts = [
+            Post.objects.create(author=cls.author, title=f'Post {i}', slug=f'post-{i}',
+                                content='Texto', status='published')
+            for i in range(12)
+        ]
+        for i, post in enumerate(cls.posts):
+            set_post_tags(post, ['Django'] + (['Python'] if i % 2 else []) + (['Cache'] if i % 3 == 0 else []))
+
+    def setUp(self):
+        get_tag_cloud_cache().clear()
+
+    def counts(self):
+        return dict(Tag.objects.values_list('slug', 'post_count'))
+
+    def test_counts_and_cloud_follow_publication(self):
+        self.assertEqual(self.counts(), {'django': 12, 'python': 6, 'cache': 4})
+        self.assertEqual([tag['slug'] for tag in tag_cloud()], ['cache', 'django', 'python'])
+        # A nuvem fica no cache até algum contador mudar
+        with self.assertNumQueries(0):
+            tag_cloud()
+        post = Post.objects.get(slug='post-3')
+        post.status = 'draft'
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+        self.assertEqual(self.counts(), {'django': 11, 'python': 5, 'cache': 3})
+        self.assertEqual({tag['slug']: tag['post_count'] for tag in tag_cloud()}['django'], 11)
+        # Rascunho troca de tags sem mexer nos contadores; publicado, passa a contar
+        set_post_tags(post, ['Django', 'Novidade'])
+        self.assertEqual(self.counts(), {'django': 11, 'python': 5, 'cache': 3, 'novidade': 0})
+        post.status = 'published'
+        post.save()
+        self.assertEqual(self.counts(), {'django': 12, 'python': 5, 'cache': 3, 'novidade': 1})
+        Post.objects.get(slug='post-0').delete()
+        self.author.delete()
+        self.assertEqual(set(self.counts().values()), {0})
+
+    def test_intersection_is_cursor_paginated(self):
+        url = reverse('tag_posts', args=['python+django'])
+        response = self.client.get(url)
+        expected = [f'post-{i}' for i in range(11, 0, -2)]
+        self.assertEqual([p.slug for p in response.context['posts']], expected)
+        self.assertContains(response, '#Python + #Django')
+        url = reverse('tag_posts', args=['django'])
+        response = self.client.get(url)
+        self.assertEqual([p.slug for p in response.context['posts']], [f'post-{i}' for i in range(11, 1, -1)])
+        response = self.client.get(url, {'cursor': response.context['page_obj'].next_cursor})
+        self.assertEqual([p.slug for p in response.context['posts']], ['post-1', 'post-0'])
+        self.assertEqual(self.client.get(reverse('tag_posts', args=['cache+python'])).context['posts'][0].slug,
+                         'post-9')
+        self.assertEqual(self.client.get(reverse('tag_posts', args=['django+nada'])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('tag_posts', args=['a+b+c+d+e'])).status_code, 404)
+
+    def test_form_parses_and_saves_tags(self):
+        self.assertEqual(parse_tag_names(' Django, python,,django , Cache'), ['Django', 'python', 'Cache'])
+        post = self.posts[0]
+        form = PostForm(instance=post)
+        self.assertEqual(form.initial['tags'], 'Cache, Django')
+        form = PostForm({'title': post.title, 'content': 'Texto', 'status': 'published', 'tags': 'django, Rust'},
+                        instance=post)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.assertEqual(sorted(post.tags.values_list('slug', flat=True)), ['django', 'rust'])
+        self.assertEqual(self.counts(), {'django': 12, 'python': 6, 'cache': 3, 'rust': 1})
+        form = PostForm({'title': 'x', 'content': 'x', 'status': 'draft', 'tags': ','.join('abcdefghijk')})
+        self.assertIn('tags', form.errors)
+
+    def test_form_reuses_tags_with_the_same_slug_or_name(self):
+        # Outra grafia do mesmo slug, e uma tag cujo slug foi trocado no admin
+        Tag.objects.filter(slug='cache').update(slug='caching')
+        post = self.posts[1]
+        form = PostForm({'title': post.title, 'content': 'Texto', 'status': 'published',
+                         'tags': 'PYTHON!, Cache'}, instance=post)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.assertEqual(sorted(post.tags.values_list('name', flat=True)), ['Cache', 'Python'])
+        self.assertEqual(Tag.objects.count(), 3)
+
+
+class AdminChangelistTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'senha-forte-123')
+        cls.authors = [User.objects.create_user(f'autor{i}', password='x') for i in range(3)]
+        cls.posts = [
+            Post.objects.create(author=cls.authors[i % 3], title=f'Post {i}', slug=f'post-{i}',
+                                content='Texto', status='published')
+            for i in range(6)
+        ]
+        cls.add_comments(30)
+        # Um terço dos comentários em 2024: dois anos no date_hierarchy
+        old = Comment.objects.order_by('pk').values_list('pk', flat=True)[:10]
+        Comment.objects.filter(pk__in=list(old)).update(created_at=timezone.now().replace(year=2024, month=3))
+
+    @classmethod
+    def add_comments(cls, count):
+        start = Comment.objects.count()
+        Comment.objects.bulk_create([
+            Comment(post=cls.posts[i % 6], author=cls.authors[i % 3], content=f'Comentário {i}')
+            for i in range(start, start + count)
+        ])
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def capture(self, url, params=None):
+        reset_queries()
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return response, [query['sql'] for query in captured]
+
+    @override_settings(POSTS_ADMIN_COUNT_LIMIT=20)
+    def test_changelists_do_not_grow_with_rows(self):
+        for name in ('comment', 'post', 'moderationtask'):
+            with self.subTest(name=name):
+                url = reverse(f'admin:posts_{name}_changelist')
+                self.client.get(url)
+                _, before = self.capture(url)
+                self.add_comments(30)
+                Post.objects.create(author=User.objects.create_user(f'novo-{name}'), title='Novo',
+                                    slug=f'novo-{name}', content='x', status='published')
+                response, after = self.capture(url)
+                self.assertEqual(len(before), len(after), after)
+                # Sem COUNT(*) da tabela toda (tabela pequena: COUNT limitado), sem
+                # SELECT DISTINCT de datas e sem listar os usuários
+                self.assertFalse([sql for sql in after if 'COUNT(' in sql and 'LIMIT' not in sql])
+                self.assertFalse([sql for sql in after if 'DISTINCT' in sql])
+                self.assertFalse([sql for sql in after if 'FROM "auth_user"' in sql and 'WHERE' not in sql])
+        # Com filtro, o COUNT para no limite
+        response, queries = self.capture(reverse('admin:posts_comment_changelist'), {'approved__exact': '0'})
+        self.assertEqual(response.context['cl'].result_count, 20)
+        self.assertTrue(any('LIMIT 20' in sql for sql in queries if 'COUNT(' in sql))
+
+    def test_autocomplete_filter_and_date_hierarchy(self):
+        url = reverse('admin:posts_comment_changelist')
+        author = self.authors[1]
+        response, _ = self.capture(url, {'author__id__exact': author.pk})
+        self.assertEqual({c.author_id for c in response.context['cl'].result_list}, {author.pk})
+        self.assertContains(response, f'<option value="{author.pk}" selected>autor1</option>', html=True)
+        self.assertContains(response, 'data-field-name="author"')
+        # As opções vêm do autocomplete do admin (busca de usuários e, para posts, o índice de busca)
+        for field, term, expected in (('author', 'autor1', 'autor1'), ('post', 'post', 'Post 0')):
+            response = self.client.get(reverse('admin:autocomplete'), {
+                'app_label': 'posts', 'model_name': 'comment', 'field_name': field, 'term': term})
+            self.assertIn(expected, [result['text'] for result in response.json()['results']])
+
+        response, queries = self.capture(url)
+        year = timezone.localtime().year
+        self.assertContains(response, '?created_at__year=2024')
+        self.assertContains(response, f'?created_at__year={year}')
+        self.assertFalse([sql for sql in queries if 'DISTINCT' in sql])
+        response, _ = self.capture(url, {'created_at__year': '2024'})
+        self.assertContains(response, '?created_at__month=3&amp;created_at__year=2024')
+        self.assertEqual(response.context['cl'].result_count, 10)
+
+    def test_post_autocomplete_matches_partial_words(self):
+        Post.objects.create(author=self.authors[0], title='Django performance', slug='django-perf',
+                            content='Texto', status='published')
+        for term in ('Djan', 'perf', 'Django perf', 'Django'):
+            with self.subTest(term=term):
+                response = self.client.get(reverse('admin:autocomplete'), {
+                    'app_label': 'posts', 'model_name': 'comment', 'field_name': 'post', 'term': term})
+                self.assertEqual([result['text'] for result in response.json()['results']],
+                                 ['Django performance'])
+
+    def test_post_search_matches_word_prefixes_and_reports_the_cap(self):
+        post = Post.objects.create(author=self.authors[0], title='Django performance', slug='django-perf',
+                                   content='Texto', status='draft')
+        url = reverse('admin:posts_post_changelist')
+        for term in ('Djan', 'perf', 'Django perf', 'D'):
+            with self.subTest(term=term):
+                response, _ = self.capture(url, {'q': term})
+                self.assertEqual([p.pk for p in response.context['cl'].result_list], [post.pk])
+                self.assertNotContains(response, 'resultados mais relevantes')
+        with mock.patch.object(PostAdmin, 'search_result_limit', 2):
+            response, _ = self.capture(url, {'q': 'pos'})
+        self.assertEqual(len(response.context['cl'].result_list), 2)
+        self.assertContains(response, 'A busca mostra só os 2 resultados mais relevantes')
+
+    def test_date_hierarchy_costs_a_fixed_number_of_queries(self):
+        url = reverse('admin:posts_comment_changelist')
+        pages = [{}, {'created_at__year': '2024'}, {'created_at__year': '2024', 'created_at__month': '3'}]
+        self.client.get(url)
+        before = [len(self.capture(url, params)[1]) for params in pages]
+        # Comentários espalhados por 12 anos, 12 meses de 2024 e vários dias de março
+        pks = list(Comment.objects.order_by('pk').values_list('pk', flat=True))
+        for i, pk in enumerate(pks[10:22]):
+            Comment.objects.filter(pk=pk).update(created_at=timezone.now().replace(year=2010 + i, month=1))
+        for i, pk in enumerate(pks[:10]):
+            Comment.objects.filter(pk=pk).update(created_at=timezone.now().replace(year=2024, month=3 + i % 10, day=1 + i))
+        after = []
+        for params in pages:
+            response, queries = self.capture(url, params)
+            after.append(len(queries))
+            # Primeiro, último e uma query só com um EXISTS por período candidato
+            self.assertLessEqual(len([sql for sql in queries if 'EXISTS' in sql]), 1)
+        self.assertEqual(before, after)
+        self.assertLessEqual(max(after), 8, after)
+        self.assertContains(self.capture(url)[0], '?created_at__year=2010')
+
+    def test_bulk_approval_runs_in_batches(self):
+        url = reverse('admin:posts_comment_changelist')
+        pending = Comment.objects.filter(approved=False).count()
+        with mock.patch.object(CommentAdmin, 'approval_batch_size', 7):
+            with CaptureQueriesContext(connection) as captured:
+                self.client.post(url, {'action': 'approve_comments', 'select_across': '1', 'index': '0',
+                                       '_selected_action': [Comment.objects.first().pk]})
+        updates = [q['sql'] for q in captured if q['sql'].startswith('UPDATE "posts_comment"')]
+        self.assertEqual(len(updates), -(-pending // 7))
+        self.assertFalse(Comment.objects.filter(approved=False).exists())
+        for post in Post.objects.all():
+            self.assertEqual(post.approved_comment_count, post.comments.filter(approved=True).count())
+
+
+class FeedAndSitemapTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('autora', password='senha-forte-123')
+        cls.other = User.objects.create_user('outra', password='x')
+        cls.posts = [
+            Post.objects.create(author=cls.author if i % 3 else cls.other, title=f'Post {i}', slug=f'post-{i}',
+                                content=f'<p>Texto {i}</p>', status='draft' if i == 4 else 'published')
+            for i in range(12)
+        ]
+
+    def test_feeds_use_excerpts_and_answer_conditional_requests(self):
+        response = self.client.get(reverse('post_feed'))
+        self.assertEqual(response['Content-Type'], 'application/rss+xml; charset=utf-8')
+        self.assertContains(response, '<title>Post 11</title>')
+        self.assertContains(response, '<description>Texto 11</description>')
+        self.assertNotContains(response, 'Post 4<')
+        with self.assertNumQueries(1):
+            cached = self.client.get(reverse('post_feed'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
+        atom = self.client.get(reverse('author_feed_atom', args=['outra']))
+        self.assertContains(atom, '<title>Posts de outra</title>')
+        self.assertContains(atom, 'Post 9')
+        self.assertNotContains(atom, 'Post 11')
+        self.assertEqual(self.client.get(reverse('author_feed', args=['ninguem'])).status_code, 404)
+
+        Post.objects.filter(pk=self.posts[11].pk).update(title='Editado')
+        Post.objects.get(pk=self.posts[11].pk).save()
+        changed = self.client.get(reverse('post_feed'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertContains(changed, 'Editado')
+
+    @override_settings(POSTS_PAGE_CACHE_ENABLED=True, ALLOWED_HOSTS=['a.example', 'b.example'])
+    def test_cached_feeds_are_kept_per_host(self):
+        get_page_cache().clear()
+        self.assertContains(self.client.get(reverse('post_feed'), HTTP_HOST='a.example'), 'http://a.example/')
+        response = self.client.get(reverse('post_feed'), HTTP_HOST='b.example')
+        self.assertContains(response, 'http://b.example/')
+        self.assertNotContains(response, 'a.example')
+
+    @override_settings(POSTS_SITEMAP_SHARD_SIZE=5)
+    def test_sitemap_index_and_streamed_shards(self):
+        index = self.client.get('/sitemap.xml')
+        shards = [f'http://testserver/sitemap-posts-{n}.xml' for n in range(3)]
+        self.assertEqual(index.content.decode().count('<sitemap>'), 4)
+        for location in [*shards, 'http://testserver/sitemap-authors-0.xml']:
+            self.assertContains(index, f'<loc>{location}</loc>')
+
+        response = self.client.get('/sitemap-posts-0.xml')
+        self.assertTrue(response.streaming)
+        body = b''.join(response.streaming_content).decode()
+        # Shard 0: pks 1 a 5, sem o rascunho
+        self.assertEqual(body.count('<url>'), 4)
+        self.assertIn('<loc>http://testserver/post-0/</loc>', body)
+        self.assertNotIn('post-4/', body)
+        # O 304 sai da versão da lista (uma busca pela chave), sem varrer o shard
+        with self.assertNumQueries(1):
+            cached = self.client.get('/sitemap-posts-0.xml', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.posts[0].save()
+        self.assertEqual(self.client.get('/sitemap-posts-0.xml', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+        authors = b''.join(self.client.get('/sitemap-authors-0.xml').streaming_content).decode()
+        self.assertIn('<loc>http://testserver/author/autora/</loc>', authors)
+        self.assertEqual(self.client.get('/sitemap-posts-3.xml').status_code, 404)
+        self.assertEqual(self.client.get('/sitemap-tags-0.xml').status_code, 404)
+
+
+class PublishStaticTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('autora', password='senha-forte-123')
+        cls.posts = [
+            Post.objects.create(author=cls.author, title=f'Post {i}', slug=f'post-{i}',
+                                content=f'<p>Texto {i}</p>', status='draft' if i == 2 else 'published')
+            for i in range(8)
+        ]
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+
+    def publish(self, *args):
+        # Um processo só: o banco de testes em memória não é visto por outros
+        output = StringIO()
+        call_command('publish_static', '--output', self.root, '--workers', '1', '--list-pages', '3',
+                     *args, stdout=output)
+        return output.getvalue()
+
+    def read(self, *parts):
+        with open(os.path.join(self.root, *parts), encoding='utf-8') as page:
+            return page.read()
+
+    @override_settings(POSTS_PAGINATION_MODE='offset')
+    def test_full_build_writes_published_pages(self):
+        self.assertIn('7 posts renderizados', self.publish())
+        self.assertIn('Texto 5', self.read('post-5', 'index.html'))
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'post-2')))
+        self.assertIn('Post 7', self.read('index.html'))
+        self.assertIn('Post 1', self.read('_query', 'page=2.html'))
+        self.assertFalse(os.path.exists(os.path.join(self.root, '_query', 'page=3.html')))
+        self.assertFalse([name for name in os.listdir(self.root) if name.startswith('.tmp-')])
+
+    def test_incremental_build_renders_only_changed_posts(self):
+        self.publish()
+        self.assertIn('0 posts renderizados, 7 sem mudança, 0 removidos; lista sem mudança', self.publish())
+
+        post = Post.objects.get(slug='post-3')
+        post.content = '<p>Revisado</p>'
+        post.save()
+        Post.objects.filter(slug='post-6').update(status='draft')
+        output = self.publish()
+        self.assertIn('1 posts renderizados, 5 sem mudança, 1 removidos; lista renderizada', output)
+        self.assertIn('Revisado', self.read('post-3', 'index.html'))
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'post-6')))
+        self.assertIn('6 posts renderizados', self.publish('--full'))
+
+
+class SessionStrategyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('autor', password='senha-forte-123')
+        cls.post = Post.objects.create(author=cls.author, title='Alvo', slug='alvo',
+                                       content='Conteúdo', status='published')
+
+    def auth_queries(self, url):
+        # Queries de sessão e de usuário feitas por uma requisição
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        tables = ('"django_session"', 'FROM "auth_user"')
+        return response, [q['sql'] for q in captured if any(table in q['sql'] for table in tables)]
+
+    def test_anonymous_reads_make_no_session_or_user_queries(self):
+        for url in (reverse('post_list'), reverse('post_detail', args=['alvo'])):
+            with self.subTest(url=url):
+                response, queries = self.auth_queries(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(queries, [])
+
+    def test_cached_session_and_user_after_first_request(self):
+        for engine in ('django.contrib.sessions.backends.cached_db',
+                       'django.contrib.sessions.backends.signed_cookies'):
+            with self.subTest(engine=engine), self.settings(SESSION_ENGINE=engine, POSTS_USER_CACHE='sessions'):
+                # Cliente novo: o SessionMiddleware guarda o engine ao ser criado
+                self.client = Client()
+                self.client.force_login(self.author)
+                _, first = self.auth_queries(reverse('post_list'))
+                self.assertEqual(len(first), 1)  # só o usuário
+                response, queries = self.auth_queries(reverse('post_list'))
+                self.assertEqual(queries, [])
+                self.assertTrue(response.wsgi_request.user.is_authenticated)
+
+                # Senha nova invalida o usuário no cache e derruba a sessão antiga
+                self.author.set_password('outra-senha-456')
+                self.author.save()
+                response = self.client.get(reverse('post_list'))
+                self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+    def test_session_and_user_caches_must_be_shared(self):
+        self.assertEqual(check_shared_session_caches(None), [])
+        with self.settings(SESSION_ENGINE='django.contrib.sessions.backends.cached_db', POSTS_USER_CACHE='sessions'):
+            self.assertEqual([e.id for e in check_shared_session_caches(None)], ['posts.E001', 'posts.E002'])
+        redis = {**settings.CACHES, 'sessions': {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                                                 'LOCATION': 'redis://localhost:6379/1'}}
+        with self.settings(SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+                           POSTS_USER_CACHE='sessions', CACHES=redis):
+            self.assertEqual(check_shared_session_caches(None), [])
+
+    def test_purge_sessions_deletes_only_expired_in_batches(self):
+        now = timezone.now()
+        for i in range(5):
+            Session.objects.create(session_key=f'expirada{i}', session_data='', expire_date=now - timedelta(days=1))
+        Session.objects.create(session_key='valida', session_data='', expire_date=now + timedelta(days=1))
+        output = StringIO()
+        with CaptureQueriesContext(connection) as captured:
+            call_command('purge_sessions', '--batch-size', '2', stdout=output)
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['valida'])
+        self.assertIn('5 sessões expiradas apagadas em 3 lotes', output.getvalue())
+        deletes = [q['sql'] for q in captured if q['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 3)
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    # Primário = banco de testes; réplica = outro arquivo SQLite, atualizado
+    # só quando o teste chama sync_replicas (o atraso de replicação)
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        connections.settings['replica_teste'] = {
+            **connections['default'].settings_dict, 'NAME': os.path.join(directory.name, 'replica.sqlite3'),
+        }
+        # Aberta aqui: o TransactionTestCase recusa abrir conexões fora de `databases`
+        connections['replica_teste'].connect()
+        self.addCleanup(self.drop_replica)
+        settings_override = override_settings(POSTS_READ_REPLICAS=['replica_teste'], POSTS_PAGE_CACHE_ENABLED=False)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.author = User.objects.create_user('autor', password='senha-forte-123')
+        Post.objects.create(author=self.author, title='Antigo', slug='antigo', content='Texto', status='published')
+        self.replicate()
+
+    def drop_replica(self, alias='replica_teste'):
+        connections[alias].close()
+        del connections[alias]
+        del connections.settings[alias]
+
+    def replicate(self):
+        call_command('sync_replicas', stdout=StringIO())
+
+    def test_reads_lag_behind_except_for_the_writer(self):
+        writer, reader = Client(), Client()
+        writer.force_login(self.author)
+        self.assertEqual(writer.get(reverse('post_detail', args=['antigo'])).status_code, 200)
+
+        response = writer.post(reverse('post_create'), {'title': 'Novo', 'content': 'Texto', 'status': 'published'})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        # A réplica ainda não tem o post: só quem escreveu (no primário) o vê
+        url = reverse('post_detail', args=['novo'])
+        self.assertEqual(reader.get(url).status_code, 404)
+        self.assertEqual(writer.get(url).status_code, 200)
+        self.assertNotContains(reader.get(reverse('post_list')), 'Novo')
+
+        # Passada a janela, o autor volta a ler da réplica atrasada
+        writer.cookies[PIN_COOKIE] = '0'
+        self.assertEqual(writer.get(url).status_code, 404)
+
+        self.replicate()
+        self.assertEqual(reader.get(url).status_code, 200)
+        self.assertContains(reader.get(reverse('post_list')), 'Novo')
+
+    def test_each_request_reads_from_a_single_replica(self):
+        connections.settings['replica_dois'] = {
+            **connections['replica_teste'].settings_dict,
+            'NAME': connections['replica_teste'].settings_dict['NAME'].replace('replica.', 'replica_dois.'),
+        }
+        connections['replica_dois'].connect()
+        self.addCleanup(self.drop_replica, 'replica_dois')
+        with self.settings(POSTS_READ_REPLICAS=['replica_teste', 'replica_dois']):
+            self.replicate()
+            # Sorteada por requisição, nunca por query: ETag, post e comentários da mesma réplica
+            for _ in range(6):
+                with CaptureQueriesContext(connections['replica_teste']) as first, \
+                        CaptureQueriesContext(connections['replica_dois']) as second:
+                    self.assertEqual(self.client.get(reverse('post_detail', args=['antigo'])).status_code, 200)
+                self.assertEqual(sorted([bool(first), bool(second)]), [False, True])
+
+    def test_lagging_replica_does_not_refill_the_page_cache(self):
+        get_page_cache().clear()
+        url = reverse('post_detail', args=['antigo'])
+        with self.settings(POSTS_PAGE_CACHE_ENABLED=True):
+            self.assertContains(self.client.get(url), 'Antigo')
+            # A edição purga a página; a réplica ainda tem o título antigo
+            post = Post.objects.get(slug='antigo')
+            post.title = 'Revisado'
+            post.save()
+            self.assertContains(self.client.get(url), 'Revisado')
+            # A página que ficou no cache é a do primário, não a da réplica
+            with self.assertNumQueries(0, using='replica_teste'), self.assertNumQueries(0):
+                self.assertContains(self.client.get(url), 'Revisado')
+
+    def test_commands_and_writes_stay_on_the_primary(self):
+        Post.objects.create(author=self.author, title='Fora', slug='fora', content='Texto', status='published')
+        # Fora de uma requisição (comandos, shell) a leitura é no primário
+        self.assertTrue(Post.objects.filter(slug='fora').exists())
+        self.assertFalse(Post.objects.using('replica_teste').filter(slug='fora').exists())
+
+
+class DatabaseProfileTests(SimpleTestCase):
+    # Relê blogproject/settings.py com outras variáveis de ambiente, num
+    # módulo à parte (as settings em uso não mudam)
+    def load(self, **environ):
+        clean = {key: value for key, value in os.environ.items()
+                 if not key.startswith(('DB_', 'SQLITE_', 'POSTGRES_', 'POSTS_DATABASE_'))}
+        path = os.path.join(settings.BASE_DIR, 'blogproject', 'settings.py')
+        spec = importlib.util.spec_from_file_location('profile_settings', path)
+        module = importlib.util.module_from_spec(spec)
+        with mock.patch.dict(os.environ, {**clean, **environ}, clear=True):
+            spec.loader.exec_module(module)
+        return module
+
+    def test_sqlite_default_keeps_the_repository_database_out_of_wal(self):
+        default = self.load().DATABASES['default']
+        self.assertEqual(default['ENGINE'], 'django.db.backends.sqlite3')
+        self.assertEqual(default['CONN_MAX_AGE'], 60)
+        self.assertEqual(default['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+        self.assertNotIn('journal_mode=WAL', default['OPTIONS']['init_command'])
+        self.assertIn('cache_size', default['OPTIONS']['init_command'])
+
+    def test_sqlite_wal_only_when_asked(self):
+        for environ in ({'SQLITE_WAL': '1'}, {'SQLITE_PATH': '/tmp/blog.sqlite3'}):
+            with self.subTest(environ=environ):
+                options = self.load(**environ).DATABASES['default']['OPTIONS']
+                self.assertIn('PRAGMA journal_mode=WAL;', options['init_command'])
+        options = self.load(SQLITE_PATH='/tmp/blog.sqlite3', SQLITE_WAL='0').DATABASES['default']['OPTIONS']
+        self.assertNotIn('journal_mode=WAL', options['init_command'])
+        self.assertEqual(self.load(SQLITE_TUNING='0').DATABASES['default']['OPTIONS'], {})
+
+    def test_postgres_persistent_and_pooled(self):
+        default = self.load(DB_ENGINE='postgres', DB_CONN_MAX_AGE='120').DATABASES['default']
+        self.assertEqual(default['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual((default['CONN_MAX_AGE'], default['CONN_HEALTH_CHECKS']), (120, True))
+        self.assertNotIn('pool', default['OPTIONS'])
+        default = self.load(DB_ENGINE='postgres', DB_POOL='1', DB_POOL_MAX_SIZE='20').DATABASES['default']
+        self.assertEqual(default['CONN_MAX_AGE'], 0)
+        self.assertEqual(default['OPTIONS']['pool'], {'min_size': 2, 'max_size': 20, 'timeout': 10})
+
+    def test_replica_aliases(self):
+        module = self.load(DB_ENGINE='postgres', POSTS_DATABASE_REPLICAS='db-r1,db-r2')
+        self.assertEqual(module.POSTS_READ_REPLICAS, ['replica_1', 'replica_2'])
+        self.assertEqual([module.DATABASES[alias]['HOST'] for alias in module.POSTS_READ_REPLICAS],
+                         ['db-r1', 'db-r2'])
+        self.assertEqual(module.DATABASES['replica_1']['TEST'], {'MIRROR': 'default'})
+        self.assertEqual(module.DATABASES['default']['HOST'], 'localhost')
+        module = self.load(POSTS_DATABASE_REPLICAS='/tmp/replica.sqlite3')
+        self.assertEqual(module.DATABASES['replica_1']['NAME'], '/tmp/replica.sqlite3')
+        # As opções são copiadas, não compartilhadas com o primário
+        self.assertIsNot(module.DATABASES['replica_1']['OPTIONS'], module.DATABASES['default']['OPTIONS'])
+        self.assertEqual(self.load().POSTS_READ_REPLICAS, [])
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('autor', password='senha-forte-123')
+        cls.post = Post.objects.create(author=cls.author, title='Alvo', slug='alvo',
+                                       content='Original', status='published')
+
+    def test_detail_returns_304_with_a_single_query(self):
+        response = self.client.get('/alvo/')
+        self.assertTrue(response.has_header('Last-Modified'))
+        with self.assertNumQueries(1):
+            response = self.client.get('/alvo/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_if_modified_since_on_list(self):
+        response = self.client.get('/blog/')
+        again = self.client.get('/blog/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(again.status_code, 304)
+
+    def test_validators_change_with_content(self):
+        detail = self.client.get('/alvo/')['ETag']
+        listing = self.client.get('/')['ETag']
+        Comment.objects.create(post=self.post, author=self.author, content='x', approved=True)
+        self.assertNotEqual(self.client.get('/alvo/')['ETag'], detail)
+        self.assertNotEqual(self.client.get('/')['ETag'], listing)
+        response = self.client.get('/', HTTP_IF_NONE_MATCH=listing)
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_validators_cost_one_query_and_follow_every_change(self):
+        response = self.client.get('/')
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        # Despublicar e apagar não mudam o updated_at de nenhum post publicado
+        etags = {response['ETag']}
+        other = Post.objects.create(author=self.author, title='Outro', slug='outro', content='x', status='published')
+        etags.add(self.client.get('/')['ETag'])
+        other.status = 'draft'
+        other.save()
+        etags.add(self.client.get('/')['ETag'])
+        other.delete()
+        etags.add(self.client.get('/')['ETag'])
+        self.assertEqual(len(etags), 4)
+
+    def test_etag_differs_per_session(self):
+        anonymous = self.client.get('/alvo/')['ETag']
+        self.client.force_login(self.author)
+        response = self.client.get('/alvo/', HTTP_IF_NONE_MATCH=anonymous)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_missing_post_still_404(self):
+        self.assertEqual(self.client.get('/nao-existe/').status_code, 404)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user('autor', password='senha-forte-123')
+
+    def create(self, title, content, status='published'):
+        slug = f'post-{Post.objects.count()}'
+        return Post.objects.create(author=self.author, title=title, slug=slug,
+                                   content=content, status=status)
+
+    def check_backend(self):
+        django_post = self.create('Migrações no Django', 'Como escrever uma migração de dados.')
+        self.create('Cache de página', 'Django e cache de fragmentos, cache de página.')
+        self.create('Rascunho sobre Django', 'Ainda não publicado.', status='draft')
+        deleted = self.create('Post apagado', 'Este post será removido.')
+
+        self.assertEqual([p.title for p in search_posts('migracoes')[0:10]], ['Migrações no Django'])
+        # Termo no título pesa mais que no conteúdo
+        self.assertEqual(search_posts('django')[0:1][0].pk, django_post.pk)
+        self.assertEqual(search_posts('django cache').count(), 1)
+        self.assertEqual(search_posts('rascunho').count(), 0)
+        self.assertEqual(search_posts('rascunho', published_only=False).count(), 1)
+
+        deleted.delete()
+        self.assertEqual(search_posts('apagado').count(), 0)
+        django_post.title = 'Esquemas'
+        django_post.save()
+        self.assertEqual(search_posts('migracoes').count(), 0)
+        self.assertEqual(search_posts('esquemas').count(), 1)
+
+    def test_fts5_backend(self):
+        self.assertIsInstance(get_search_backend(), FTS5SearchBackend)
+        self.check_backend()
+
+    def test_pure_python_fallback(self):
+        with mock.patch.dict('posts.search._backend_cache', {'default': InvertedIndexSearchBackend()}):
+            self.check_backend()
+
+    def test_pure_python_fallback_truncates_long_terms(self):
+        prefix = 'x' * 64
+        with mock.patch.dict('posts.search._backend_cache', {'default': InvertedIndexSearchBackend()}):
+            # Dois termos longos com o mesmo começo: uma linha só no índice
+            post = self.create('Longo', f'{prefix}aaa {prefix}bbb')
+            self.assertEqual(PostSearchTerm.objects.filter(post=post, term=prefix).get().weight, 2)
+            self.assertEqual(search_posts(f'{prefix}zzz').count(), 1)
+
+    def test_search_view_paginates_ranked_results(self):
+        for i in range(12):
+            self.create(f'Post {i}', 'Texto sobre índices')
+        response = self.client.get(reverse('post_search'), {'q': 'indices', 'page': 2})
+        self.assertEqual(response.context['paginator'].count, 12)
+        self.assertEqual(len(response.context['posts']), 2)
+        self.assertContains(response, '12 resultados')
+
+
+class PostExcerptTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('autor', password='senha-forte-123')
+        cls.post = Post.objects.create(author=cls.author, title='Alvo', slug='alvo', status='published',
+                                       content='<p>Primeiro &amp; <b>único</b></p>' + ' palavra' * 100)
+
+    def test_excerpt_and_html_are_generated_on_save(self):
+        self.assertTrue(self.post.excerpt.startswith('Primeiro & único palavra'))
+        self.assertEqual(len(self.post.excerpt), 250)
+        self.assertEqual(self.post.content_html, self.post.content)
+        self.post.content = 'Novo texto'
+        self.post.save(update_fields=['content'])
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.excerpt, self.post.content_html), ('Novo texto', 'Novo texto'))
+
+    def test_list_never_loads_the_body(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse('post_list'))
+        self.assertContains(response, 'Primeiro &amp; único')
+        self.assertNotContains(response, '<b>único</b>')
+        self.assertTrue(all('"content"' not in query['sql'] for query in captured))
+        # O detalhe continua com o corpo renderizado
+        self.assertContains(self.client.get(reverse('post_detail', args=['alvo'])), '<b>único</b>')
+
+    def test_render_posts_backfills_in_chunks(self):
+        Post.objects.create(author=self.author, title='Outro', slug='outro', content='Texto')
+        Post.objects.update(excerpt='', content_html='')
+        with self.assertRaises(CommandError):
+            call_command('render_posts', '--check', stdout=StringIO())
+        output = StringIO()
+        call_command('render_posts', '--chunk-size', '1', stdout=output)
+        self.assertIn('2 posts verificados, 2 renderizados', output.getvalue())
+        self.assertEqual(Post.objects.get(slug='outro').excerpt, 'Texto')
+        call_command('render_posts', '--check', stdout=StringIO())
+
+    def test_render_posts_changes_the_detail_etag(self):
+        url = reverse('post_detail', args=['alvo'])
+        etag = self.client.get(url)['ETag']
+        Post.objects.filter(pk=self.post.pk).update(content_html='')
+        call_command('render_posts', stdout=StringIO())
+        response = self.client.get(url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_cached_cards_follow_the_stored_excerpt(self):
+        # Outro processo (render_posts) regrava o excerpt sem mudar updated_at
+        # nem tocar no cache de fragmentos deste
+        self.client.get(reverse('post_list'))
+        Post.objects.filter(pk=self.post.pk).update(excerpt='Resumo regravado')
+        self.assertContains(self.client.get(reverse('post_list')), 'Resumo regravado')
+
+    def test_migration_backfills_existing_posts(self):
+        migration = importlib.import_module('posts.migrations.0010_post_excerpt_content_html')
+        Post.objects.update(excerpt='', content_html='')
+        migration.backfill_rendered_fields(django_apps, None)
+        self.post.refresh_from_db()
+        self.assertTrue(self.post.excerpt.startswith('Primeiro & único'))
+        self.assertEqual(self.post.content_html, self.post.content)
+
+
+class ImportExportTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user('autor', password='senha-forte-123')
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def write_jsonl(self, name, rows):
+        with open(self.path(name), 'w', encoding='utf-8') as output:
+            for row in rows:
+                output.write(json.dumps(row) + '\n')
+        return self.path(name)
+
+    def test_import_posts_resolves_slugs_and_keeps_dates(self):
+        Post.objects.create(author=self.author, title='Olá Mundo', slug='ola-mundo', content='x')
+        path = self.write_jsonl('posts.jsonl', [
+            {'title': 'Olá Mundo', 'author': 'autor', 'status': 'published',
+             'content': 'Primeiro', 'created_at': '2020-01-02T03:04:05+00:00'},
+            {'title': 'Olá, mundo!', 'author': 'autor', 'status': 'published', 'content': 'Segundo'},
+            {'title': 'Sem autor', 'author': 'fantasma'},
+        ])
+        call_command('import_blog', 'posts', path, stdout=StringIO())
+
+        imported = Post.objects.exclude(slug='ola-mundo').order_by('pk')
+        self.assertEqual([p.slug for p in imported], ['ola-mundo-2', 'ola-mundo-3'])
+        self.assertEqual(imported[0].created_at.year, 2020)
+        self.assertEqual(search_posts('primeiro').count(), 1)
+
+    def test_author_stats_are_recounted_once_per_import(self):
+        path = self.write_jsonl('posts.jsonl', [
+            {'title': f'Post {i}', 'author': 'autor', 'status': 'published', 'content': 'x'} for i in range(5)
+        ])
+        with mock.patch('posts.management.commands.import_blog.recount_author_stats',
+                        wraps=recount_author_stats) as recount:
+            call_command('import_blog', 'posts', path, '--batch-size', '2', stdout=StringIO())
+        recount.assert_called_once_with([self.author.pk])
+        self.assertEqual(AuthorStats.objects.get(author=self.author).post_count, 5)
+
+    def test_interrupted_import_finalizes_committed_batches(self):
+        path = self.path('posts.jsonl')
+        with open(path, 'w', encoding='utf-8') as output:
+            for i in range(3):
+                output.write(json.dumps({'title': f'Post {i}', 'author': 'autor', 'status': 'published'}) + '\n')
+            output.write('{quebrado\n')
+        with mock.patch('posts.management.commands.import_blog.invalidate_post_pages') as invalidate, \
+                self.assertRaises(CommandError):
+            call_command('import_blog', 'posts', path, '--batch-size', '2', stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(AuthorStats.objects.get(author=self.author).post_count, 2)
+        invalidate.assert_called_once_with()
+
+    def test_round_trip_with_comments_and_csv(self):
+        post = Post.objects.create(author=self.author, title='Alvo', slug='alvo',
+                                   content='x', status='published')
+        Comment.objects.create(post=post, author=self.author, content='Oi', approved=True)
+        call_command('export_blog', 'posts', '-o', self.path('posts.csv'), stderr=StringIO())
+        call_command('export_blog', 'comments', '-o', self.path('comments.jsonl'), stderr=StringIO())
+        Post.objects.all().delete()
+
+        call_command('import_blog', 'posts', self.path('posts.csv'), stdout=StringIO())
+        call_command('import_blog', 'comments', self.path('comments.jsonl'), stdout=StringIO())
+        post = Post.objects.get(slug='alvo')
+        self.assertEqual(post.approved_comment_count, 1)
+        self.assertEqual(post.comments.get().content, 'Oi')
+
+    @override_settings(POSTS_PAGE_CACHE_ENABLED=True)
+    def test_import_comments_purges_cached_detail_pages(self):
+        Post.objects.create(author=self.author, title='Alvo', slug='alvo', content='x', status='published')
+        get_page_cache().clear()
+        self.assertNotContains(self.client.get('/alvo/'), 'Importado')
+        path = self.write_jsonl('comments.jsonl', [
+            {'post': 'alvo', 'author': 'autor', 'content': 'Importado', 'approved': True},
+        ])
+        call_command('import_blog', 'comments', path, stdout=StringIO())
+        self.assertContains(self.client.get('/alvo/'), 'Importado')
+
+    def test_create_authors_option(self):
+        path = self.write_jsonl('posts.jsonl', [{'title': 'Novo', 'author': 'recém-chegado'}])
+        call_command('import_blog', 'posts', path, '--create-authors', stdout=StringIO())
+        self.assertEqual(Post.objects.get().author.username, 'recém-chegado')
+
+
+class SlugTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('autor', password='x')
+        Post.objects.create(author=cls.author, title='Olá Mundo', slug='ola-mundo', content='x')
+
+    def test_slugs_are_ascii_unique_and_avoid_reserved_paths(self):
+        self.assertEqual(unique_slug('Ação Rápida!'), 'acao-rapida')
+        self.assertEqual(unique_slug('Olá, mundo'), 'ola-mundo-2')
+        self.assertEqual(unique_slug('Search'), 'search-2')
+        self.assertEqual(unique_slugs(['Olá Mundo', 'Olá Mundo', 'New']),
+                         ['ola-mundo-2', 'ola-mundo-3', 'new-2'])
+        # "foo-2" existe sem "foo": a repetição no lote não pode cair nele
+        Post.objects.create(author=self.author, title='Foo', slug='foo-2', content='x')
+        self.assertEqual(unique_slugs(['Foo', 'Foo']), ['foo', 'foo-3'])
+
+    def test_create_and_update_views_generate_slugs(self):
+        self.client.force_login(self.author)
+        data = {'title': 'Olá Mundo', 'content': 'Texto', 'status': 'published'}
+        self.client.post(reverse('post_create'), data)
+        post = Post.objects.latest('pk')
+        self.assertEqual(post.slug, 'ola-mundo-2')
+
+        # Só o conteúdo mudou: a URL continua a mesma
+        self.client.post(reverse('post_update', args=[post.slug]), {**data, 'content': 'Novo'})
+        post.refresh_from_db()
+        self.assertEqual(post.slug, 'ola-mundo-2')
+
+        response = self.client.post(reverse('post_update', args=[post.slug]),
+                                    {**data, 'title': 'Título Novo'})
+        post.refresh_from_db()
+        self.assertEqual(post.slug, 'titulo-novo')
+        self.assertRedirects(response, reverse('post_detail', args=['titulo-novo']))
+
+    def test_save_retries_when_slug_is_taken_concurrently(self):
+        # Simula outro processo gravando o mesmo slug entre a consulta e o INSERT
+        real_unique_slug = unique_slug
+        stale = iter(['ola-mundo'])
+        with mock.patch('posts.slugs.unique_slug',
+                        side_effect=lambda *a, **kw: next(stale, None) or real_unique_slug(*a, **kw)):
+            post = save_with_unique_slug(Post(author=self.author, title='Olá Mundo', content='y'))
+        self.assertRegex(post.slug, r'^ola-mundo-\d+$')
+        self.assertEqual(Post.objects.count(), 2)
+
+
+class AsyncReadViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('autor', password='x')
+        for i in range(7):
+            Post.objects.create(author=cls.author, title=f'Post {i}', slug=f'post-{i}',
+                                content='Conteúdo', status='published')
+        cls.post = Post.objects.get(slug='post-6')
+        Comment.objects.create(post=cls.post, author=cls.author, content='Aprovado', approved=True)
+
+    def setUp(self):
+        # As rotas são montadas no import: recarrega posts.urls com as views async
+        overrides = override_settings(POSTS_ASYNC_VIEWS={'post_list', 'post_detail'},
+                                      POSTS_PAGINATION_MODE='cursor')
+        overrides.enable()
+        self.addCleanup(self.reload_urls)
+        self.addCleanup(overrides.disable)
+        self.reload_urls()
+
+    def reload_urls(self):
+        importlib.reload(posts_urls)
+        importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+        clear_url_caches()
+
+    async def test_list_and_detail_match_the_sync_pages(self):
+        response = await self.async_client.get(reverse('post_list'))
+        self.assertIs(response.resolver_match.func.view_class, AsyncPostListView)
+        self.assertContains(response, 'Post 6')
+        self.assertTrue(response.context['page_obj'].has_next())
+        next_page = await self.async_client.get(
+            reverse('post_list'), {'cursor': response.context['page_obj'].next_cursor})
+        self.assertEqual([p.slug for p in next_page.context['posts']], ['post-1', 'post-0'])
+
+        detail = await self.async_client.get(reverse('post_detail', args=['post-6']))
+        self.assertIs(detail.resolver_match.func.view_class, AsyncPostDetailView)
+        self.assertContains(detail, 'Aprovado')
+        # Mesmos validadores das views síncronas
+        sync_detail = await sync_to_async(PostDetailView.as_view())(
+            RequestFactory().get('/post-6/'), slug='post-6')
+        self.assertEqual(detail['ETag'], sync_detail['ETag'])
+        not_modified = await self.async_client.get(
+            reverse('post_detail', args=['post-6']), headers={'if-none-match': detail['ETag']})
+        self.assertEqual(not_modified.status_code, 304)
+        missing = await self.async_client.get(reverse('post_detail', args=['nao-existe']))
+        self.assertEqual(missing.status_code, 404)
+
+    def test_logged_in_reader_within_budget_and_comment_post(self):
+        # O cliente síncrono também serve as views async (o handler adapta)
+        self.client.force_login(self.author)
+        url = reverse('post_detail', args=['post-6'])
+        for path in (url, reverse('post_list')):
+            response = request_within_budget(self.client, 'get', path)
+            self.assertContains(response, 'Olá, <span class="font-semibold text-primary">autor</span>')
+        self.assertContains(self.client.get(url), 'Editar Post')
+        response = self.client.post(url, {'content': 'Novo'})
+        self.assertRedirects(response, url)
+        self.assertTrue(Comment.objects.filter(content='Novo', approved=False).exists())
+
+
+@override_settings(POSTS_THROTTLE_ENABLED=True, POSTS_THROTTLE_BACKEND='memory', POSTS_THROTTLE_RATES={
+    'comment': {'user': '2/min', 'ip': '5/min'},
+    'post_create': {'user': '1/min'},
+})
+class WriteThrottleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create_user(f'leitor{i}', password='x') for i in range(3)]
+        cls.post = Post.objects.create(author=cls.users[0], title='Alvo', slug='alvo',
+                                       content='Conteúdo', status='published')
+        cls.url = reverse('post_detail', args=['alvo'])
+
+    def setUp(self):
+        memory_buckets.reset()
+        self.addCleanup(memory_buckets.reset)
+
+    def comment(self, user, ip='10.0.0.1'):
+        self.client.force_login(user)
+        return self.client.post(self.url, {'content': 'Oi'}, REMOTE_ADDR=ip)
+
+    def test_user_and_ip_buckets_return_429_with_retry_after(self):
+        self.assertEqual([self.comment(self.users[0]).status_code for _ in range(3)], [302, 302, 429])
+        response = self.comment(self.users[0], ip='10.0.0.2')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')  # 1 ficha a cada 60/2 s
+        # Outro usuário no mesmo IP ainda pode, até o balde do IP esvaziar (o IP
+        # é checado antes do usuário: a terceira tentativa já gastou a ficha)
+        self.assertEqual(self.comment(self.users[1]).status_code, 302)
+        self.assertEqual(self.comment(self.users[2]).status_code, 302)
+        self.assertEqual(self.comment(self.users[2]).status_code, 429)
+        self.assertEqual(Comment.objects.count(), 4)
+        # Leituras e escopos sem taxa de IP não são afetados
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.client.force_login(self.users[1])
+        data = {'title': 'Novo', 'content': 'Texto', 'status': 'published'}
+        self.assertEqual(self.client.post(reverse('post_create'), data).status_code, 302)
+        self.assertEqual(self.client.post(reverse('post_create'), data).status_code, 429)
+
+    def test_shared_cache_backend_and_refill(self):
+        with override_settings(POSTS_THROTTLE_BACKEND='cache', POSTS_THROTTLE_CACHE='default'):
+            get_page_cache().clear()
+            statuses = [self.comment(self.users[0]).status_code for _ in range(3)]
+            self.assertEqual(statuses, [302, 302, 429])
+            # Os baldes estão no cache, não no processo
+            self.assertEqual(memory_buckets.buckets, {})
+        state, wait = take_token((0.0, 0.0), 2, 60, 15)
+        self.assertEqual(wait, 15)
+        state, wait = take_token(state, 2, 60, 30)
+        self.assertEqual((wait, state[0]), (0, 0.0))
+
+    def test_memory_buckets_stay_bounded(self):
+        buckets = MemoryBuckets(max_keys=3)
+        for i in range(5):
+            buckets.take(f'ip:{i}', 2, 60, 100 + i)
+        self.assertEqual(list(buckets.buckets), ['ip:2', 'ip:3', 'ip:4'])
+        # Um período depois os baldes já encheram e saem no próximo acesso
+        buckets.take('ip:3', 2, 60, 200)
+        self.assertEqual(list(buckets.buckets), ['ip:3'])
+
+    @override_settings(POSTS_THROTTLE_ENABLED=False)
+    def test_disabled(self):
+        self.assertEqual({self.comment(self.users[0]).status_code for _ in range(5)}, {302})
+
+
+class PerformanceMetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('autor', password='x')
+        cls.staff = User.objects.create_user('equipe', password='x', is_staff=True)
+        Post.objects.create(author=cls.author, title='Alvo', slug='alvo', content='x', status='published')
+
+    def setUp(self):
+        route_metrics.reset()
+
+    def test_server_timing_and_route_histograms(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse('post_detail', args=['alvo']))
+        queries = len(captured)
+        self.assertRegex(response['Server-Timing'],
+                         rf'^db;dur=[\d.]+;desc="{queries} queries", tpl;dur=[\d.]+, total;dur=[\d.]+$')
+        # Rotas fora de `posts` não são medidas
+        self.assertNotIn('Server-Timing', self.client.get(reverse('login')))
+
+        stats = route_metrics.as_dict()
+        self.assertEqual(list(stats), ['post_detail'])
+        self.assertEqual(stats['post_detail']['queries'], queries)
+        self.assertEqual(stats['post_detail']['recent']['total']['count'], 1)
+
+    @override_settings(POSTS_METRICS_TOKEN='segredo')
+    def test_endpoints_are_restricted(self):
+        self.client.get(reverse('post_list'))
+        self.assertEqual(self.client.get(reverse('metrics_json')).status_code, 403)
+        response = self.client.get(reverse('metrics_prometheus'), headers={'authorization': 'Bearer segredo'})
+        self.assertContains(response, 'posts_request_total_milliseconds_count{route="post_list"} 1')
+        self.assertContains(response, 'posts_cache_misses_total{cache="fragments"}')
+        self.client.force_login(self.staff)
+        data = self.client.get(reverse('metrics_json')).json()
+        self.assertIn('post_list', data['routes'])
+        self.assertEqual(set(data['caches']), {'fragments', 'pages'})
+
+    def test_off_and_unsampled_modes(self):
+        with override_settings(POSTS_METRICS_ENABLED=False):
+            with self.assertRaises(MiddlewareNotUsed):
+                PerformanceMiddleware(lambda request: None)
+        with override_settings(POSTS_METRICS_SAMPLE_RATE=0.0):
+            response = Client().get(reverse('post_list'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(route_metrics.as_dict(), {})
+
+
+class SeedAndBenchmarkTests(TestCase):
+    def test_seed_is_reproducible_and_counters_consistent(self):
+        options = dict(users=5, posts=60, comments=400, hot_posts=2, seed=7, stdout=StringIO())
+        call_command('seed_blog', **options)
+        first = list(Post.objects.order_by('pk').values_list('title', 'status', 'approved_comment_count'))
+        self.assertTrue(any(status == 'draft' for _, status, _ in first))
+        call_command('recount_comments', check=True, stdout=StringIO())
+
+        Post.objects.all().delete()
+        call_command('seed_blog', **options)
+        again = list(Post.objects.order_by('pk').values_list('title', 'status', 'approved_comment_count'))
+        self.assertEqual(again, first)
+
+    def test_benchmark_writes_comparable_json(self):
+        call_command('seed_blog', users=3, posts=20, comments=50, stdout=StringIO())
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'resultado.json')
+            call_command('benchmark_blog', iterations=2, warmup=0, memory_iterations=1,
+                         output=output, stdout=StringIO())
+            call_command('benchmark_blog', iterations=2, warmup=0, memory_iterations=0,
+                         scenarios='list,detail_hot', compare=output, stdout=StringIO())
+            with open(output) as result_file:
+                report = json.load(result_file)
+        self.assertEqual(report['meta']['dataset']['posts'], 20)
+        for name, result in report['scenarios'].items():
+            with self.subTest(name=name):
+                self.assertEqual(result['errors'], 0)
+                self.assertGreater(result['queries']['mean'], 0)
+        # Nada do que o benchmark criou fica no banco
+        self.assertFalse(Post.objects.filter(title__startswith='[benchmark_blog]').exists())
@@ -0,0 +1,176 @@
+# posts/throttling.py
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+
+PERIODS = {'s': 1, 'sec': 1, 'min': 60, 'hour': 60 * 60, 'day': 60 * 60 * 24}
+
+# Só escritas passam pelo limite
+THROTTLED_METHODS = ('POST',)
+
+
+def parse_rate(rate):
+    # '10/min' -> (10, 60): balde de 10 fichas, reposto por inteiro em 60 s
+    count, period = rate.split('/')
+    return int(count), PERIODS[period]
+
+
+def take_token(state, capacity, period, now):
+    """
+    Token bucket: `state` é (fichas, instante da última atualização) ou None
+    para um balde cheio. Retorna (novo estado, espera); espera 0 significa
+    que a ficha foi consumida, senão são os segundos até a próxima ficha.
+    """
+    tokens, updated = state if state is not None else (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * capacity / period)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) * period / capacity
+
+
+class MemoryBuckets:
+    """
+    Baldes em memória, por processo: nenhuma ida ao banco ou ao cache. Com
+    vários workers, cada processo tem os seus (o limite efetivo multiplica).
+    No máximo `max_keys` baldes, em ordem de uso: os que já encheram saem a
+    cada acesso e, acima do limite, os menos usados recentemente também.
+    """
+
+    def __init__(self, max_keys=10000):
+        self._lock = threading.Lock()
+        self.max_keys = max_keys
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.buckets = OrderedDict()
+
+    def take(self, key, capacity, period, now):
+        with self._lock:
+            state, _ = self.buckets.pop(key, (None, period))
+            state, wait = take_token(state, capacity, period, now)
+            self.buckets[key] = (state, period)
+            self._prune(now)
+            return wait
+
+    async def atake(self, key, capacity, period, now):
+        # Só memória e um lock curto: roda direto no event loop
+        return self.take(key, capacity, period, now)
+
+    def _prune(self, now):
+        # Baldes intocados há um período inteiro já estariam cheios: esquecer
+        # um deles é o mesmo que mantê-lo. Os mais antigos ficam no começo,
+        # então cada acesso só olha até o primeiro balde ainda em uso. Acima
+        # de max_keys o menos usado sai mesmo sem ter enchido (volta cheio)
+        while self.buckets:
+            key, ((_, updated), period) = next(iter(self.buckets.items()))
+            if now - updated < period and len(self.buckets) <= self.max_keys:
+                return
+            self.buckets.popitem(last=False)
+
+
+class CacheBuckets:
+    """
+    Baldes num cache do Django (settings.POSTS_THROTTLE_CACHE), compartilhados
+    entre os workers quando o cache é compartilhado (banco, Redis, memcached).
+    Ler e gravar não é atômico: sob corrida, algumas escritas a mais passam.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def take(self, key, capacity, period, now):
+        cache = caches[self.alias]
+        cache_key = f'posts:throttle:{key}'
+        state, wait = take_token(cache.get(cache_key), capacity, period, now)
+        if not wait:
+            # Um período depois o balde estaria cheio de novo: a entrada pode expirar
+            cache.set(cache_key, state, math.ceil(period))
+        return wait
+
+    async def atake(self, key, capacity, period, now):
+        cache = caches[self.alias]
+        cache_key = f'posts:throttle:{key}'
+        state, wait = take_token(await cache.aget(cache_key), capacity, period, now)
+        if not wait:
+            await cache.aset(cache_key, state, math.ceil(period))
+        return wait
+
+
+memory_buckets = MemoryBuckets()
+
+
+def get_buckets():
+    if getattr(settings, 'POSTS_THROTTLE_BACKEND', 'memory') == 'cache':
+        return CacheBuckets(getattr(settings, 'POSTS_THROTTLE_CACHE', 'default'))
+    return memory_buckets
+
+
+def client_ip(request):
+    # Atrás de um proxy, o IP real vem do cabeçalho configurado (primeiro da lista)
+    header = getattr(settings, 'POSTS_THROTTLE_IP_HEADER', None)
+    if header and request.META.get(header):
+        return request.META[header].split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def view_throttle_scope(request):
+    # Escopo declarado pela view que vai atender o POST (`throttle_scope = ...`)
+    if request.method not in THROTTLED_METHODS:
+        return None
+    try:
+        match = resolve(request.path_info, getattr(request, 'urlconf', None))
+    except Resolver404:
+        return None
+    view = getattr(match.func, 'view_class', match.func)
+    return getattr(view, 'throttle_scope', None)
+
+
+def throttle_rate(scope, kind):
+    # (capacidade, período) do balde `kind` ('ip' ou 'user') do escopo, ou None
+    rate = getattr(settings, 'POSTS_THROTTLE_RATES', {}).get(scope, {}).get(kind)
+    return parse_rate(rate) if rate else None
+
+
+def check_throttle(request, scope, kind):
+    """
+    Consome uma ficha do balde do IP ou do usuário no escopo (ver
+    settings.POSTS_THROTTLE_RATES). Retorna 0 ou os segundos de espera.
+    """
+    rate = throttle_rate(scope, kind)
+    if rate is None:
+        return 0
+    if kind == 'ip':
+        key = f'{scope}:ip:{client_ip(request)}'
+    elif request.user.is_authenticated:
+        key = f'{scope}:user:{request.user.pk}'
+    else:
+        return 0
+    return get_buckets().take(key, *rate, time.time())
+
+
+async def acheck_ip_throttle(request, scope):
+    # O balde do IP não depende da sessão: dá para checar no event loop
+    rate = throttle_rate(scope, 'ip')
+    if rate is None:
+        return 0
+    return await get_buckets().atake(f'{scope}:ip:{client_ip(request)}', *rate, time.time())
+
+
+def throttled_response(wait):
+    seconds = max(1, math.ceil(wait))
+    response = HttpResponse(f'Muitas requisições. Tente de novo em {seconds} segundos.',
+                            status=429, content_type='text/plain; charset=utf-8')
+    response['Retry-After'] = str(seconds)
+    # Sai antes do CommonMiddleware, que é quem põe o Content-Length
+    response['Content-Length'] = str(len(response.content))
+    # Sem o aviso "Too Many Requests" do django.request a cada recusa: sob
+    # abuso, seria uma escrita no log por requisição barrada
+    response._has_been_logged = True
+    return response
@@ -1,22 +1,43 @@
 # posts/urls.py
 
+from django.conf import settings
 from django.urls import path
+from .feeds import AuthorPostsAtomFeed, AuthorPostsFeed, LatestPostsAtomFeed
 from .views import (
     PostListView, PostDetailView, PostCreateView, 
-    PostUpdateView, PostDeleteView 
+    PostUpdateView, PostDeleteView, PostSearchView, PostCommentsView, AuthorPostsView, TagPostsView,
+    PostFeedView,
+    AsyncPostListView, AsyncPostDetailView,
 )
 
+
+# Rotas de leitura com versão async: a escolha é por nome de rota
+# (settings.POSTS_ASYNC_VIEWS), para rodar sob ASGI sem ocupar threads
+def read_view(name, view, async_view):
+    chosen = async_view if name in getattr(settings, 'POSTS_ASYNC_VIEWS', ()) else view
+    return chosen.as_view()
+
+
 urlpatterns = [
     # 1. Rota de Criação (Mais Específica)
     path('new/', PostCreateView.as_view(), name='post_create'), # <-- VEM PRIMEIRO!
+    path('search/', PostSearchView.as_view(), name='post_search'),
+    path('author/<str:username>/', AuthorPostsView.as_view(), name='author_posts'),
+    path('tag/<str:slugs>/', TagPostsView.as_view(), name='tag_posts'),
+    path('feed/', PostFeedView.as_view(), name='post_feed'),
+    path('feed/atom/', PostFeedView.as_view(feed_class=LatestPostsAtomFeed), name='post_feed_atom'),
+    path('author/<str:username>/feed/', PostFeedView.as_view(feed_class=AuthorPostsFeed), name='author_feed'),
+    path('author/<str:username>/feed/atom/', PostFeedView.as_view(feed_class=AuthorPostsAtomFeed),
+         name='author_feed_atom'),
     
     # 2. Rota de Edição/Exclusão (Também deve vir antes da genérica)
     path('<slug:slug>/edit/', PostUpdateView.as_view(), name='post_update'), 
     path('<slug:slug>/delete/', PostDeleteView.as_view(), name='post_delete'),
+    path('<slug:slug>/comments/', PostCommentsView.as_view(), name='post_comments'),
     
     # 3. Rota de Detalhe (Genérica com slug)
-    path('<slug:slug>/', PostDetailView.as_view(), name='post_detail'), 
+    path('<slug:slug>/', read_view('post_detail', PostDetailView, AsyncPostDetailView), name='post_detail'), 
     
     # 4. Rota de Lista (Vazio, a mais genérica de todas)
-    path('', PostListView.as_view(), name='post_list'), 
+    path('', read_view('post_list', PostListView, AsyncPostListView), name='post_list'), 
 ]
\ No newline at end of file
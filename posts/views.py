@@ -1,13 +1,88 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse, HttpResponseRedirect, JsonResponse, StreamingHttpResponse
+from django.utils.crypto import constant_time_compare
+from django.core.paginator import InvalidPage, Paginator
+from django.template.response import TemplateResponse
+from django.views import View
+from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
+from asgiref.sync import sync_to_async
 from django.urls import reverse_lazy, reverse
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from .models import Post, Comment
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from .models import AuthorStats, Post, Comment, Tag
+from .feeds import LatestPostsFeed, feed_validators
+from .counters import content_version
 from .forms import CommentForm, PostForm
+from .metrics import cache_stats_prometheus, measure_template, route_metrics
+from .moderation import enqueue_moderation
+from .pagination import KeysetPaginator
+from .cache import (
+    AnonymousPageCacheMixin, AsyncAnonymousPageCacheMixin, AsyncConditionalGetMixin, ConditionalGetMixin,
+    cache_stats,
+)
+from .search import search_posts
+from .sitemaps import SECTIONS as SITEMAP_SECTIONS, sitemap_index, stream_urlset
+from .slugs import save_with_unique_slug, slug_matches_title
+from .tags import MAX_TAGS_PER_QUERY, atag_cloud, tag_cloud, tagged_links
 
 # Create your views here.
-class PostListView(ListView):
+def latest_approved_comment(**filters):
+    # Data do comentário aprovado mais recente, como subquery escalar
+    return Subquery(
+        Comment.objects.filter(approved=True, **filters)
+        .order_by('-created_at').values('created_at')[:1]
+    )
+
+
+def published_posts():
+    # Posts publicados com o autor no mesmo JOIN (lista e detalhe, sync e async)
+    return Post.objects.filter(status='published').select_related('author')
+
+
+def post_cards():
+    # Os cards mostram só o resumo pré-calculado: o corpo do post não sai do banco
+    return published_posts().defer('content', 'content_html')
+
+
+def approved_comments(post):
+    # Comentários visíveis de um post, com o autor no mesmo JOIN; paginados
+    # por cursor sobre o índice parcial (post, created_at, id) WHERE approved
+    return Comment.objects.filter(post=post, approved=True).select_related('author')
+
+
+def comment_page(post, per_page, cursor=None):
+    return KeysetPaginator(approved_comments(post), per_page).page(cursor)
+
+
+def list_validators(row, querystring):
+    # row: (versão, data da mudança) de content_version(), mantida pelos sinais
+    version, changed_at = row or (0, None)
+    return f'list:{querystring}:{version}', changed_at
+
+
+def detail_stats(slug):
+    # Validadores do detalhe numa query só (sem JOIN com o autor)
+    return (
+        Post.objects.filter(status='published', slug=slug)
+        .annotate(latest_comment=latest_approved_comment(post=OuterRef('pk')))
+        .values_list('pk', 'updated_at', 'approved_comment_count', 'latest_comment')
+    )
+
+
+def detail_validators(row):
+    if row is None:
+        return None, None  # a view devolve o 404 normalmente
+    pk, updated_at, comment_count, latest_comment = row
+    last_modified = max(updated_at, latest_comment) if latest_comment else updated_at
+    return f'detail:{pk}:{updated_at.timestamp()}:{comment_count}:{last_modified.timestamp()}', last_modified
+
+
+class PostListView(AnonymousPageCacheMixin, ConditionalGetMixin, ListView):
     # 1. Qual model vou usar?
     model = Post
 
@@ -20,11 +95,145 @@ class PostListView(ListView):
     # 4. Ativar paginação (Quantos itens por pagina?)
     paginate_by = 5
 
-    # 5. Sobreescrevemos o mérodo para garantir que SÓ post publicados sejam exibidos
+    # 5. Modo de paginação: 'offset' (?page=N) ou 'cursor' (?cursor=<token>)
+    # None usa o valor de settings.POSTS_PAGINATION_MODE
+    pagination_mode = None
+
+    # Máximo de queries por requisição (verificado em posts/tests.py)
+    # sessão + usuário + ETag + COUNT do paginador por offset + posts (com autor)
+    # + nuvem de tags (só quando não está no cache)
+    query_budget = 6
+
+    # Nuvem de tags ao lado dos cards (vem do cache, ver posts/tags.py)
+    show_tag_cloud = True
+
+    # 6. Sobreescrevemos o mérodo para garantir que SÓ post publicados sejam exibidos
     def get_queryset(self):
         # Chama o queryset padrão (todos os Posts) e aplica o filtro
-        return Post.objects.filter(status='published').order_by('-created_at')
+        # O id desempata posts criados no mesmo instante
+        # select_related: o autor vem no mesmo JOIN (evita 1 query por card)
+        return post_cards().order_by('-created_at', '-id')
+
+    # Todas as páginas da lista compartilham o escopo 'list' no cache de página
+    def get_page_cache_scope(self):
+        return 'list'
+
+    # ETag/Last-Modified da lista: a versão que os sinais somam a cada post
+    # salvo ou apagado e a cada comentário aprovado ou removido. Uma busca
+    # pela chave primária, qualquer que seja o número de posts.
+    def get_validators(self):
+        return list_validators(content_version().first(), self.request.GET.urlencode())
+
+    def get_pagination_mode(self):
+        return self.pagination_mode or getattr(settings, 'POSTS_PAGINATION_MODE', 'offset')
+
+    # 7. No modo cursor não há COUNT(*) nem OFFSET: a página 10.000 custa o mesmo que a 1
+    def paginate_queryset(self, queryset, page_size):
+        if self.get_pagination_mode() != 'cursor':
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size)
+        page = paginator.page(self.request.GET.get('cursor'))
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['cursor_pagination'] = self.get_pagination_mode() == 'cursor'
+        if self.show_tag_cloud:
+            context['tag_cloud'] = tag_cloud()
+        return context
     
+class AuthorPostsView(PostListView):
+    # Arquivo de um autor (/author/<username>/): os mesmos cards da lista,
+    # só dos posts publicados dele, sempre por cursor sobre o índice
+    # (author, status, created_at, id)
+    template_name = 'posts/author_posts.html'
+    paginate_by = 10
+    pagination_mode = 'cursor'
+    # sessão + usuário + autor (com estatísticas) + posts (com autor)
+    query_budget = 4
+    show_tag_cloud = False
+
+    def get_author(self):
+        if not hasattr(self, 'author'):
+            self.author = get_object_or_404(
+                get_user_model().objects.filter(is_active=True).select_related('post_stats'),
+                username=self.kwargs['username'],
+            )
+        return self.author
+
+    def get_queryset(self):
+        return post_cards().filter(author=self.get_author()).order_by('-created_at', '-id')
+
+    # Escopo 'list': qualquer mudança que invalida a lista (post salvo ou
+    # apagado, comentário aprovado) também invalida os arquivos de autor
+    def get_page_cache_variant(self):
+        return f"author:{self.kwargs['username']}"
+
+    # Sem ETag/Last-Modified: validadores corretos precisariam agregar os
+    # contadores de todos os posts do autor (ou, como a lista, de todos os
+    # posts) a cada requisição. O cache de página cobre os anônimos
+    def get_validators(self):
+        return None, None
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        author = self.get_author()
+        context['author'] = author
+        # Agregados mantidos pelos sinais de Post: nada de COUNT aqui
+        try:
+            context['author_stats'] = author.post_stats
+        except AuthorStats.DoesNotExist:
+            context['author_stats'] = AuthorStats(author=author)
+        return context
+
+class TagPostsView(PostListView):
+    # Arquivo de uma tag (/tag/django/) ou da interseção de várias
+    # (/tag/django+python/): cursor sobre as ligações PostTag publicadas,
+    # no índice parcial (tag, created_at, post)
+    template_name = 'posts/tag_posts.html'
+    paginate_by = 10
+    pagination_mode = 'cursor'
+    # sessão + usuário + tags + ligações da página + posts (com autor) + nuvem de tags
+    query_budget = 6
+
+    def get_tags(self):
+        if not hasattr(self, 'tags'):
+            slugs = list(dict.fromkeys(self.kwargs['slugs'].split('+')))
+            if len(slugs) > MAX_TAGS_PER_QUERY:
+                raise Http404(f'No máximo {MAX_TAGS_PER_QUERY} tags por vez.')
+            tags = {tag.slug: tag for tag in Tag.objects.filter(slug__in=slugs)}
+            if len(tags) != len(slugs):
+                raise Http404('Tag não encontrada.')
+            self.tags = [tags[slug] for slug in slugs]
+        return self.tags
+
+    def get_queryset(self):
+        return tagged_links(self.get_tags())
+
+    # A página é de ligações; os cards vêm depois numa query só pela chave
+    # primária. Sem o filtro de status de post_cards(): as ligações só estão
+    # marcadas como publicadas junto com o post (mesma transação), e com ele
+    # o SQLite troca a busca pela chave pelo índice de status (1M posts: 130 ms)
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size, ordering=('created_at', 'post_id'))
+        page = paginator.page(self.request.GET.get('cursor'))
+        cards = Post.objects.select_related('author').defer('content', 'content_html')
+        posts = cards.in_bulk([link.post_id for link in page.object_list])
+        page.object_list = [posts[link.post_id] for link in page.object_list if link.post_id in posts]
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def get_page_cache_variant(self):
+        return f"tag:{self.kwargs['slugs']}"
+
+    # Sem ETag/Last-Modified, como no arquivo de autor
+    def get_validators(self):
+        return None, None
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['tags'] = self.get_tags()
+        return context
+
 class PostDetailView(DetailView):
     # 1. Qual modelo usar?
     model = Post
@@ -41,20 +250,39 @@ class PostDetailView(DetailView):
         # para que ninguém acesse rascunhos diretamente pela URL.
         return Post.objects.filter(status='published')
 
-class PostDetailView(DetailView):
+class PostDetailView(AnonymousPageCacheMixin, ConditionalGetMixin, DetailView):
     model = Post
     template_name = 'posts/post_detail.html'
     context_object_name = 'post'
+    # Novos comentários (POST) passam pelo limite de escrita do
+    # WriteThrottleMiddleware, com as taxas do escopo 'comment'
+    throttle_scope = 'comment'
+
+    # Máximo de queries por requisição: sessão + usuário + ETag + post + comentários + tags
+    query_budget = 6
+
+    # Comentários da primeira pintura; os seguintes vêm de PostCommentsView
+    comments_per_page = 20
     
     # 1. Filtra para exibir apenas posts publicados (como antes)
     def get_queryset(self):
-        return Post.objects.filter(status='published')
+        return published_posts()
+
+    def get_page_cache_scope(self):
+        return f"detail:{self.kwargs['slug']}"
+
+    # ETag/Last-Modified do post: updated_at, contador de comentários e
+    # último comentário aprovado, em uma query só (sem JOIN com o autor)
+    def get_validators(self):
+        return detail_validators(detail_stats(self.kwargs['slug']).first())
 
     # 2. Adiciona o formulário de comentário e a lista de comentários ao contexto
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Filtra apenas os comentários aprovados para exibição
-        context['comments'] = self.object.comments.filter(approved=True)
+        # Só a primeira página dos comentários aprovados: o tamanho da página
+        # não cresce com o número de comentários do post
+        context['comments'] = comment_page(self.object, self.comments_per_page)
+        context['post_tags'] = list(self.object.tags.all())
         # Cria uma instância vazia do formulário de comentário
         context['comment_form'] = CommentForm() 
         return context
@@ -74,8 +302,11 @@ class PostDetailView(DetailView):
             # Liga o comentário ao post e ao autor logado
             new_comment.post = self.object
             new_comment.author = request.user
-            # O campo 'approved' é False por padrão (moderação)
-            new_comment.save()
+            # O campo 'approved' é False por padrão: a moderação roda depois,
+            # no worker (posts/moderation.py), sem segurar a resposta
+            with transaction.atomic(savepoint=False):
+                new_comment.save()
+                enqueue_moderation(new_comment)
             
             # Redireciona para o mesmo post (evita reenvio do formulário)
             return redirect(self.object.get_absolute_url()) 
@@ -85,6 +316,67 @@ class PostDetailView(DetailView):
         context['comment_form'] = form # Passa o formulário com os erros de volta
         return self.render_to_response(context)
 
+class PostCommentsView(AnonymousPageCacheMixin, ConditionalGetMixin, View):
+    # Páginas seguintes dos comentários de um post, carregadas sob demanda:
+    # fragmento HTML (padrão) ou JSON (?format=json)
+    template_name = 'posts/_comment_list.html'
+    comments_per_page = PostDetailView.comments_per_page
+    # sessão + usuário + ETag + post + comentários
+    query_budget = 5
+
+    # Mesmo escopo do detalhe: um comentário aprovado invalida os dois
+    def get_page_cache_scope(self):
+        return f"detail:{self.kwargs['slug']}"
+
+    # A chave não tem o caminho: sem a variante, /<slug>/comments/ e /<slug>/
+    # (mesma query string) cairiam na mesma entrada
+    def get_page_cache_variant(self):
+        return 'comments'
+
+    def get_validators(self):
+        etag, last_modified = detail_validators(detail_stats(self.kwargs['slug']).first())
+        if etag is None:
+            return None, None
+        return f'comments:{self.request.GET.urlencode()}:{etag}', last_modified
+
+    def get(self, request, slug):
+        post = get_object_or_404(Post.objects.filter(status='published').only('pk', 'slug'), slug=slug)
+        cursor = request.GET.get('cursor')
+        page = comment_page(post, self.comments_per_page, cursor)
+        if request.GET.get('format') == 'json':
+            return JsonResponse({
+                'comments': [
+                    {
+                        'id': comment.pk,
+                        'author': comment.author.username,
+                        'content': comment.content,
+                        'created_at': comment.created_at.isoformat(),
+                    }
+                    for comment in page
+                ],
+                'next_cursor': page.next_cursor,
+            })
+        return TemplateResponse(request, self.template_name, {
+            'post': post, 'comments': page, 'continuation': bool(cursor),
+        })
+
+class PostSearchView(ListView):
+    # Busca pública: índice invertido (FTS5 ou Python puro, ver posts/search.py)
+    template_name = 'posts/post_search.html'
+    context_object_name = 'posts'
+    paginate_by = 10
+    # sessão + usuário + COUNT da busca + ids da página + posts (com autor)
+    query_budget = 5
+
+    def get_queryset(self):
+        # SearchResults tem count() e fatias: o Paginator busca só a página atual
+        return search_posts(self.request.GET.get('q', ''))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.request.GET.get('q', '')
+        return context
+
 # ATENÇÃO: Adicione este método à CLASSE POST (posts/models.py)
 # para que o redirect no POST da DetailView funcione corretamente
 # class Post(models.Model):
@@ -101,6 +393,12 @@ class PostCreateView(LoginRequiredMixin, CreateView):
     model = Post
     template_name = 'posts/post_form.html' # Usaremos um template genérico
     form_class = PostForm # Usaremos um formulário genérico
+    throttle_scope = 'post_create'
+    # sessão + usuário + slugs ocupados + INSERT + estatísticas do autor +
+    # índice de busca (nos testes, + SAVEPOINT/RELEASE do save_with_unique_slug)
+    # + tags: busca, criação das novas e releitura, ligações, contadores
+    # + versão da lista (ETag)
+    query_budget = 16
 
     # Define o sucesso do redirecionamento para o post recém-nascido
     def get_success_url(self):
@@ -110,29 +408,237 @@ class PostCreateView(LoginRequiredMixin, CreateView):
     # Garante que o autor do post seja o usuário logado
     def form_valid(self, form):
         form.instance.author = self.request.user # Garante que o autor seja o usuário logado
-        form.instance.slug = form.instance.title.lower().replace(' ', '-') # Cria um slug simples (melhoria futura: auto-slug)
-        return super().form_valid(form)
+        # Slug sem acentos e sem colisão (ver posts/slugs.py)
+        self.object = save_with_unique_slug(form.instance, save=form.save)
+        return HttpResponseRedirect(self.get_success_url())
 
 class PostUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
     model = Post
     template_name = 'posts/post_form.html'
     form_class = PostForm
+    # sessão + usuário + post + UPDATE + índice de busca; trocar o título
+    # custa também a busca de slugs (e SAVEPOINT/RELEASE nos testes);
+    # + tags atuais e, se o campo mudou, busca/criação das tags, ligações
+    # removidas e novas, contadores + versão da lista (ETag)
+    query_budget = 16
 
     # Sobreescrever o método para redirecionar para o post após a edição
     def get_success_url(self):
         return reverse('post_detail', args=[self.object.slug])
 
+    # Título novo, slug novo (a URL antiga sai do cache pelo sinal do Post)
+    def form_valid(self, form):
+        if 'title' in form.changed_data and not slug_matches_title(form.instance.slug, form.instance.title):
+            self.object = save_with_unique_slug(form.instance, save=form.save)
+            return HttpResponseRedirect(self.get_success_url())
+        return super().form_valid(form)
+
+    # Reaproveita o post já buscado pelo test_func (evita uma segunda query)
+    def get_object(self, queryset=None):
+        if getattr(self, 'object', None) is None:
+            self.object = super().get_object(queryset)
+        return self.object
+
     # Teste de Permissão: Garante que apenas o autor possa editar o post
     def test_func(self):
         post = self.get_object()
-        return self.request.user == post.author # Retorna True se o usuário logado
+        return self.request.user.pk == post.author_id # Retorna True se o usuário logado
 
 class PostDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
     model = Post
     template_name = 'posts/post_confirm_delete.html' # Template para confirmação de exclusão
     success_url = reverse_lazy('post_list') # Redireciona para a lista de posts após a exclusão
+    # sessão + usuário + post + SELECT/DELETE dos comentários + DELETE das
+    # tarefas de moderação + DELETE do post + estatísticas do autor +
+    # DELETE no índice de busca (termos e FTS5) + versão da lista (ETag)
+    query_budget = 13
+
+    # Reaproveita o post já buscado pelo test_func (evita uma segunda query)
+    def get_object(self, queryset=None):
+        if getattr(self, 'object', None) is None:
+            self.object = super().get_object(queryset)
+        return self.object
     
     # Teste de Permissão: Garante que apenas o autor possa deletar
     def test_func(self):
         post = self.get_object()
-        return self.request.user == post.author
\ No newline at end of file
+        return self.request.user.pk == post.author_id
+
+# ----------------------------------------------------
+# VIEWS ASSÍNCRONAS (ASGI) DE LEITURA
+# ----------------------------------------------------
+# Mesmas páginas da lista e do detalhe, mas com o ORM async: rodando sob
+# ASGI, a requisição não ocupa uma thread enquanto espera o banco. Quais
+# rotas usam estas views é escolhido em settings.POSTS_ASYNC_VIEWS.
+
+def render_now(request, template_name, context):
+    # O Django não tem renderização de template async. Com todos os dados já
+    # carregados (nenhuma query durante o render), renderizar direto no event
+    # loop sai mais barato que mandar o render para a thread síncrona
+    with measure_template():
+        return TemplateResponse(request, template_name, context).render()
+
+
+class AsyncPostListView(AsyncAnonymousPageCacheMixin, AsyncConditionalGetMixin, View):
+    template_name = 'posts/post_list.html'
+    paginate_by = PostListView.paginate_by
+    pagination_mode = None
+    # sessão + usuário + ETag + COUNT do paginador por offset + posts (com autor)
+    # + nuvem de tags (só quando não está no cache)
+    query_budget = 6
+
+    def get_page_cache_scope(self):
+        return 'list'
+
+    def get_pagination_mode(self):
+        return self.pagination_mode or getattr(settings, 'POSTS_PAGINATION_MODE', 'offset')
+
+    async def aget_validators(self):
+        return list_validators(await content_version().afirst(), self.request.GET.urlencode())
+
+    async def get(self, request, *args, **kwargs):
+        # O template usa request.user: carrega sessão e usuário antes, sem bloquear
+        request.user = await request.auser()
+        queryset = post_cards().order_by('-created_at', '-id')
+
+        if self.get_pagination_mode() == 'cursor':
+            paginator = KeysetPaginator(queryset, self.paginate_by)
+            page = await paginator.apage(request.GET.get('cursor'))
+        else:
+            paginator = Paginator(queryset, self.paginate_by)
+            # Preenche o count (cached_property) para o Paginator não fazer COUNT síncrono
+            paginator.count = await queryset.acount()
+            page_number = request.GET.get('page') or 1
+            if page_number == 'last':
+                page_number = paginator.num_pages
+            try:
+                page = paginator.page(page_number)
+            except InvalidPage:
+                raise Http404('Página inválida.')
+            page.object_list = [post async for post in page.object_list]
+
+        return render_now(request, self.template_name, {
+            'view': self,
+            'paginator': paginator,
+            'page_obj': page,
+            'is_paginated': page.has_other_pages(),
+            'object_list': page.object_list,
+            'posts': page.object_list,
+            'cursor_pagination': self.get_pagination_mode() == 'cursor',
+            'tag_cloud': await atag_cloud(),
+        })
+
+
+class AsyncPostDetailView(AsyncAnonymousPageCacheMixin, AsyncConditionalGetMixin, View):
+    template_name = 'posts/post_detail.html'
+    throttle_scope = PostDetailView.throttle_scope
+    # Máximo de queries por requisição: sessão + usuário + ETag + post + comentários + tags
+    query_budget = 6
+
+    def get_page_cache_scope(self):
+        return f"detail:{self.kwargs['slug']}"
+
+    async def aget_validators(self):
+        return detail_validators(await detail_stats(self.kwargs['slug']).afirst())
+
+    async def get(self, request, slug):
+        request.user = await request.auser()
+        try:
+            post = await published_posts().aget(slug=slug)
+        except Post.DoesNotExist:
+            raise Http404('Post não encontrado.')
+        comments = await KeysetPaginator(
+            approved_comments(post), PostDetailView.comments_per_page).apage()
+        post_tags = [tag async for tag in post.tags.all()]
+        return render_now(request, self.template_name, {
+            'view': self,
+            'object': post,
+            'post': post,
+            'comments': comments,
+            'post_tags': post_tags,
+            'comment_form': CommentForm(),
+        })
+
+    # Novos comentários continuam na view síncrona (escrita rara, sinais síncronos)
+    async def post(self, request, *args, **kwargs):
+        return await sync_to_async(PostDetailView.as_view())(request, *args, **kwargs)
+
+
+# ----------------------------------------------------
+# FEEDS E SITEMAP (para leitores de feed e crawlers)
+# ----------------------------------------------------
+class PostFeedView(AnonymousPageCacheMixin, ConditionalGetMixin, View):
+    # RSS/Atom do site (ou de um autor, com `username` na URL). O XML gerado
+    # fica no cache de página; o 304 sai de uma leitura de FEED_LIMIT linhas
+    feed_class = LatestPostsFeed
+    # ETag (itens do feed) + autor + itens (com autor)
+    query_budget = 3
+
+    def get_page_cache_scope(self):
+        return 'list'
+
+    def get_page_cache_variant(self):
+        # O XML traz URLs absolutas: cada host tem a sua entrada
+        return f"feed:{self.feed_class.__name__}:{self.kwargs.get('username', '')}:{self.request.get_host()}"
+
+    def get_validators(self):
+        return feed_validators(self.feed_class.__name__, self.kwargs.get('username'))
+
+    def get(self, request, **kwargs):
+        return self.feed_class()(request, **kwargs)
+
+
+class SitemapIndexView(View):
+    # Um MAX(pk) por seção; os shards são calculados a partir dele
+    query_budget = len(SITEMAP_SECTIONS)
+
+    def get(self, request):
+        base_url = f'{request.scheme}://{request.get_host()}'
+        return HttpResponse(sitemap_index(base_url), content_type='application/xml; charset=utf-8')
+
+
+class SitemapView(ConditionalGetMixin, View):
+    # Um shard do sitemap, transmitido aos pedaços (ver posts/sitemaps.py)
+    # ETag (versão da lista) + MAX(pk) + linhas do shard (um cursor só)
+    query_budget = 3
+
+    def get_section(self):
+        section = SITEMAP_SECTIONS.get(self.kwargs['section'])
+        if section is None:
+            raise Http404('Sitemap inexistente.')
+        return section
+
+    def get_validators(self):
+        return self.get_section().validators(self.kwargs['number'])
+
+    def get(self, request, section, number):
+        section = self.get_section()
+        if number >= section.shard_count():
+            raise Http404('Shard inexistente.')
+        base_url = f'{request.scheme}://{request.get_host()}'
+        entries = section.entries(section.shard(number))
+        return StreamingHttpResponse(stream_urlset(base_url, entries), content_type='application/xml; charset=utf-8')
+
+
+# ----------------------------------------------------
+# MÉTRICAS DE DESEMPENHO (ver posts/middleware.py)
+# ----------------------------------------------------
+def metrics_access_allowed(request):
+    # Equipe logada ou, para o coletor do Prometheus, o token configurado
+    token = getattr(settings, 'POSTS_METRICS_TOKEN', '')
+    if token and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return True
+    return request.user.is_active and request.user.is_staff
+
+
+def metrics_json(request):
+    if not metrics_access_allowed(request):
+        raise PermissionDenied
+    return JsonResponse({'routes': route_metrics.as_dict(), 'caches': cache_stats()})
+
+
+def metrics_prometheus(request):
+    if not metrics_access_allowed(request):
+        raise PermissionDenied
+    body = route_metrics.prometheus() + cache_stats_prometheus(cache_stats())
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')